@@ -1,46 +1,71 @@
+from __future__ import annotations
+
 import argparse
+import csv
+import os
 import sys
-from typing import List
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from los_bounds import parse_bounds
+from los_profile import add_profile_arguments, profiling, stage
 
-import pandas as pd
+# pandas is imported inside the functions that need it: a clean los_results.csv is
+# averaged with the csv module alone, which keeps this quick query fast to start.
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 SCORE_TO_LOS = {1: "A", 2: "B", 3: "C", 4: "D", 5: "E", 6: "F"}
 
+REQUIRED_COLUMNS = ("INTID", "hour", "los_score")
 
-def compute_intersection_averages(df: pd.DataFrame) -> pd.DataFrame:
-    required = {"INTID", "hour", "los_score"}
-    missing = required - set(df.columns)
-    if missing:
-        raise ValueError(f"Missing required columns in source CSV: {sorted(missing)}")
 
-    out = df.copy()
-    out["los_score"] = pd.to_numeric(out["los_score"], errors="coerce")
-    out = out.dropna(subset=["INTID", "hour", "los_score"])  
+# Harsher bands to produce lower letters for the same average: an average below the
+# bound of a band (and not below the previous one) gets its letter; anything higher is F
+AVERAGE_BANDS = [
+    (1.2, "A"),
+    (2.0, "B"),
+    (2.8, "C"),
+    (3.6, "D"),
+    (4.4, "E"),
+]
+
+
+def parse_bands(text: str) -> List[Tuple[float, str]]:
+    """Comma-separated upper bounds for the A..E average bands, e.g. "1.2,2.0,2.8,3.6,4.4"."""
+    return parse_bounds(text, "Band bounds")
 
-    # Average hourly scores per intersection across the dataset (no rounding)
-    avg = (
-        out.groupby("INTID", as_index=False)["los_score"].mean()
-        .rename(columns={"los_score": "avg_hourly_score"})
-    )
-    # Derive LOS letter from average without rounding using mid-point bands
-    def score_to_letter(x: float) -> str:
-        if pd.isna(x):
-            return ""
-        # Harsher bands to produce lower letters for the same average
-        if x < 1.2:
-            return "A"
-        elif x < 2.0:
-            return "B"
-        elif x < 2.8:
-            return "C"
-        elif x < 3.6:
-            return "D"
-        elif x < 4.4:
-            return "E"
-        else:
-            return "F"
 
+# Derive LOS letter from average without rounding using mid-point bands
+def score_to_letter(x: Optional[float], bands: Sequence[Tuple[float, str]] = AVERAGE_BANDS) -> str:
+    if x is None or x != x:
+        return ""
+    for bound, letter in bands:
+        if x < bound:
+            return letter
+    return "F"
+
+
+def compute_intersection_averages(df: Optional[pd.DataFrame], avg: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """df may be None when avg (INTID, avg_hourly_score) was already computed, e.g. in SQL."""
+    import pandas as pd
+
+    # Average hourly scores per intersection across the dataset (no rounding)
+    if avg is None:
+        required = {"INTID", "hour", "los_score"}
+        missing = required - set(df.columns)
+        if missing:
+            raise ValueError(f"Missing required columns in source CSV: {sorted(missing)}")
+
+        out = df.copy()
+        out["los_score"] = pd.to_numeric(out["los_score"], errors="coerce")
+        out = out.dropna(subset=["INTID", "hour", "los_score"])
+        avg = (
+            out.groupby("INTID", as_index=False)["los_score"].mean()
+            .rename(columns={"los_score": "avg_hourly_score"})
+        )
+    else:
+        avg = avg.copy()
     avg["avg_LOS"] = avg["avg_hourly_score"].apply(score_to_letter)
 
     # Order by INTID ascending (lowest to highest)
@@ -48,30 +73,138 @@ def compute_intersection_averages(df: pd.DataFrame) -> pd.DataFrame:
     return avg[["INTID", "avg_hourly_score", "avg_LOS"]]
 
 
-def print_terminal(avg_df: pd.DataFrame) -> None:
-    print("Average of hourly LOS scores per intersection (no rounding):")
+def averages_from_csv(csv_path: str) -> Optional[List[Tuple[int, float, str]]]:
+    """
+    (INTID, avg_hourly_score, avg_LOS) rows read with the csv module, matching
+    compute_intersection_averages on the same file. Returns None whenever read_csv could
+    interpret the file differently (missing values, non-integer INTID or score), so the
+    caller falls back to pandas for anything but a clean results file.
+    """
+    sums: Dict[int, List[int]] = {}
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None or not set(REQUIRED_COLUMNS).issubset(header):
+            return None
+        i_intid, i_hour, i_score = (header.index(c) for c in REQUIRED_COLUMNS)
+        for row in reader:
+            try:
+                intid, score = int(row[i_intid]), int(row[i_score])
+                if not row[i_hour]:
+                    return None
+            except (IndexError, ValueError):
+                return None
+            acc = sums.get(intid)
+            if acc is None:
+                sums[intid] = [score, 1]
+            else:
+                acc[0] += score
+                acc[1] += 1
+    rows = []
+    for intid in sorted(sums):
+        total, count = sums[intid]
+        avg = total / count
+        rows.append((intid, avg, score_to_letter(avg)))
+    return rows
+
+
+def write_averages_csv(rows: List[Tuple[int, float, str]], csv_path: str) -> None:
+    """Same bytes as DataFrame.to_csv(index=False) of the averages frame."""
+    lines = ["INTID,avg_hourly_score,avg_LOS"] + [f"{intid},{avg!r},{los}" for intid, avg, los in rows]
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        f.write(os.linesep.join(lines) + os.linesep)
+
+
+def _print_rows(rows) -> None:
     header = f"{'INTID':<6} {'AvgHourlyScore':<15} {'LOS':<3}"
-    print(header)
-    print("-" * len(header))
-    for _, row in avg_df.iterrows():
-        print(f"{str(row['INTID']):<6} {row['avg_hourly_score']:<15.2f} {row['avg_LOS']:<3}")
+    lines = ["Average of hourly LOS scores per intersection (no rounding):", header, "-" * len(header)]
+    for intid, score, los in rows:
+        lines.append(f"{str(intid):<6} {score:<15.2f} {los:<3}")
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+def print_terminal(avg_df: pd.DataFrame) -> None:
+    _print_rows(zip(avg_df["INTID"].tolist(), avg_df["avg_hourly_score"].tolist(), avg_df["avg_LOS"].tolist()))
 
 
 def main(argv: List[str] = None) -> int:
     parser = argparse.ArgumentParser(description="Average hourly LOS scores per intersection from los_results.csv (no rounding)")
     parser.add_argument("--source", default="los_results.csv", help="Path to hourly LOS results CSV (default: los_results.csv)")
     parser.add_argument("--out", default="average_los_by_intersection.csv", help="Path to save intersection averages CSV")
+    parser.add_argument("--cache-dir", default="", help="Load the source through a typed binary cache kept in this directory")
+    parser.add_argument("--db", default="", help="Read hourly LOS from this SQLite store (los_calc.py --db) instead of --source")
+    parser.add_argument("--store", default="", help="Compute hourly LOS from this count store (los_store.py) instead of --source")
+    parser.add_argument("--intid", default="", help="With --store: comma-separated INTIDs to include (default: all)")
+    parser.add_argument("--start", default=None, help="With --store: include hours from this time (e.g. 2025-11-18)")
+    parser.add_argument("--end", default=None, help="With --store: include hours before this time")
+    add_profile_arguments(parser)
     args = parser.parse_args(argv)
+    with profiling(args, "average_los_by_intersection"):
+        return run(args)
+
+
+def run(args: argparse.Namespace) -> int:
+    if not args.db and not args.cache_dir and not args.store:
+        try:
+            with stage("averages (csv module)"):
+                rows = averages_from_csv(args.source)
+        except FileNotFoundError:
+            print(f"Source file not found: {args.source}. Run 'python los_calc.py' first to generate hourly LOS.")
+            return 1
+        if rows is not None:
+            with stage("write csv", rows=len(rows)):
+                write_averages_csv(rows, args.out)
+            with stage("print"):
+                _print_rows(rows)
+            print(f"\nSaved intersection averages to {args.out}")
+            return 0
 
     try:
-        df = pd.read_csv(args.source)
+        with stage("load hourly LOS"):
+            if args.db:
+                from contextlib import closing
+
+                from los_db import average_scores, connect
+
+                # The per-INTID mean is computed by SQLite; no hourly rows are loaded
+                with closing(connect(args.db)) as conn:
+                    avg_df = compute_intersection_averages(None, avg=average_scores(conn))
+            elif args.store:
+                from los_store import hourly_from_store, parse_intids
+
+                # Only the requested INTIDs and dates are read from the memory-mapped counts
+                df = hourly_from_store(args.store, parse_intids(args.intid), args.start, args.end)
+            elif args.cache_dir:
+                from los_cache import cached_results
+
+                df = cached_results(args.source, cache_dir=args.cache_dir)
+            else:
+                import pandas as pd
+
+                df = pd.read_csv(args.source)
     except FileNotFoundError:
-        print(f"Source file not found: {args.source}. Run 'python los_calc.py' first to generate hourly LOS.")
+        if args.store:
+            print(f"Count store not found: {args.store}. Convert exports first with 'python los_store.py --csv <export.csv>'.")
+        else:
+            print(f"Source file not found: {args.db or args.source}. Run 'python los_calc.py' first to generate hourly LOS.")
+        return 1
+    except KeyError as exc:
+        print(exc.args[0])
+        return 1
+    except ValueError as exc:
+        if not args.store:
+            raise
+        # Unparseable --start/--end or a file that is not a count store
+        print(exc)
         return 1
 
-    avg_df = compute_intersection_averages(df)
-    avg_df.to_csv(args.out, index=False)
-    print_terminal(avg_df)
+    if not args.db:
+        with stage("build averages", rows=len(df)):
+            avg_df = compute_intersection_averages(df)
+    with stage("write csv", rows=len(avg_df)):
+        avg_df.to_csv(args.out, index=False)
+    with stage("print"):
+        print_terminal(avg_df)
     print(f"\nSaved intersection averages to {args.out}")
     return 0
 
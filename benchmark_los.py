@@ -0,0 +1,176 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+import average_los_by_intersection
+import best_los_summary
+import worst_los_summary
+from generate_volume_data import generate_counts, write_export
+from los_calc import compute_hourly_los, load_and_prepare
+
+
+DEFAULT_SCALES = "5x7,20x30,50x90"
+
+# CLI entry points whose start-up (interpreter + imports + argparse) is timed with --help
+STARTUP_SCRIPTS = [
+    "los_calc.py",
+    "worst_los_summary.py",
+    "best_los_summary.py",
+    "average_los_by_intersection.py",
+    "plot_intersection_volumes.py",
+    "los_analyze.py",
+]
+
+
+def parse_scales(text: str) -> List[Tuple[int, int]]:
+    """Parse 'INTIDSxDAYS' pairs, e.g. '5x7,20x30'."""
+    scales = []
+    for item in text.split(","):
+        item = item.strip().lower()
+        if not item:
+            continue
+        try:
+            intids, days = (int(x) for x in item.split("x"))
+        except ValueError:
+            raise ValueError(f"Scale must look like INTIDSxDAYS, got: {item!r}")
+        scales.append((intids, days))
+    return scales
+
+
+def _time(fn: Callable[[], object], repeat: int) -> Tuple[Dict[str, float], object]:
+    runs = []
+    result = None
+    for _ in range(repeat):
+        # Stages print progress; keep stdout clean for the JSON report
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = fn()
+            runs.append(time.perf_counter() - start)
+    return {"min_s": min(runs), "median_s": statistics.median(runs), "runs": len(runs)}, result
+
+
+def _time_command(cmd: List[str], repeat: int) -> Dict[str, float]:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        runs.append(time.perf_counter() - start)
+    return {"min_s": min(runs), "median_s": statistics.median(runs), "runs": len(runs)}
+
+
+def measure_startup(workdir: str, repeat: int) -> Dict[str, Dict[str, float]]:
+    """
+    Wall time of fresh interpreter runs: every CLI script with --help (imports and argument
+    parsing only) and a small end-to-end query, averaging a one-day results file.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    timings = {}
+    for script in STARTUP_SCRIPTS:
+        timings[f"{script} --help"] = _time_command([sys.executable, os.path.join(here, script), "--help"], repeat)
+
+    source = os.path.join(workdir, "startup_results.csv")
+    csv_path = os.path.join(workdir, "startup_export.csv")
+    write_export(generate_counts(intids=5, days=1), csv_path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        compute_hourly_los(load_and_prepare(csv_path)).sort_values(["INTID", "hour"]).to_csv(source, index=False)
+    query = [sys.executable, os.path.join(here, "average_los_by_intersection.py"), "--source", source, "--out", os.path.join(workdir, "startup_avg.csv")]
+    timings["average_los_by_intersection.py (5 INTIDs x 1 day)"] = _time_command(query, repeat)
+    return timings
+
+
+def run_scale(intids: int, days: int, workdir: str, repeat: int, plot: bool) -> dict:
+    csv_path = os.path.join(workdir, f"VehicleVolume_bench_{intids}x{days}.csv")
+    write_export(generate_counts(intids=intids, days=days), csv_path)
+
+    stages: Dict[str, Dict[str, float]] = {}
+    stages["load_and_prepare"], prepared = _time(lambda: load_and_prepare(csv_path), repeat)
+    stages["compute_hourly_los"], hourly = _time(lambda: compute_hourly_los(prepared), repeat)
+    hourly = hourly.sort_values(["INTID", "hour"]).reset_index(drop=True)
+
+    builders = {
+        "build_per_intersection_summary": lambda: worst_los_summary.build_per_intersection_summary(hourly),
+        "build_overall_worst": lambda: worst_los_summary.build_overall_worst(hourly),
+        "build_per_intersection_best": lambda: best_los_summary.build_per_intersection_best(hourly),
+        "build_overall_best": lambda: best_los_summary.build_overall_best(hourly),
+        "compute_intersection_averages": lambda: average_los_by_intersection.compute_intersection_averages(hourly),
+    }
+    for name, fn in builders.items():
+        stages[name], _ = _time(fn, repeat)
+
+    if plot:
+        from plot_intersection_volumes import plot_all_intersections_one_chart
+
+        plots_dir = os.path.join(workdir, "plots")
+        stages["plot_all_intersections_one_chart"], _ = _time(
+            lambda: plot_all_intersections_one_chart(hourly[["INTID", "hour", "total_volume"]], plots_dir), repeat
+        )
+
+    return {
+        "intids": intids,
+        "days": days,
+        "interval_rows": int(len(prepared)),
+        "hourly_rows": int(len(hourly)),
+        "csv_bytes": os.path.getsize(csv_path),
+        "stages": stages,
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the LOS pipeline on synthetic exports and emit JSON timings.")
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help=f"Comma-separated INTIDSxDAYS scales (default: {DEFAULT_SCALES})")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage; min and median are reported (default: 3)")
+    parser.add_argument("--no-plot", action="store_true", help="Skip timing the matplotlib chart")
+    parser.add_argument("--no-startup", action="store_true", help="Skip timing script start-up in fresh interpreters")
+    parser.add_argument("--out", default="", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    try:
+        scales = parse_scales(args.scales)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    results = []
+    startup = {}
+    with tempfile.TemporaryDirectory(prefix="los_bench_") as workdir:
+        if not args.no_startup:
+            print("Timing script start-up ...", file=sys.stderr)
+            startup = measure_startup(workdir, max(args.repeat, 1))
+        for intids, days in scales:
+            print(f"Benchmarking {intids} INTIDs x {days} days ...", file=sys.stderr)
+            results.append(run_scale(intids, days, workdir, max(args.repeat, 1), plot=not args.no_plot))
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "startup": startup,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"Saved benchmark report to {args.out}", file=sys.stderr)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
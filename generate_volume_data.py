@@ -0,0 +1,96 @@
+import argparse
+import os
+import sys
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from los_calc import MOVEMENT_COLUMNS
+
+
+NOTE_LINES = ["Turning Movement Count,", "15 Minute Counts,"]
+
+# Relative share of the intersection total carried by each movement (NBL..WBR)
+MOVEMENT_WEIGHTS = np.array([4, 10, 3, 3, 10, 4, 5, 14, 4, 5, 14, 5], dtype="float64")
+
+
+def _daily_profile() -> np.ndarray:
+    """Relative 15-minute demand over a day: overnight trough, AM and PM peaks, midday plateau."""
+    t = np.arange(96) / 4.0
+    am = np.exp(-0.5 * ((t - 7.75) / 1.0) ** 2)
+    pm = 1.25 * np.exp(-0.5 * ((t - 17.0) / 1.4) ** 2)
+    midday = 0.55 * np.exp(-0.5 * ((t - 12.5) / 3.0) ** 2)
+    return 0.04 + am + pm + midday
+
+
+def generate_counts(
+    intids: int = 5,
+    days: int = 7,
+    start: str = "2025-11-16",
+    seed: int = 0,
+    missing_fraction: float = 0.25,
+) -> pd.DataFrame:
+    """
+    Synthetic 15-minute turning movement counts in export row order (INTID, date, time).
+    Each INTID gets its own volume scale, movement mix and a few movements that do not
+    exist at that intersection (written as '*' like the real exports).
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=days, freq="D")
+    weekend = np.where(dates.dayofweek >= 5, 0.7, 1.0)
+
+    # Expected 15-minute intersection total at the daily peak, per INTID
+    peak_total = rng.uniform(150, 1100, size=intids)
+    mix = MOVEMENT_WEIGHTS * rng.uniform(0.5, 1.5, size=(intids, len(MOVEMENT_WEIGHTS)))
+    absent = rng.random((intids, len(MOVEMENT_WEIGHTS))) < missing_fraction
+    mix = np.where(absent, 0.0, mix)
+    mix /= np.maximum(mix.sum(axis=1, keepdims=True), 1e-9)
+
+    profile = _daily_profile() / _daily_profile().max()
+    # (intid, day, interval) expected totals, then split across movements with Poisson noise
+    expected = peak_total[:, None, None] * weekend[None, :, None] * profile[None, None, :]
+    lam = expected[..., None] * mix[:, None, None, :]
+    counts = rng.poisson(lam).reshape(-1, len(MOVEMENT_WEIGHTS))
+
+    intid_col = np.repeat(np.arange(1, intids + 1), days * 96)
+    date_col = np.tile(np.repeat(dates.strftime("%m/%d/%Y").to_numpy(), 96), intids)
+    minutes = np.tile(np.arange(96) * 15, intids * days)
+    time_col = np.char.add(np.char.add('="', np.char.zfill(((minutes // 60) * 100 + minutes % 60).astype(str), 4)), '"')
+
+    df = pd.DataFrame({"DATE": date_col, "TIME": time_col, "INTID": intid_col})
+    absent_rows = np.repeat(absent, days * 96, axis=0)
+    for j, col in enumerate(MOVEMENT_COLUMNS):
+        df[col] = np.where(absent_rows[:, j], "*", counts[:, j].astype(str))
+    return df
+
+
+def write_export(df: pd.DataFrame, path: str) -> None:
+    """Write counts in the exact export layout: note lines, header, ="HHMM" TIME, trailing commas, CRLF."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    columns = ["DATE", "TIME", "INTID"] + MOVEMENT_COLUMNS
+    body = df[columns[0]].astype(str)
+    for col in columns[1:]:
+        body = body + "," + df[col].astype(str)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("\r\n".join(NOTE_LINES + [",".join(columns)]) + "\r\n")
+        f.write("\r\n".join(body.to_numpy() + ",") + "\r\n")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic VehicleVolume export for testing and benchmarks.")
+    parser.add_argument("--out", default="VehicleVolume_synthetic.csv", help="Path of the CSV to write")
+    parser.add_argument("--intids", type=int, default=5, help="Number of intersections (default: 5)")
+    parser.add_argument("--days", type=int, default=7, help="Number of days of 15-minute counts (default: 7)")
+    parser.add_argument("--start", default="2025-11-16", help="First date, YYYY-MM-DD (default: 2025-11-16)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args(argv)
+
+    df = generate_counts(intids=args.intids, days=args.days, start=args.start, seed=args.seed)
+    write_export(df, args.out)
+    print(f"Wrote {len(df)} rows ({args.intids} INTIDs x {args.days} days) to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+import argparse
+import os
+import sys
+from typing import List
+
+import pandas as pd
+
+import average_los_by_intersection
+import best_los_summary
+import worst_los_summary
+from los_calc import LOS_THRESHOLDS, Thresholds, compute_hourly_los, load_and_prepare, parse_thresholds
+from los_format import write_csv
+from los_profile import StageTimer, add_profile_arguments, profiling
+
+
+def intersection_score_stats(hourly: pd.DataFrame) -> pd.DataFrame:
+    """Worst, best and average hourly score per INTID from a single groupby."""
+    return hourly.groupby("INTID", as_index=False)["los_score"].agg(
+        worst_score="max",
+        best_score="min",
+        avg_hourly_score="mean",
+    )
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compute hourly LOS once and run the worst/best/average summaries and plot in one process."
+    )
+    parser.add_argument("--csv", default="VehicleVolume_1Wal_2Hwy_4Hwy_11162025_11222025.csv", help="Path to input CSV")
+    parser.add_argument("--outdir", default=".", help="Directory for the result and summary CSVs")
+    parser.add_argument("--plots-dir", default="plots", help="Directory for the hourly volume chart ('' to skip)")
+    parser.add_argument("--top", type=int, default=10, help="Top-N overall worst/best entries to display (default: 10)")
+    parser.add_argument("--cache-dir", default="", help="Reuse typed binary caches of the parsed export")
+    parser.add_argument("--thresholds", default="", help="Comma-separated 15-min volume upper bounds for A..E")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    try:
+        thresholds = parse_thresholds(args.thresholds) if args.thresholds else LOS_THRESHOLDS
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    timer = StageTimer()
+    # With --profile the library's own stages nest under these and the report goes to stderr
+    with profiling(args, "los_analyze", timer) as profiler:
+        status = run(args, thresholds, timer)
+    if profiler is None and status == 0:
+        timer.print_report()
+    return status
+
+
+def run(args: argparse.Namespace, thresholds: Thresholds, timer: StageTimer) -> int:
+    os.makedirs(args.outdir, exist_ok=True)
+
+    try:
+        if args.cache_dir:
+            from los_cache import cached_hourly_los
+
+            with timer.stage("hourly LOS (cached)"):
+                hourly = cached_hourly_los(args.csv, cache_dir=args.cache_dir, thresholds=thresholds)
+        else:
+            with timer.stage("load_and_prepare"):
+                df = load_and_prepare(args.csv, compact=True)
+            with timer.stage("compute_hourly_los"):
+                hourly = compute_hourly_los(df, thresholds)
+    except FileNotFoundError as exc:
+        print(exc)
+        return 1
+
+    with timer.stage("write los_results"):
+        hourly = hourly.sort_values(["INTID", "hour"]).reset_index(drop=True)
+        write_csv(hourly, os.path.join(args.outdir, "los_results.csv"))
+
+    with timer.stage("per-INTID score stats"):
+        stats = intersection_score_stats(hourly)
+
+    with timer.stage("worst summary"):
+        worst = worst_los_summary.build_per_intersection_summary(hourly, worst_scores=stats[["INTID", "worst_score"]])
+        worst_overall = worst_los_summary.build_overall_worst(hourly, top=args.top)
+        worst.drop(columns=["worst_hours_list"]).to_csv(os.path.join(args.outdir, "worst_los_summary.csv"), index=False)
+
+    with timer.stage("best summary"):
+        best = best_los_summary.build_per_intersection_best(hourly, best_scores=stats[["INTID", "best_score"]])
+        best_overall = best_los_summary.build_overall_best(hourly, top=args.top)
+        best.drop(columns=["best_hours_list"]).to_csv(os.path.join(args.outdir, "best_los_summary.csv"), index=False)
+
+    with timer.stage("average summary"):
+        averages = average_los_by_intersection.compute_intersection_averages(
+            hourly, avg=stats[["INTID", "avg_hourly_score"]]
+        )
+        averages.to_csv(os.path.join(args.outdir, "average_los_by_intersection.csv"), index=False)
+
+    if args.plots_dir:
+        with timer.stage("plot"):
+            from plot_intersection_volumes import plot_all_intersections_one_chart
+
+            plot_all_intersections_one_chart(hourly[["INTID", "hour", "total_volume"]], args.plots_dir)
+
+    with timer.stage("print"):
+        worst_los_summary.print_summary(worst, worst_overall)
+        print()
+        best_los_summary.print_summary(best, best_overall)
+        print()
+        average_los_by_intersection.print_terminal(averages)
+        print(f"\nSaved results and summaries to {os.path.abspath(args.outdir)}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+import argparse
+import sys
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from los_calc import (
+    LOS_THRESHOLDS,
+    MOVEMENT_COLUMNS,
+    SCORE_TO_LOS,
+    Thresholds,
+    classify_volumes,
+    load_and_prepare,
+    parse_thresholds,
+)
+from los_format import write_lines
+
+
+APPROACHES = ["NB", "SB", "EB", "WB"]
+
+# LOS_THRESHOLDS are calibrated on whole-intersection 15-minute totals; a single
+# approach carries roughly a quarter of that, so its bands are scaled down by default.
+APPROACH_SHARE = 0.25
+
+
+def scaled_thresholds(thresholds: Thresholds, share: float) -> List[tuple]:
+    return [(bound * share, los) for bound, los in thresholds]
+
+
+def compute_hourly_breakdown(
+    df: pd.DataFrame,
+    thresholds: Thresholds = LOS_THRESHOLDS,
+    approach_thresholds: Optional[Thresholds] = None,
+) -> pd.DataFrame:
+    """
+    Hourly volumes and LOS per INTID for the intersection, each approach (NB/SB/EB/WB)
+    and each of the twelve movements, in one grouped pass.
+
+    Movement counts are packed into one int64 matrix (float64 when any count is fractional);
+    approach volumes come from a reshape to (rows, 4 approaches, 3 turns), and the 15-minute
+    scores for the total and each approach are appended as extra columns so a single groupby
+    sums everything. Volumes and LOS are derived exactly like compute_hourly_los: the same
+    totals, mean of the 15-minute scores, rounded. Missing counts add nothing, as in pandas sums.
+    """
+    if approach_thresholds is None:
+        approach_thresholds = scaled_thresholds(thresholds, APPROACH_SHARE)
+
+    df = df.dropna(subset=["INTID", "datetime"])
+    counts = np.nan_to_num(df[MOVEMENT_COLUMNS].to_numpy(dtype="float64"))
+    if np.array_equal(counts, np.floor(counts)):
+        # Whole counts (every real export) sum exactly in integers
+        counts = counts.astype("int64")
+        total = counts.sum(axis=1)
+    else:
+        # Summed like _hourly_partials so fractional totals match compute_hourly_los bit for bit
+        total = df[MOVEMENT_COLUMNS].sum(axis=1).to_numpy(dtype="float64")
+    approach = counts.reshape(len(counts), len(APPROACHES), 3).sum(axis=2)
+
+    total_score = classify_volumes(total, thresholds)
+    approach_score = classify_volumes(approach.ravel(), approach_thresholds).reshape(approach.shape)
+
+    volume_cols = [f"{a}_volume" for a in APPROACHES]
+    score_cols = [f"{a}_score_sum" for a in APPROACHES]
+    matrix = np.column_stack([counts, approach, total, approach_score, total_score, np.ones(len(counts), counts.dtype)])
+    columns = MOVEMENT_COLUMNS + volume_cols + ["total_volume"] + score_cols + ["score_sum", "intervals"]
+
+    keys = pd.DataFrame({"INTID": df["INTID"].to_numpy(), "hour": df["datetime"].dt.floor("h").to_numpy()})
+    sums = pd.DataFrame(matrix, columns=columns).groupby([keys["INTID"], keys["hour"]], sort=True).sum()
+
+    out = sums[MOVEMENT_COLUMNS + volume_cols + ["total_volume"]].reset_index()
+    intervals = sums["intervals"].to_numpy()
+    for a, score_col in zip(APPROACHES, score_cols):
+        score = np.round(sums[score_col].to_numpy() / intervals).astype("int64")
+        out[f"{a}_los_score"] = score
+        out[f"{a}_LOS"] = pd.Series(score).map(SCORE_TO_LOS).to_numpy()
+    out["los_score"] = np.round(sums["score_sum"].to_numpy() / intervals).astype("int64")
+    out["LOS"] = out["los_score"].map(SCORE_TO_LOS)
+    return out
+
+
+def worst_approach(breakdown: pd.DataFrame) -> pd.Series:
+    """Name of the approach with the highest LOS score in each row (ties go to the heavier volume)."""
+    scores = breakdown[[f"{a}_los_score" for a in APPROACHES]].to_numpy()
+    volumes = breakdown[[f"{a}_volume" for a in APPROACHES]].to_numpy()
+    # Rank by score first, volume second, in one argmax
+    key = scores * (volumes.max(initial=0) + 1) + volumes
+    return pd.Series(np.array(APPROACHES)[key.argmax(axis=1)], index=breakdown.index)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Hourly LOS per intersection, approach (NB/SB/EB/WB) and movement.")
+    parser.add_argument("--csv", default="VehicleVolume_1Wal_2Hwy_4Hwy_11162025_11222025.csv", help="Path to input CSV")
+    parser.add_argument("--out", default="los_by_approach.csv", help="Path to save the wide hourly breakdown")
+    parser.add_argument("--thresholds", default="", help="Comma-separated intersection 15-min volume upper bounds for A..E")
+    parser.add_argument(
+        "--approach-thresholds",
+        default="",
+        help=f"Comma-separated approach 15-min volume upper bounds for A..E (default: intersection bounds x {APPROACH_SHARE})",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        thresholds = parse_thresholds(args.thresholds) if args.thresholds else LOS_THRESHOLDS
+        approach_thresholds = parse_thresholds(args.approach_thresholds) if args.approach_thresholds else None
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    try:
+        df = load_and_prepare(args.csv, compact=True)
+    except FileNotFoundError as exc:
+        print(exc)
+        return 1
+
+    breakdown = compute_hourly_breakdown(df, thresholds, approach_thresholds)
+    breakdown.to_csv(args.out, index=False)
+
+    # Terminal summary: how often each approach is the failing leg, per intersection
+    failing = breakdown.assign(worst_leg=worst_approach(breakdown))
+    counts = failing.groupby(["INTID", "worst_leg"]).size().unstack(fill_value=0).reindex(columns=APPROACHES, fill_value=0)
+    header = f"{'INTID':<6} " + " ".join(f"{a:>5}" for a in APPROACHES)
+    lines = ["Hours in which each approach has the worst LOS:", header, "-" * len(header)]
+    lines += [
+        f"{str(intid):<6} " + " ".join(f"{n:>5}" for n in row)
+        for intid, row in zip(counts.index.tolist(), counts.to_numpy(dtype="int64").tolist())
+    ]
+    lines += ["", f"Saved hourly approach/movement breakdown to {args.out}"]
+    write_lines(lines)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import pandas as pd
+
+from los_calc import LOS_THRESHOLDS, MOVEMENT_COLUMNS, Thresholds, compact_intervals, compute_hourly_los, load_and_prepare
+
+
+DEFAULT_EXPORT_PATTERN = "VehicleVolume_*.csv"
+
+
+def discover_exports(source: str, pattern: str = DEFAULT_EXPORT_PATTERN) -> List[str]:
+    """
+    Resolve a directory (matched against pattern) or a glob into a sorted list of CSV paths.
+    Sorting fixes the processing order, which also decides which file wins on overlaps.
+    """
+    if os.path.isdir(source):
+        paths = glob.glob(os.path.join(source, pattern))
+    else:
+        paths = glob.glob(source, recursive=True)
+    paths = sorted(p for p in paths if os.path.isfile(p))
+    if not paths:
+        raise FileNotFoundError(f"No export CSVs found for {source}")
+    return paths
+
+
+def _prepare_intervals(csv_path: str) -> pd.DataFrame:
+    """Worker: parse one export and keep only what the hourly computation needs."""
+    df = load_and_prepare(csv_path)
+    out = df.loc[df["datetime"].notna() & df["INTID"].notna(), ["INTID", "datetime"] + MOVEMENT_COLUMNS]
+    out.attrs = dict(df.attrs)
+    return out
+
+
+def load_exports(paths: List[str], workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Parse every export (in a process pool when workers > 1) and combine them into one
+    compact frame. An interval present in several files (overlapping export windows) is
+    taken from the last file in sorted order; repeated rows within one file are all kept,
+    as they are when that file is processed on its own.
+
+    attrs carries every file's counts: 'bad_lines' summed, 'unparsed_rows' as 'file:row'.
+    """
+    if workers == 1 or len(paths) == 1:
+        frames = [_prepare_intervals(p) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map() yields in submission order, so the result is independent of scheduling
+            frames = list(pool.map(_prepare_intervals, paths))
+
+    combined = pd.concat([f.assign(_file=i) for i, f in enumerate(frames)], ignore_index=True)
+    # Keep each (INTID, datetime) only from the last file that has it
+    last_file = combined.groupby(["INTID", "datetime"], sort=False)["_file"].transform("max")
+    combined = combined[combined["_file"] == last_file].drop(columns="_file")
+    combined = combined.sort_values(["INTID", "datetime"], kind="stable").reset_index(drop=True)
+
+    # Compact once, after concatenating, so INTID gets one dtype for all files
+    out = compact_intervals(combined)
+    out.attrs = {
+        "bad_lines": sum(f.attrs.get("bad_lines", 0) for f in frames),
+        "unparsed_rows": [
+            f"{os.path.basename(path)}:{row}" for path, f in zip(paths, frames) for row in f.attrs.get("unparsed_rows", [])
+        ],
+    }
+    return out
+
+
+def compute_batch_hourly_los(
+    source: str, workers: Optional[int] = None, thresholds: Thresholds = LOS_THRESHOLDS
+) -> pd.DataFrame:
+    """Hourly LOS over every export matched by source, ordered by INTID then hour."""
+    df = load_exports(discover_exports(source), workers=workers)
+    grouped = compute_hourly_los(df, thresholds)
+    grouped = grouped.sort_values(["INTID", "hour"]).reset_index(drop=True)
+    grouped.attrs = dict(df.attrs)
+    return grouped
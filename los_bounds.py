@@ -0,0 +1,19 @@
+from typing import List, Tuple
+
+# Kept free of pandas/numpy: average_los_by_intersection.py parses --bands before deciding whether it needs them
+
+
+def parse_bounds(text: str, name: str = "Thresholds") -> List[Tuple[float, str]]:
+    """
+    Comma-separated upper bounds for A, B, C, ... in order, e.g. "100,200,350,500,700",
+    as (bound, letter) pairs; values above the last bound are F. `name` labels the errors.
+    """
+    try:
+        bounds = [float(x) for x in text.split(",") if x.strip()]
+    except ValueError:
+        raise ValueError(f"{name} must be comma-separated numbers, got: {text!r}")
+    if not 1 <= len(bounds) <= 5:
+        raise ValueError(f"Expected 1-5 {name.lower()} (A..E), got {len(bounds)}")
+    if any(hi <= lo for lo, hi in zip(bounds, bounds[1:])):
+        raise ValueError(f"{name} must be strictly increasing: {bounds}")
+    return list(zip(bounds, "ABCDE"))
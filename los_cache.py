@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from los_calc import LOS_THRESHOLDS, MOVEMENT_COLUMNS, Thresholds, compute_hourly_los, load_and_prepare
+
+
+# Bump when the cached layout or the preparation logic changes so stale entries are rebuilt
+CACHE_VERSION = 2
+DEFAULT_CACHE_DIR = ".los_cache"
+
+# Compact on-disk dtypes; anything that does not fit is stored as float64 instead
+INTID_DTYPE = "int16"
+COUNT_DTYPE = "uint16"
+VOLUME_DTYPE = "uint32"
+
+
+def _file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _cache_path(cache_dir: str, kind: str, source_path: str) -> str:
+    key = hashlib.sha1(os.path.abspath(source_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{kind}-{key}.npz")
+
+
+def _fits(values: np.ndarray, dtype: str) -> bool:
+    """True when every value is a finite integer representable in the integer dtype."""
+    if values.size == 0:
+        return True
+    if not np.all(np.isfinite(values)) or not np.all(np.mod(values, 1) == 0):
+        return False
+    info = np.iinfo(dtype)
+    return values.min() >= info.min and values.max() <= info.max
+
+
+def _encode_column(series: pd.Series, dtype: Optional[str]) -> Tuple[Dict[str, np.ndarray], dict]:
+    """
+    Arrays to store for one column plus the meta needed to rebuild it with its original
+    dtype: numbers and datetimes as typed arrays, anything else (text, categorical or
+    mixed INTIDs) as integer codes into its distinct values, with -1 for missing.
+    """
+    info = {"dtype": str(series.dtype)}
+    if pd.api.types.is_datetime64_any_dtype(series) and series.dt.tz is None:
+        return {"values": series.to_numpy(dtype="datetime64[ns]")}, info
+    if pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype):
+        values = series.to_numpy(dtype="float64", na_value=np.nan)
+        if dtype is not None and _fits(values, dtype):
+            values = values.astype(dtype)
+        return {"values": values}, info
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    # Distinct values go into the JSON meta so ints, floats and strings keep their types
+    info["uniques"] = json.loads(json.dumps(np.asarray(uniques, dtype=object).tolist(), default=str))
+    return {"codes": codes.astype("int32")}, info
+
+
+def _decode_column(data, name: str, info: dict) -> pd.Series:
+    dtype = info["dtype"]
+    if "uniques" not in info:
+        values = data[f"col:{name}"]
+        return pd.Series(values if str(values.dtype) == dtype else values.astype(dtype))
+    codes = data[f"codes:{name}"]
+    if dtype == "category":
+        return pd.Series(pd.Categorical.from_codes(codes, categories=info["uniques"]))
+    values = np.array(info["uniques"] + [np.nan], dtype=object)[codes]
+    return pd.Series(values, dtype=None if dtype == "object" else dtype)
+
+
+def _write_frame(path: str, df: pd.DataFrame, dtypes: Dict[str, Optional[str]], meta: dict) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    arrays, columns = {}, {}
+    for c in df.columns:
+        encoded, columns[c] = _encode_column(df[c], dtypes.get(c))
+        arrays.update({f"{part}:{c}": values for part, values in encoded.items() if part != "values"})
+        if "values" in encoded:
+            arrays[f"col:{c}"] = encoded["values"]
+    meta = dict(meta, columns=columns, version=CACHE_VERSION)
+    # Write to a temp file first so a crashed run never leaves a truncated cache entry
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, __meta__=np.array(json.dumps(meta)), **arrays)
+    os.replace(tmp_path, path)
+
+
+def _read_frame(path: str, source_path: str) -> Optional[pd.DataFrame]:
+    """Return the cached frame if it is still valid for source_path, otherwise None."""
+    if not os.path.isfile(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["__meta__"]))
+            if meta.get("version") != CACHE_VERSION:
+                return None
+            st = os.stat(source_path)
+            if (meta.get("size"), meta.get("mtime_ns")) != (st.st_size, st.st_mtime_ns):
+                # Touched or copied files keep their cache when the content is unchanged
+                if meta.get("size") != st.st_size or meta.get("sha256") != _file_digest(source_path):
+                    return None
+            return pd.DataFrame({c: _decode_column(data, c, info) for c, info in meta["columns"].items()})
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _cached(
+    kind: str,
+    source_path: str,
+    cache_dir: str,
+    build: Callable[[], pd.DataFrame],
+    dtypes: Dict[str, Optional[str]],
+) -> pd.DataFrame:
+    if not os.path.isfile(source_path):
+        raise FileNotFoundError(f"CSV not found: {source_path}")
+
+    path = _cache_path(cache_dir, kind, source_path)
+    df = _read_frame(path, source_path)
+    if df is not None:
+        return df
+
+    st = os.stat(source_path)
+    df = build()
+    meta = {
+        "kind": kind,
+        "source": os.path.abspath(source_path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": _file_digest(source_path),
+    }
+    _write_frame(path, df, dtypes, meta)
+    # Return the frame as it reads back from the cache so hits and misses look the same;
+    # if the source changed while building, the entry is stale and the built frame is used
+    cached = _read_frame(path, source_path)
+    return df if cached is None else cached
+
+
+def _prepared_frame(csv_path: str) -> pd.DataFrame:
+    return load_and_prepare(csv_path, compact=True)
+
+
+def cached_prepare(csv_path: str, cache_dir: str = DEFAULT_CACHE_DIR) -> pd.DataFrame:
+    """
+    load_and_prepare(csv_path) backed by a typed .npz cache keyed by the source file.
+    The counts are stored as uint16 and INTID as int16 where they fit, and every column is
+    restored to its load_and_prepare(compact=True) dtype; the raw DATE/TIME strings and
+    rows without a timestamp are not stored.
+    """
+    dtypes = {"INTID": INTID_DTYPE, **{c: COUNT_DTYPE for c in MOVEMENT_COLUMNS}}
+    return _cached("prepared", csv_path, cache_dir, lambda: _prepared_frame(csv_path), dtypes)
+
+
+def cached_hourly_los(
+    csv_path: str, cache_dir: str = DEFAULT_CACHE_DIR, thresholds: Thresholds = LOS_THRESHOLDS
+) -> pd.DataFrame:
+    """compute_hourly_los for a raw export, reusing the cached hourly and prepared frames."""
+    dtypes = {"INTID": INTID_DTYPE, "total_volume": VOLUME_DTYPE, "los_score": "int8", "LOS": None}
+    kind = "hourly"
+    if list(thresholds) != list(LOS_THRESHOLDS):
+        # Hourly scores depend on the threshold table; keep one entry per table
+        table = ",".join(f"{t:g}{los}" for t, los in thresholds)
+        kind += "-" + hashlib.sha1(table.encode("utf-8")).hexdigest()[:8]
+    return _cached(
+        kind,
+        csv_path,
+        cache_dir,
+        lambda: compute_hourly_los(cached_prepare(csv_path, cache_dir), thresholds),
+        dtypes,
+    )
+
+
+def _results_frame(results_csv: str) -> pd.DataFrame:
+    df = pd.read_csv(results_csv)
+    if "hour" in df.columns:
+        df["hour"] = pd.to_datetime(df["hour"], errors="coerce")
+    return df
+
+
+def cached_results(results_csv: str, cache_dir: str = DEFAULT_CACHE_DIR) -> pd.DataFrame:
+    """
+    Read an hourly results CSV (los_results.csv) with 'hour' already parsed to datetime64.
+    The parsed frame is cached, so repeated summary/plot runs skip the CSV and date parsing.
+    """
+    dtypes = {"INTID": INTID_DTYPE, "total_volume": VOLUME_DTYPE, "los_score": "int8", "LOS": None}
+    return _cached("results", results_csv, cache_dir, lambda: _results_frame(results_csv), dtypes)
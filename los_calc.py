@@ -1,7 +1,15 @@
 import argparse
 import os
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
 import pandas as pd
 
+from los_bounds import parse_bounds
+from los_format import hourly_lines, write_csv, write_lines
+from los_profile import add_profile_arguments, profiling, stage
+
+
 MOVEMENT_COLUMNS = [
     "NBL", "NBT", "NBR",
     "SBL", "SBT", "SBR",
@@ -20,20 +28,39 @@ LOS_THRESHOLDS = [
 ]
 
 LOS_TO_SCORE = {"A": 1, "B": 2, "C": 3, "D": 4, "E": 5, "F": 6}
+SCORE_TO_LOS = {v: k for k, v in LOS_TO_SCORE.items()}
+
+Thresholds = Sequence[Tuple[float, str]]
+
+
+def parse_thresholds(text: str) -> List[Tuple[float, str]]:
+    """
+    Parse a CLI threshold table: comma-separated upper bounds for A, B, C, ... in order,
+    e.g. "100,200,350,500,700". Volumes above the last bound are F.
+    """
+    return parse_bounds(text, "Thresholds")
+
+
+def classify_volumes(volumes, thresholds: Thresholds = LOS_THRESHOLDS) -> np.ndarray:
+    """
+    Vectorized LOS classification: integer scores (1-6) for an array of volumes.
+    A volume takes the first band whose upper bound it does not exceed; anything above
+    the last bound (or NaN) is F, matching compute_los_from_volume.
+    """
+    bounds = np.array([t for t, _ in thresholds], dtype="float64")
+    band_scores = np.array([LOS_TO_SCORE[los] for _, los in thresholds] + [LOS_TO_SCORE["F"]], dtype="int8")
+    return band_scores[np.searchsorted(bounds, np.asarray(volumes, dtype="float64"), side="left")]
 
 
-def compute_los_from_volume(total_vol: float) -> str:
-    for threshold, los in LOS_THRESHOLDS:
-        if total_vol <= threshold:
-            return los
-    return "F"
+def compute_los_from_volume(total_vol: float, thresholds: Thresholds = LOS_THRESHOLDS) -> str:
+    return SCORE_TO_LOS[int(classify_volumes([total_vol], thresholds)[0])]
 
 
-def load_and_prepare(csv_path: str) -> pd.DataFrame:
+def _find_header_line(csv_path: str) -> int:
+    """Return the 0-based index of the DATE,TIME,INTID header row."""
     if not os.path.isfile(csv_path):
         raise FileNotFoundError(f"CSV not found: {csv_path}")
 
-    # Detect header row
     header_line_idx = None
     total_lines = 0
     with open(csv_path, "r", encoding="utf-8", errors="ignore") as f:
@@ -42,32 +69,96 @@ def load_and_prepare(csv_path: str) -> pd.DataFrame:
             if "DATE" in line and "TIME" in line and "INTID" in line:
                 header_line_idx = i
                 break
-    
+
     if header_line_idx is None:
         raise ValueError(
             f"Could not find header row with DATE,TIME,INTID columns in {csv_path}.\n"
             f"File has {total_lines} lines. Please check the CSV format."
         )
+    return header_line_idx
 
-    # Read with the detected header row
-    # skiprows expects lines to skip BEFORE reading header
-    skip_lines = list(range(header_line_idx))
-    df = pd.read_csv(
-        csv_path,
-        sep=",",
-        engine="python",
-        skiprows=skip_lines,
-        header=0,
-        index_col=False,
-        on_bad_lines="skip",
-        skipinitialspace=True,
+
+def _time_of_day_minutes(raw) -> float:
+    """
+    Decode one TIME value to minutes after midnight, or NaN if it is not a valid time.
+    Accepts Excel-style ="0715", plain 715/0715, 07:15 and 07:15:00 forms.
+    """
+    if isinstance(raw, float):
+        if np.isnan(raw):
+            return np.nan
+        if raw.is_integer():
+            raw = int(raw)
+    digits = "".join(ch for ch in str(raw) if ch.isdigit())
+    if not digits or len(digits) > 6 or len(digits) == 5:
+        return np.nan
+    value = int(digits)
+    if len(digits) == 6:
+        # HHMMSS: seconds are dropped, counts are reported on minute boundaries
+        value //= 100
+    hh, mm = divmod(value, 100)
+    if hh > 23 or mm > 59:
+        return np.nan
+    return float(hh * 60 + mm)
+
+
+def _parse_dates(values: pd.Index) -> np.ndarray:
+    """Parse unique DATE strings to datetime64[ns]; MM/DD/YYYY first, generic parsing for the rest."""
+    dates = pd.to_datetime(values, format="%m/%d/%Y", errors="coerce")
+    if dates.isna().any():
+        import warnings
+        retry = dates.isna()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            fallback = pd.to_datetime(values, errors="coerce", format="mixed")
+        dates = dates.where(~retry, fallback)
+    # Only the calendar day is taken from DATE; the time of day comes from TIME
+    return dates.floor("D").values.astype("datetime64[ns]")
+
+
+def decode_timestamps(date: pd.Series, time: pd.Series) -> Tuple[pd.Series, pd.Series, np.ndarray]:
+    """
+    Build interval timestamps from the DATE and TIME export columns.
+
+    Each distinct DATE/TIME string is decoded once (a week of 15-minute counts has 7 dates
+    and 96 times regardless of row count) and the results are broadcast back with integer
+    codes. Returns (datetime, normalized "HH:MM" TIME, mask of rows that could not be parsed);
+    unparseable rows get NaT/NaN instead of being defaulted to midnight.
+    """
+    date_codes, date_uniques = pd.factorize(date, use_na_sentinel=True)
+    time_codes, time_uniques = pd.factorize(time, use_na_sentinel=True)
+
+    # A trailing NaT/NaN slot lets the -1 sentinel code index straight into "unparsed"
+    date_values = np.append(
+        _parse_dates(pd.Index(date_uniques.astype(str)).str.strip()),
+        np.datetime64("NaT", "ns"),
+    )
+    minutes = np.append(
+        np.array([_time_of_day_minutes(t) for t in time_uniques], dtype="float64"),
+        np.nan,
     )
-    
+
+    day = date_values[date_codes]
+    offset = minutes[time_codes]
+    bad = np.isnat(day) | np.isnan(offset)
+
+    stamps = day + np.where(bad, 0, offset).astype("int64").astype("timedelta64[m]")
+    stamps[bad] = np.datetime64("NaT", "ns")
+
+    labels = np.array(
+        [f"{int(m) // 60:02d}:{int(m) % 60:02d}" if not np.isnan(m) else np.nan for m in minutes],
+        dtype=object,
+    )
+    return (
+        pd.Series(stamps, index=date.index, name="datetime"),
+        pd.Series(labels[time_codes], index=time.index, name="TIME"),
+        bad,
+    )
+
+
+def _normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize a raw export frame (or chunk): columns, TIME, datetime and movements."""
     # Drop any unnamed columns (from trailing commas)
     df = df.loc[:, ~df.columns.str.contains('^Unnamed', na=False)]
-    
-    if df.empty:
-        raise ValueError(f"No data rows found in {csv_path} after parsing.")
 
     # Ensure required columns
     expected_cols = ["DATE", "TIME", "INTID"] + MOVEMENT_COLUMNS
@@ -77,54 +168,197 @@ def load_and_prepare(csv_path: str) -> pd.DataFrame:
             df[col] = 0
     df = df[expected_cols]
 
-    # Normalize TIME like ="0000" -> 00:00
-    t = df["TIME"].astype(str).str.strip()
-    t = t.str.replace('="', '', regex=False).str.replace('"', '', regex=False).str.replace('=', '', regex=False)
-    t = t.str.replace(r"[^0-9]", "", regex=True).str.zfill(4)
-    t = t.str.replace(r"^(\d{2})(\d{2})$", r"\1:\2", regex=True)
-    t = t.where(t.str.match(r"^\d{2}:\d{2}$"), "00:00")
-    df["TIME"] = t
-
-    # Build datetime
-    combo = (df["DATE"].astype(str).str.strip() + " " + df["TIME"].astype(str).str.strip()).str.strip()
-    dt = pd.to_datetime(combo, format="%m/%d/%Y %H:%M", errors="coerce")
-    if dt.isna().all():
-        dt = pd.to_datetime(combo, format="%m/%d/%Y %H:%M:%S", errors="coerce")
-    if dt.isna().all():
-        import warnings
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            dt = pd.to_datetime(combo, errors="coerce")
-    if dt.isna().all():
-        dt = pd.to_datetime(df["DATE"].astype(str).str.strip(), format="%m/%d/%Y", errors="coerce").dt.floor("D")
+    # Decode DATE + TIME (including Excel ="0000" TIME values) in one pass
+    with stage("decode timestamps", rows=len(df)):
+        dt, time_labels, bad = decode_timestamps(df["DATE"], df["TIME"])
+    df["TIME"] = time_labels
     df["datetime"] = dt
+    df.attrs["unparsed_rows"] = df.index[bad].tolist()
 
     # Coerce movements numeric
-    for col in MOVEMENT_COLUMNS:
-        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+    with stage("coerce movements", rows=len(df)):
+        for col in MOVEMENT_COLUMNS:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
 
     return df
 
 
-def compute_hourly_los(df: pd.DataFrame) -> pd.DataFrame:
-    df["hour"] = df["datetime"].dt.floor("h")
-    df["total_volume"] = df[MOVEMENT_COLUMNS].sum(axis=1)
-    
-    # Compute LOS for each 15-min interval
-    df["LOS"] = df["total_volume"].apply(compute_los_from_volume)
-    df["los_score"] = df["LOS"].map(LOS_TO_SCORE)
-    
-    # Group by INTID and hour, take average of 15-min scores
-    grouped = df.groupby(["INTID", "hour"], as_index=False).agg({
-        "total_volume": "sum",
-        "los_score": "mean"
-    })
-    
+def load_and_prepare(csv_path: str, compact: bool = False) -> pd.DataFrame:
+    """
+    Read a turning movement export into a frame with DATE, TIME, INTID, the movement
+    columns and a parsed datetime. compact=True returns compact_intervals() of it.
+    """
+    with stage("find header"):
+        header_line_idx = _find_header_line(csv_path)
+
+    # Read with the detected header row
+    # skiprows expects lines to skip BEFORE reading header
+    skip_lines = list(range(header_line_idx))
+    # Malformed lines are still skipped, but counted so callers can report them
+    bad_lines: List[List[str]] = []
+    with stage("read_csv") as st:
+        df = pd.read_csv(
+            csv_path,
+            sep=",",
+            engine="python",
+            skiprows=skip_lines,
+            header=0,
+            index_col=False,
+            on_bad_lines=bad_lines.append,
+            skipinitialspace=True,
+        )
+        st["rows"] = len(df)
+
+    if df.empty:
+        raise ValueError(f"No data rows found in {csv_path} after parsing.")
+
+    with stage("normalize", rows=len(df)):
+        df = _normalize_frame(df)
+    df.attrs["bad_lines"] = len(bad_lines)
+    if compact:
+        with stage("compact", rows=len(df)):
+            df = compact_intervals(df)
+    return df
+
+
+def _smallest_uint(values: np.ndarray) -> Optional[str]:
+    """Smallest unsigned dtype holding every value exactly, or None for fractional/negative data."""
+    if values.size and (values.min() < 0 or not np.array_equal(values, np.floor(values))):
+        return None
+    peak = values.max() if values.size else 0
+    for dtype in ("uint16", "uint32"):
+        if peak <= np.iinfo(dtype).max:
+            return dtype
+    return None
+
+
+def compact_intervals(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compact in-memory form of prepared interval data: INTID as the smallest integer type
+    (categorical when INTIDs are not integers), movement counts as uint16 (uint32 if a
+    count does not fit, float64 when counts are fractional or negative), datetime kept, raw DATE/TIME text and rows without a timestamp
+    dropped. Accepted everywhere a load_and_prepare frame is.
+    """
+    out = df.dropna(subset=["datetime"])
+    out = out[["INTID", "datetime"] + MOVEMENT_COLUMNS].reset_index(drop=True)
+
+    intid = pd.to_numeric(out["INTID"], errors="coerce")
+    if intid.notna().all() and (intid == intid.round()).all():
+        out["INTID"] = pd.to_numeric(intid.astype("int64"), downcast="integer")
+    else:
+        out["INTID"] = out["INTID"].astype("category")
+
+    for col in MOVEMENT_COLUMNS:
+        values = out[col].to_numpy(dtype="float64")
+        dtype = _smallest_uint(values)
+        # Fractional counts stay float64: float32 rounds large totals and can change the LOS
+        out[col] = values.astype(dtype) if dtype else values
+
+    out.attrs = dict(df.attrs)
+    return out
+
+
+def memory_footprint(df: pd.DataFrame) -> int:
+    """Bytes used by the frame including string contents."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def iter_prepared_chunks(csv_path: str, chunksize: int = 100_000, engine: str = "c") -> Iterator[pd.DataFrame]:
+    """
+    Stream the export in bounded chunks, yielding frames normalized like load_and_prepare.
+    Uses the C parser by default; pass engine="python" for files it cannot handle.
+    """
+    header_line_idx = _find_header_line(csv_path)
+
+    reader = pd.read_csv(
+        csv_path,
+        sep=",",
+        engine=engine,
+        skiprows=header_line_idx,
+        header=0,
+        index_col=False,
+        on_bad_lines="skip",
+        skipinitialspace=True,
+        dtype={"DATE": str, "TIME": str},
+        chunksize=chunksize,
+    )
+    seen_rows = False
+    with reader:
+        for chunk in reader:
+            if chunk.empty:
+                continue
+            seen_rows = True
+            yield _normalize_frame(chunk)
+
+    if not seen_rows:
+        raise ValueError(f"No data rows found in {csv_path} after parsing.")
+
+
+def _hourly_partials(df: pd.DataFrame, thresholds: Thresholds = LOS_THRESHOLDS) -> pd.DataFrame:
+    """Per (INTID, hour) volume sum, 15-min score sum and interval count; partials can be summed across chunks."""
+    # Work on a small derived frame so compact inputs are not widened in place
+    with stage("score intervals", rows=len(df)):
+        total_volume = df[MOVEMENT_COLUMNS].sum(axis=1).to_numpy(dtype="float64")
+        intervals = pd.DataFrame({
+            "INTID": df["INTID"].to_numpy(),
+            "hour": df["datetime"].dt.floor("h").to_numpy(),
+            "total_volume": total_volume,
+            # Score each 15-min interval; letters are only materialized for the hourly output
+            "los_score": classify_volumes(total_volume, thresholds),
+        })
+        if isinstance(df["INTID"].dtype, pd.CategoricalDtype):
+            intervals["INTID"] = intervals["INTID"].astype(df["INTID"].dtype)
+
+    with stage("groupby", rows=len(intervals)):
+        return intervals.groupby(["INTID", "hour"], as_index=False, observed=True).agg(
+            total_volume=("total_volume", "sum"),
+            score_sum=("los_score", "sum"),
+            intervals=("los_score", "count"),
+        )
+
+
+def _combine_partials(parts: List[pd.DataFrame]) -> pd.DataFrame:
+    combined = pd.concat(parts, ignore_index=True)
+    return combined.groupby(["INTID", "hour"], as_index=False)[["total_volume", "score_sum", "intervals"]].sum()
+
+
+def _finalize_hourly(partials: pd.DataFrame) -> pd.DataFrame:
+    grouped = partials[["INTID", "hour", "total_volume"]].copy()
+
     # Round average score and map back to LOS letter
-    grouped["los_score"] = grouped["los_score"].round().astype(int)
-    score_to_los = {v: k for k, v in LOS_TO_SCORE.items()}
-    grouped["LOS"] = grouped["los_score"].map(score_to_los)
-    
+    grouped["los_score"] = (partials["score_sum"] / partials["intervals"]).round().astype(int)
+    grouped["LOS"] = grouped["los_score"].map(SCORE_TO_LOS)
+
+    return grouped
+
+
+def compute_hourly_los(df: pd.DataFrame, thresholds: Thresholds = LOS_THRESHOLDS) -> pd.DataFrame:
+    # Group by INTID and hour, take average of 15-min scores
+    return _finalize_hourly(_hourly_partials(df, thresholds))
+
+
+def compute_hourly_los_streaming(
+    csv_path: str,
+    chunksize: int = 100_000,
+    engine: str = "c",
+    thresholds: Thresholds = LOS_THRESHOLDS,
+) -> pd.DataFrame:
+    """
+    Chunked equivalent of compute_hourly_los(load_and_prepare(csv_path)).
+    Only per-hour partial sums are kept between chunks, so peak memory is bounded
+    by the chunk size plus the hourly output rather than the size of the file.
+    """
+    pending: List[pd.DataFrame] = []
+    unparsed_rows: List[int] = []
+    for chunk in iter_prepared_chunks(csv_path, chunksize=chunksize, engine=engine):
+        unparsed_rows.extend(chunk.attrs.get("unparsed_rows", []))
+        pending.append(_hourly_partials(chunk, thresholds))
+        # Hours can straddle chunk boundaries; fold partials together periodically
+        if len(pending) >= 8:
+            pending = [_combine_partials(pending)]
+
+    grouped = _finalize_hourly(_combine_partials(pending))
+    grouped.attrs["unparsed_rows"] = unparsed_rows
     return grouped
 
 
@@ -137,21 +371,168 @@ def main():
     default_csv = next((p for p in default_candidates if os.path.isfile(p)), default_candidates[0])
     parser.add_argument("--csv", default=default_csv, help="Path to input CSV")
     parser.add_argument("--out", default="los_results.csv", help="Optional output CSV")
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=0,
+        help="Stream the CSV in chunks of this many rows (bounded memory); 0 reads the whole file",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default="",
+        help="Reuse/store typed binary caches of the prepared and hourly frames in this directory",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only ingest intervals newer than the recorded watermark and merge them into --out",
+    )
+    parser.add_argument(
+        "--state",
+        default="",
+        help="Watermark state file for --incremental (default: --out with a .state.json extension)",
+    )
+    parser.add_argument(
+        "--batch",
+        default="",
+        help="Directory or glob of export CSVs to combine into one hourly output (overrides --csv)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for --batch parsing (default: CPU count; 1 disables the pool)",
+    )
+
+    parser.add_argument(
+        "--memory-report",
+        action="store_true",
+        help="Print the in-memory size of the prepared interval data",
+    )
+    parser.add_argument(
+        "--thresholds",
+        default="",
+        help="Comma-separated 15-min volume upper bounds for A..E (default: 100,200,350,500,700)",
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Do not print the hourly rows (results are still saved)",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="Print only the first N hourly rows",
+    )
+    parser.add_argument(
+        "--db",
+        default="",
+        help="Also store the 15-minute and hourly results in this SQLite database (created if missing)",
+    )
+    add_profile_arguments(parser)
 
     args = parser.parse_args()
 
-    df = load_and_prepare(args.csv)
-    grouped = compute_hourly_los(df)
+    try:
+        thresholds = parse_thresholds(args.thresholds) if args.thresholds else LOS_THRESHOLDS
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    if args.incremental and not args.out:
+        parser.error("--incremental requires --out (the result store to update)")
+
+    with profiling(args, "los_calc"):
+        run(args, thresholds)
+
+
+def run(args: argparse.Namespace, thresholds: Thresholds) -> None:
+    if args.incremental:
+        from los_incremental import run_incremental
+
+        with stage("incremental update"):
+            updated = run_incremental(args.csv, args.out, state_path=args.state or None, thresholds=thresholds)
+        print(f"Updated {len(updated)} hourly rows:")
+        if not args.quiet:
+            with stage("print", rows=len(updated)):
+                write_lines(hourly_lines(updated), limit=args.limit)
+        if updated.empty:
+            return
+        print(f"Merged results into {args.out}")
+        if args.db:
+            from los_db import write_results
 
-    rows = grouped.sort_values(["INTID", "hour"])
-    print("Hourly LOS by intersection:")
-    for _, row in rows.iterrows():
-        print(f"INTID {row['INTID']} | {row['hour']} | volume={int(row['total_volume'])} | LOS={row['LOS']} | score={int(row['los_score'])}")
+            with stage("store in SQLite", rows=len(updated)):
+                write_results(args.db, updated)
+            print(f"Merged results into {args.db}")
+        return
+
+    bad_lines = 0
+    if args.batch:
+        from los_batch import compute_batch_hourly_los
+
+        with stage("batch hourly LOS"):
+            grouped = compute_batch_hourly_los(args.batch, workers=args.workers, thresholds=thresholds)
+        unparsed_rows = grouped.attrs.get("unparsed_rows", [])
+        bad_lines = grouped.attrs.get("bad_lines", 0)
+        intervals = None
+    elif args.cache_dir:
+        from los_cache import cached_hourly_los, cached_prepare
+
+        with stage("hourly LOS (cached)"):
+            grouped = cached_hourly_los(args.csv, cache_dir=args.cache_dir, thresholds=thresholds)
+            unparsed_rows = []
+            intervals = cached_prepare(args.csv, cache_dir=args.cache_dir) if args.db else None
+    elif args.chunksize > 0:
+        with stage("streaming hourly LOS"):
+            grouped = compute_hourly_los_streaming(args.csv, chunksize=args.chunksize, thresholds=thresholds)
+        unparsed_rows = grouped.attrs.get("unparsed_rows", [])
+        # Chunks are not kept, so only the hourly rows can be stored
+        intervals = None
+    else:
+        with stage("load_and_prepare") as st:
+            df = load_and_prepare(args.csv)
+            st["rows"] = len(df)
+        unparsed_rows = df.attrs.get("unparsed_rows", [])
+        bad_lines = df.attrs.get("bad_lines", 0)
+        full_bytes = memory_footprint(df) if args.memory_report else 0
+        with stage("compact_intervals", rows=len(df)):
+            df = compact_intervals(df)
+        if args.memory_report:
+            print(
+                f"Prepared {len(df)} intervals: {memory_footprint(df) / 1e6:.2f} MB compact "
+                f"({full_bytes / 1e6:.2f} MB as parsed)"
+            )
+        with stage("compute_hourly_los", rows=len(df)):
+            grouped = compute_hourly_los(df, thresholds)
+        intervals = df
+
+    with stage("sort", rows=len(grouped)):
+        rows = grouped.sort_values(["INTID", "hour"])
+    if not args.quiet:
+        print("Hourly LOS by intersection:")
+        with stage("print", rows=len(rows)):
+            write_lines(hourly_lines(rows), limit=args.limit)
 
     if args.out:
-        rows.to_csv(args.out, index=False)
+        with stage("write csv", rows=len(rows)):
+            write_csv(rows, args.out)
         print(f"Saved results to {args.out}")
 
+    if args.db:
+        from los_db import write_results
+
+        with stage("store in SQLite", rows=len(rows)):
+            n_hourly, n_intervals = write_results(args.db, rows, intervals, thresholds)
+        print(f"Stored {n_hourly} hourly and {n_intervals} 15-minute rows in {args.db}")
+
+    if unparsed_rows:
+        preview = ", ".join(str(i) for i in unparsed_rows[:10])
+        more = " ..." if len(unparsed_rows) > 10 else ""
+        print(f"Warning: skipped {len(unparsed_rows)} rows with unparseable DATE/TIME (data rows {preview}{more})")
+    if bad_lines:
+        print(f"Warning: skipped {bad_lines} malformed CSV lines; run los_quality.py for a data-quality report")
+
 
 if __name__ == "__main__":
     main()
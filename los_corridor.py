@@ -0,0 +1,169 @@
+import argparse
+import sys
+from typing import Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from los_calc import LOS_TO_SCORE, SCORE_TO_LOS
+from los_format import to_hours, write_lines
+from los_registry import DEFAULT_REGISTRY, LEVELS, NETWORK, intid_key, load_registry, memberships
+
+
+LOS_LETTERS = list(LOS_TO_SCORE)  # A..F
+
+
+def _expand(row_codes: np.ndarray, pair_codes: np.ndarray, pair_groups: np.ndarray, n_codes: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Repeat every row once per group its INTID belongs to.
+    Returns (row positions, group codes) of the expanded rows; rows of unmapped INTIDs drop out.
+    """
+    order = np.argsort(pair_codes, kind="stable")
+    groups_sorted = pair_groups[order]
+    per_code = np.bincount(pair_codes, minlength=n_codes)
+    first = np.concatenate([[0], np.cumsum(per_code)[:-1]])
+    repeat = per_code[row_codes]
+    rows = np.repeat(np.arange(len(row_codes)), repeat)
+    # Position of each expanded row among its INTID's groups
+    within = np.arange(len(rows)) - np.repeat(np.cumsum(repeat) - repeat, repeat)
+    return rows, groups_sorted[first[row_codes[rows]] + within]
+
+
+def aggregate_groups(hourly: pd.DataFrame, pairs: Iterable[Tuple[object, str]], label: str = "corridor") -> pd.DataFrame:
+    """
+    Group-level hourly table from compute_hourly_los output and (INTID, group) memberships,
+    in one grouped pass over the hourly rows: per group and hour, the reporting
+    intersections, their summed volume, mean score with its letter (rounded like the
+    hourly LOS), the worst intersection LOS and how many intersections were at each LOS.
+    """
+    hours = to_hours(hourly["hour"])
+    scores = pd.to_numeric(hourly["los_score"], errors="coerce")
+    volume = pd.to_numeric(hourly["total_volume"], errors="coerce")
+    keep = (hours.notna() & scores.notna() & volume.notna() & hourly["INTID"].notna()).to_numpy()
+    intid_codes, intid_values = pd.factorize(hourly["INTID"][keep])
+    hour_codes, hour_values = pd.factorize(hours[keep], sort=True)
+    scores = scores.to_numpy()[keep].astype("int64")
+    volume = volume.to_numpy(dtype="float64")[keep]
+
+    # Membership pairs become (INTID code, group code) arrays; INTIDs absent from the data are ignored
+    code_of = {intid_key(v): i for i, v in enumerate(intid_values)}
+    pairs = [(code_of[intid_key(intid)], group) for intid, group in pairs if intid_key(intid) in code_of]
+    group_names = sorted({group for _, group in pairs})
+    group_code = {name: i for i, name in enumerate(group_names)}
+    pair_codes = np.array([c for c, _ in pairs], dtype="int64")
+    pair_groups = np.array([group_code[g] for _, g in pairs], dtype="int64")
+
+    rows, groups = _expand(intid_codes, pair_codes, pair_groups, len(intid_values))
+    key = groups * len(hour_values) + hour_codes[rows]
+    # Only (group, hour) cells that occur are materialised, so thousands of groups stay small
+    cells, cell_of_row = np.unique(key, return_inverse=True)
+    n_cells = len(cells)
+    count = np.bincount(cell_of_row, minlength=n_cells)
+    volume_sum = np.bincount(cell_of_row, weights=volume[rows], minlength=n_cells)
+    score_sum = np.bincount(cell_of_row, weights=scores[rows], minlength=n_cells)
+    los_counts = np.bincount(cell_of_row * 6 + scores[rows] - 1, minlength=n_cells * 6).reshape(n_cells, 6)
+
+    mean_score = score_sum / np.maximum(count, 1)
+    worst = 6 - np.argmax(los_counts[:, ::-1] > 0, axis=1)
+    out = pd.DataFrame(
+        {
+            label: np.asarray(group_names, dtype=object)[cells // len(hour_values)] if n_cells else np.array([], dtype=object),
+            "hour": np.asarray(hour_values)[cells % len(hour_values)] if n_cells else np.array([], dtype="datetime64[ns]"),
+            "intersections": count,
+            "total_volume": volume_sum,
+            "mean_score": mean_score,
+            "LOS": pd.Series(np.round(mean_score).astype("int64")).map(SCORE_TO_LOS).to_numpy(),
+            "worst_LOS": pd.Series(worst).map(SCORE_TO_LOS).to_numpy(),
+        }
+    )
+    for j, los in enumerate(LOS_LETTERS):
+        out[f"n_{los}"] = los_counts[:, j]
+    return out
+
+
+def summarize_groups(group_hourly: pd.DataFrame, label: str = "corridor") -> pd.DataFrame:
+    """Per group over the whole period: hours, volume, peak hour, mean score and the share of intersection-hours at each LOS."""
+    counts = [f"n_{los}" for los in LOS_LETTERS]
+    grouped = group_hourly.groupby(label, sort=True)
+    summary = grouped.agg(
+        hours=("hour", "size"),
+        max_intersections=("intersections", "max"),
+        total_volume=("total_volume", "sum"),
+        mean_hourly_volume=("total_volume", "mean"),
+    )
+    los_totals = grouped[counts].sum()
+    member_hours = los_totals.sum(axis=1)
+    weighted = (los_totals.to_numpy() * np.arange(1, 7)).sum(axis=1) / member_hours.to_numpy()
+    summary["mean_score"] = weighted
+    summary["LOS"] = pd.Series(np.round(weighted).astype("int64"), index=summary.index).map(SCORE_TO_LOS)
+    for los in LOS_LETTERS:
+        summary[f"share_{los}"] = los_totals[f"n_{los}"] / member_hours
+    peak = group_hourly.loc[grouped["total_volume"].idxmax()]
+    summary["peak_hour"] = peak["hour"].to_numpy()
+    summary["peak_volume"] = peak["total_volume"].to_numpy()
+    return summary.reset_index()
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Aggregate hourly LOS to corridors, zones or the whole network.")
+    parser.add_argument("--source", default="los_results.csv", help="Path to hourly LOS results CSV (default: los_results.csv)")
+    parser.add_argument("--db", default="", help="Read hourly LOS from this SQLite store (los_calc.py --db) instead of --source")
+    parser.add_argument("--registry", default="", help="JSON registry of INTID names, corridors and zones (default: names only, so corridor and zone levels need one)")
+    parser.add_argument("--level", choices=LEVELS, default="corridor", help="Aggregate by corridor, zone or the whole network (default: corridor)")
+    parser.add_argument("--out", default="", help="Path to save the hourly group table (default: <level>_hourly.csv)")
+    parser.add_argument("--summary-out", default="", help="Path to save the per-group summary (default: <level>_summary.csv)")
+    args = parser.parse_args(argv)
+
+    try:
+        registry = load_registry(args.registry) if args.registry else DEFAULT_REGISTRY
+    except (FileNotFoundError, ValueError, KeyError) as exc:
+        parser.error(f"Could not read registry: {exc}")
+
+    try:
+        if args.db:
+            from contextlib import closing
+
+            from los_db import connect, read_hourly
+
+            with closing(connect(args.db)) as conn:
+                hourly = read_hourly(conn)
+        else:
+            hourly = pd.read_csv(args.source)
+    except FileNotFoundError:
+        print(f"Source file not found: {args.db or args.source}. Run 'python los_calc.py' first to generate hourly LOS.")
+        return 1
+
+    if args.level == "network":
+        # Every INTID in the data counts towards the network, registered or not
+        pairs = [(intid, NETWORK) for intid in pd.unique(hourly["INTID"].dropna())]
+    else:
+        pairs = memberships(registry, args.level)
+    group_hourly = aggregate_groups(hourly, pairs, label=args.level)
+    summary = summarize_groups(group_hourly, label=args.level)
+
+    header = f"{args.level.title():<24} {'Ints':>4} {'Hours':>5} {'MeanVol':>8} {'Peak hour':<16} {'PeakVol':>7} {'LOS':<3} " + " ".join(
+        f"{los + '%':>3}" for los in LOS_LETTERS
+    )
+    lines = [f"{args.level.title()} LOS over all hours (last columns: % of intersection-hours at each LOS):", header, "-" * len(header)]
+    for row in summary.itertuples(index=False):
+        shares = " ".join(f"{round(getattr(row, f'share_{los}') * 100):>3}" for los in LOS_LETTERS)
+        lines.append(
+            f"{str(getattr(row, args.level)):<24} {row.max_intersections:>4} {row.hours:>5} {row.mean_hourly_volume:>8.0f} "
+            f"{pd.Timestamp(row.peak_hour):%Y-%m-%d %H:%M} {row.peak_volume:>7.0f} {row.LOS:<3} {shares}"
+        )
+    mapped = {intid_key(intid) for intid, _ in pairs}
+    unmapped = sorted({intid_key(v) for v in pd.unique(hourly["INTID"].dropna())} - mapped, key=str)
+    if unmapped:
+        lines.append(f"Not in any {args.level}: INTID {', '.join(str(i) for i in unmapped)}")
+    write_lines(lines)
+
+    out = args.out or f"{args.level}_hourly.csv"
+    summary_out = args.summary_out or f"{args.level}_summary.csv"
+    group_hourly.to_csv(out, index=False)
+    summary.to_csv(summary_out, index=False)
+    print(f"\nSaved {len(group_hourly)} {args.level}-hours to {out} and the summary to {summary_out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
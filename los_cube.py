@@ -0,0 +1,227 @@
+import argparse
+import os
+import sys
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from los_calc import LOS_TO_SCORE, SCORE_TO_LOS
+from los_format import to_hours
+
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+PERCENTILES = (50, 85, 95)
+LOS_LETTERS = list(LOS_TO_SCORE)  # A..F
+SLOTS = len(WEEKDAYS) * 24  # weekday x hour-of-day cells per INTID
+
+CUBE_COLUMNS = (
+    ["INTID", "weekday", "hour_of_day", "count", "mean_volume"]
+    + [f"p{q}_volume" for q in PERCENTILES]
+    + ["mean_score", "typical_LOS"]
+    + [f"share_{los}" for los in LOS_LETTERS]
+)
+
+
+def _group_percentiles(values: np.ndarray, starts: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+    """
+    Linear-interpolated percentile of every group of an array sorted within groups,
+    i.e. np.percentile(values[s:s+n], q) for each (s, n) without a Python loop.
+    """
+    pos = (counts - 1) * (q / 100.0)
+    lo = np.floor(pos).astype("int64")
+    frac = pos - lo
+    hi = np.minimum(lo + 1, counts - 1)
+    return values[starts + lo] + (values[starts + hi] - values[starts + lo]) * frac
+
+
+def build_cube(hourly: pd.DataFrame) -> pd.DataFrame:
+    """
+    INTID x weekday x hour-of-day aggregate of compute_hourly_los output in one vectorized pass:
+    number of hours, mean and percentile hourly volume, mean hourly LOS score with its letter
+    (rounded like the hourly LOS) and the share of hours at each LOS A..F.
+    Only cells with at least one hour are returned, ordered by INTID, weekday, hour.
+    """
+    hours = to_hours(hourly["hour"])
+    scores = pd.to_numeric(hourly["los_score"], errors="coerce")
+    volume = pd.to_numeric(hourly["total_volume"], errors="coerce")
+    keep = hours.notna().to_numpy() & scores.notna().to_numpy() & volume.notna().to_numpy() & hourly["INTID"].notna().to_numpy()
+    hours, scores, volume = hours[keep], scores.to_numpy()[keep].astype("int64"), volume.to_numpy(dtype="float64")[keep]
+    intid_codes, intids = pd.factorize(hourly["INTID"][keep], sort=True)
+
+    # One integer cell id per row: INTID, then weekday, then hour of day
+    cell = intid_codes * SLOTS + hours.dt.dayofweek.to_numpy() * 24 + hours.dt.hour.to_numpy()
+    n_cells = len(intids) * SLOTS
+    count = np.bincount(cell, minlength=n_cells)
+    volume_sum = np.bincount(cell, weights=volume, minlength=n_cells)
+    score_sum = np.bincount(cell, weights=scores, minlength=n_cells)
+    los_counts = np.bincount(cell * 6 + (scores - 1), minlength=n_cells * 6).reshape(n_cells, 6)
+
+    # Percentiles from one sort by (cell, volume); each cell is then a contiguous run
+    order = np.lexsort((volume, cell))
+    sorted_volume = volume[order]
+    present = np.flatnonzero(count)
+    starts = np.concatenate([[0], np.cumsum(count)])[present]
+    n = count[present]
+
+    mean_score = score_sum[present] / n
+    typical = np.round(mean_score).astype("int64")
+    cube = pd.DataFrame(
+        {
+            "INTID": np.asarray(intids)[present // SLOTS],
+            "weekday": (present % SLOTS) // 24,
+            "hour_of_day": present % 24,
+            "count": n,
+            "mean_volume": volume_sum[present] / n,
+        }
+    )
+    for q in PERCENTILES:
+        cube[f"p{q}_volume"] = _group_percentiles(sorted_volume, starts, n, q)
+    cube["mean_score"] = mean_score
+    cube["typical_LOS"] = pd.Series(typical).map(SCORE_TO_LOS).to_numpy()
+    shares = los_counts[present] / n[:, None]
+    for j, los in enumerate(LOS_LETTERS):
+        cube[f"share_{los}"] = shares[:, j]
+    return cube[CUBE_COLUMNS]
+
+
+def save_cube(cube: pd.DataFrame, path: str) -> None:
+    cube.to_csv(path, index=False)
+
+
+def load_cube(path: str) -> pd.DataFrame:
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Cube not found: {path}")
+    cube = pd.read_csv(path)
+    missing = set(CUBE_COLUMNS) - set(cube.columns)
+    if missing:
+        raise ValueError(f"Missing cube columns {sorted(missing)} in {path}; rebuild it with los_cube.py")
+    return cube
+
+
+def parse_weekday(text: str) -> int:
+    """Weekday number (Mon=0) from a name/abbreviation or a 0-6 number."""
+    value = str(text).strip()
+    if value.isdigit() and 0 <= int(value) <= 6:
+        return int(value)
+    for i, name in enumerate(WEEKDAYS):
+        if value[:3].title() == name:
+            return i
+    raise ValueError(f"Unknown weekday: {text!r} (use Mon..Sun or 0-6)")
+
+
+def typical(cube: pd.DataFrame, intid=None, weekday: Optional[int] = None, hour: Optional[int] = None) -> pd.DataFrame:
+    """Cube cells matching the given INTID / weekday / hour of day (None matches all)."""
+    mask = np.ones(len(cube), dtype=bool)
+    if intid is not None:
+        mask &= cube["INTID"].astype(str).to_numpy() == str(intid)
+    if weekday is not None:
+        mask &= cube["weekday"].to_numpy() == weekday
+    if hour is not None:
+        mask &= cube["hour_of_day"].to_numpy() == hour
+    return cube[mask]
+
+
+def cube_grid(cube: pd.DataFrame, intid, value: str = "mean_score") -> np.ndarray:
+    """7 x 24 weekday-by-hour array of one cube column for an INTID (NaN where no hours were seen)."""
+    grid = np.full((len(WEEKDAYS), 24), np.nan)
+    cells = typical(cube, intid=intid)
+    grid[cells["weekday"].to_numpy(), cells["hour_of_day"].to_numpy()] = cells[value].to_numpy(dtype="float64")
+    return grid
+
+
+def plot_weekly_heatmaps(cube: pd.DataFrame, out_dir: str, intids: Optional[Sequence] = None) -> List[str]:
+    """Typical-week LOS heatmap (weekday x hour of day) per INTID, drawn from the cube alone."""
+    from matplotlib.colors import ListedColormap
+
+    from los_plots import LOS_COLORS
+    from los_registry import INTID_NAMES
+    from plot_intersection_volumes import new_figure
+
+    os.makedirs(out_dir, exist_ok=True)
+    fig = new_figure(figsize=(12, 4.5))
+    paths = []
+    for intid in intids if intids is not None else pd.unique(cube["INTID"]).tolist():
+        fig.clear()
+        ax = fig.subplots()
+        image = ax.imshow(cube_grid(cube, intid), aspect="auto", interpolation="nearest", cmap=ListedColormap(LOS_COLORS), vmin=0.5, vmax=6.5)
+        ax.set_title(f"Typical Week LOS — {INTID_NAMES.get(intid, f'INTID {intid}')} (INTID {intid})")
+        ax.set_xlabel("Hour of Day")
+        ax.set_xticks(range(0, 24))
+        ax.set_yticks(range(len(WEEKDAYS)))
+        ax.set_yticklabels(WEEKDAYS)
+        colorbar = fig.colorbar(image, ax=ax, ticks=range(1, 7))
+        colorbar.ax.set_yticklabels(LOS_LETTERS)
+        colorbar.set_label("Mean hourly LOS")
+        fig.tight_layout()
+        path = os.path.join(out_dir, f"intersection_{intid}_weekly_los.png")
+        fig.savefig(path)
+        paths.append(path)
+    return paths
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build or query the INTID x weekday x hour-of-day LOS cube.")
+    parser.add_argument("--source", default="los_results.csv", help="Hourly LOS results CSV to build the cube from")
+    parser.add_argument("--db", default="", help="Build from this SQLite store (los_calc.py --db) instead of --source")
+    parser.add_argument("--cube", default="los_cube.csv", help="Cube file to write, or to read with --query-only")
+    parser.add_argument("--query-only", action="store_true", help="Answer from the saved --cube without rebuilding it")
+    parser.add_argument("--intid", default=None, help="Show cells for this INTID")
+    parser.add_argument("--weekday", default=None, help="Show cells for this weekday (Mon..Sun or 0-6)")
+    parser.add_argument("--hour", type=int, default=None, help="Show cells for this hour of day (0-23)")
+    parser.add_argument("--plots-dir", default="", help="Also draw a typical-week LOS heatmap per INTID into this directory")
+    args = parser.parse_args(argv)
+
+    try:
+        weekday = parse_weekday(args.weekday) if args.weekday is not None else None
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    try:
+        if args.query_only:
+            cube = load_cube(args.cube)
+        else:
+            if args.db:
+                from contextlib import closing
+
+                from los_db import connect, read_hourly
+
+                with closing(connect(args.db)) as conn:
+                    hourly = read_hourly(conn)
+            else:
+                hourly = pd.read_csv(args.source)
+            cube = build_cube(hourly)
+            save_cube(cube, args.cube)
+            print(f"Saved {len(cube)} cube cells to {args.cube}")
+    except FileNotFoundError as exc:
+        print(f"{exc}. Run 'python los_calc.py' first to generate hourly LOS.")
+        return 1
+
+    if args.plots_dir:
+        for path in plot_weekly_heatmaps(cube, args.plots_dir):
+            print(f"Saved {path}")
+
+    if args.intid is not None or weekday is not None or args.hour is not None:
+        cells = typical(cube, args.intid, weekday, args.hour)
+        # Last six columns: percentage of hours at each LOS
+        header = f"{'INTID':<6} {'Day':<4} {'Hour':<5} {'Hours':>5} {'MeanVol':>8} {'P85Vol':>8} {'LOS':<3} " + " ".join(
+            f"{los + '%':>3}" for los in LOS_LETTERS
+        )
+        lines = [header, "-" * len(header)]
+        shares = (cells[[f"share_{los}" for los in LOS_LETTERS]].to_numpy() * 100).round().astype("int64")
+        for (intid, day, hour, count, mean_vol, p85, los), share in zip(
+            cells[["INTID", "weekday", "hour_of_day", "count", "mean_volume", "p85_volume", "typical_LOS"]].itertuples(index=False),
+            shares.tolist(),
+        ):
+            lines.append(
+                f"{str(intid):<6} {WEEKDAYS[day]:<4} {hour:02d}:00 {count:>5} {mean_vol:>8.0f} {p85:>8.0f} {los:<3} "
+                + " ".join(f"{s:>3}" for s in share)
+            )
+        if len(cells) == 0:
+            lines.append("No hours match the query.")
+        sys.stdout.write("\n".join(lines) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
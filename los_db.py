@@ -0,0 +1,169 @@
+import os
+import sqlite3
+from contextlib import closing
+from typing import Iterator, Optional, Tuple
+
+import pandas as pd
+
+from los_calc import LOS_THRESHOLDS, MOVEMENT_COLUMNS, Thresholds, classify_volumes
+
+
+DEFAULT_DB = "los_results.db"
+
+# Times are stored as 'YYYY-MM-DD HH:MM:SS' text, the same form los_results.csv uses;
+# it sorts chronologically and keeps the tables readable from the sqlite3 shell.
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS hourly (
+    INTID,
+    hour TEXT NOT NULL,
+    total_volume REAL,
+    los_score INTEGER,
+    LOS TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS hourly_intid_hour ON hourly (INTID, hour);
+CREATE INDEX IF NOT EXISTS hourly_intid_score ON hourly (INTID, los_score);
+CREATE TABLE IF NOT EXISTS intervals (
+    INTID,
+    datetime TEXT NOT NULL,
+    {", ".join(f"{c} INTEGER" for c in MOVEMENT_COLUMNS)},
+    total_volume REAL,
+    los_score INTEGER
+);
+CREATE UNIQUE INDEX IF NOT EXISTS intervals_intid_datetime ON intervals (INTID, datetime);
+"""
+
+HOURLY_COLUMNS = ["INTID", "hour", "total_volume", "los_score", "LOS"]
+
+
+def connect(db_path: str, create: bool = False) -> sqlite3.Connection:
+    """Open the result store; readers get FileNotFoundError instead of a new empty database."""
+    if not create and not os.path.isfile(db_path):
+        raise FileNotFoundError(f"Database not found: {db_path}")
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _time_text(values: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.dt.strftime(TIME_FORMAT)
+    return values.astype(str)
+
+
+def _records(df: pd.DataFrame) -> Iterator[tuple]:
+    # tolist() hands sqlite3 plain Python ints/floats/str instead of NumPy scalars
+    return zip(*(df[c].tolist() for c in df.columns))
+
+
+def _insert(conn: sqlite3.Connection, table: str, df: pd.DataFrame) -> int:
+    columns = ", ".join(df.columns)
+    marks = ", ".join("?" for _ in df.columns)
+    # One transaction per bulk insert; rows for an existing (INTID, time) key are replaced
+    with conn:
+        conn.executemany(f"INSERT OR REPLACE INTO {table} ({columns}) VALUES ({marks})", _records(df))
+    return len(df)
+
+
+def store_hourly(conn: sqlite3.Connection, hourly: pd.DataFrame) -> int:
+    """Upsert hourly LOS rows (compute_hourly_los output)."""
+    out = hourly[HOURLY_COLUMNS].dropna(subset=["INTID", "hour"]).copy()
+    out["INTID"] = out["INTID"].astype(object)
+    out["hour"] = _time_text(out["hour"])
+    return _insert(conn, "hourly", out)
+
+
+def store_intervals(conn: sqlite3.Connection, df: pd.DataFrame, thresholds: Thresholds = LOS_THRESHOLDS) -> int:
+    """Upsert prepared 15-minute rows with their total volume and interval score."""
+    df = df.dropna(subset=["INTID", "datetime"])
+    volume = df[MOVEMENT_COLUMNS].to_numpy(dtype="float64").sum(axis=1)
+    out = pd.DataFrame({"INTID": df["INTID"].astype(object).to_numpy(), "datetime": _time_text(df["datetime"]).to_numpy()})
+    for col in MOVEMENT_COLUMNS:
+        out[col] = df[col].to_numpy(dtype="int64")
+    out["total_volume"] = volume
+    out["los_score"] = classify_volumes(volume, thresholds).astype("int64")
+    return _insert(conn, "intervals", out)
+
+
+def write_results(
+    db_path: str,
+    hourly: pd.DataFrame,
+    intervals: Optional[pd.DataFrame] = None,
+    thresholds: Thresholds = LOS_THRESHOLDS,
+) -> Tuple[int, int]:
+    """Store hourly (and, when given, 15-minute) results; returns the row counts written."""
+    with closing(connect(db_path, create=True)) as conn:
+        n_intervals = store_intervals(conn, intervals, thresholds) if intervals is not None else 0
+        return store_hourly(conn, hourly), n_intervals
+
+
+def _query(conn: sqlite3.Connection, sql: str, params: tuple = ()) -> pd.DataFrame:
+    return pd.read_sql_query(sql, conn, params=params)
+
+
+def read_hourly(conn: sqlite3.Connection) -> pd.DataFrame:
+    """The whole hourly table, ordered like los_results.csv."""
+    return _query(conn, f"SELECT {', '.join(HOURLY_COLUMNS)} FROM hourly ORDER BY INTID, hour")
+
+
+def extreme_hours(conn: sqlite3.Connection, worst: bool = True) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Hours at each INTID's worst (highest) or best (lowest) score, plus the per-INTID score.
+    Feed both to build_per_intersection_summary / build_per_intersection_best.
+    """
+    agg = "MAX" if worst else "MIN"
+    score_col = "worst_score" if worst else "best_score"
+    scores = _query(conn, f"SELECT INTID, {agg}(los_score) AS {score_col} FROM hourly GROUP BY INTID ORDER BY INTID")
+    rows = _query(
+        conn,
+        f"""
+        SELECT h.INTID, h.hour, h.total_volume, h.los_score, h.LOS
+        FROM hourly h
+        JOIN (SELECT INTID, {agg}(los_score) AS score FROM hourly GROUP BY INTID) s
+          ON h.INTID = s.INTID AND h.los_score = s.score
+        ORDER BY h.INTID, h.hour
+        """,
+    )
+    return rows, scores
+
+
+def top_candidates(conn: sqlite3.Connection, n: int, worst: bool = True, per: Optional[str] = None) -> pd.DataFrame:
+    """
+    The top-n hours by (los_score, total_volume) overall, per INTID or per day, selected in SQL,
+    plus every row tied with the n-th one. Rows come back ordered by (INTID, hour), the order
+    los_calc.py writes los_results.csv in, so build_overall_worst/best over these rows breaks
+    ties the same way it does over that CSV.
+    """
+    direction = "DESC" if worst else "ASC"
+    # Missing volumes rank after real ones in both directions, as sort_values places NaN
+    order = f"los_score {direction}, total_volume IS NULL, total_volume {direction}"
+    columns = ", ".join(HOURLY_COLUMNS)
+    partition = "" if per in (None, "none") else "PARTITION BY " + {"intid": "INTID", "day": "substr(hour, 1, 10)"}[per]
+    # RANK() gives tied rows the same rank, so the whole tie block at the cut-off is kept
+    sql = f"""
+    SELECT {columns} FROM (
+        SELECT {columns}, RANK() OVER ({partition} ORDER BY {order}) AS rk
+        FROM hourly
+    ) WHERE rk <= ?
+    ORDER BY INTID, hour
+    """
+    return _query(conn, sql, (max(n, 0),))
+
+
+def average_scores(conn: sqlite3.Connection) -> pd.DataFrame:
+    """Mean hourly score per INTID (compute_intersection_averages' avg input)."""
+    return _query(conn, "SELECT INTID, AVG(los_score) AS avg_hourly_score FROM hourly GROUP BY INTID ORDER BY INTID")
+
+
+def hourly_volume_profile(conn: sqlite3.Connection) -> pd.DataFrame:
+    """Average total volume per INTID and hour of day across all days."""
+    return _query(
+        conn,
+        """
+        SELECT INTID, CAST(substr(hour, 12, 2) AS INTEGER) AS hour_of_day, AVG(total_volume) AS total_volume
+        FROM hourly
+        GROUP BY INTID, hour_of_day
+        ORDER BY INTID, hour_of_day
+        """,
+    )
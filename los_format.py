@@ -0,0 +1,212 @@
+import os
+import sys
+from typing import Iterable, List, Optional, TextIO
+
+import numpy as np
+import pandas as pd
+
+
+def to_hours(values) -> pd.Series:
+    """Parse hour values (strings, Timestamps or datetime64) to a datetime64 Series in one call."""
+    if isinstance(values, pd.Series):
+        series = values
+    elif isinstance(values, np.ndarray):
+        series = pd.Series(values)
+    else:
+        series = pd.Series(list(values), dtype=object)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    return pd.to_datetime(series, errors="coerce")
+
+
+def _strftime_unique(parsed: pd.Series, fmt: str) -> pd.Series:
+    """strftime over the distinct timestamps only; hourly data repeats each hour across INTIDs."""
+    codes, uniques = pd.factorize(parsed)
+    labels = np.append(pd.DatetimeIndex(uniques).strftime(fmt).to_numpy(dtype=object), None)
+    return pd.Series(labels[codes], index=parsed.index, dtype=object)
+
+
+def format_hours(hours) -> pd.Series:
+    """Vectorized 'YYYY-MM-DD HH:MM' labels; values that are not timestamps keep their text."""
+    series = hours if isinstance(hours, pd.Series) else pd.Series(list(hours), dtype=object)
+    parsed = to_hours(series)
+    labels = _strftime_unique(parsed, "%Y-%m-%d %H:%M")
+    if parsed.isna().any():
+        labels = labels.where(parsed.notna(), series.astype(str))
+    return labels
+
+
+def minutes_of_day(hours: Iterable) -> np.ndarray:
+    """Minutes after midnight for each parseable hour value (unparseable values are dropped)."""
+    parsed = to_hours(hours).dropna()
+    return (parsed.dt.hour * 60 + parsed.dt.minute).to_numpy(dtype="int64")
+
+
+def _hhmm(minutes: np.ndarray) -> List[str]:
+    return [f"{m // 60:02d}:{m % 60:02d}" for m in minutes]
+
+
+def unique_times_of_day(hours: Iterable) -> List[str]:
+    """Sorted, de-duplicated HH:MM labels without dates."""
+    return _hhmm(np.unique(minutes_of_day(hours)))
+
+
+def compress_time_ranges(hours: Iterable) -> List[str]:
+    """Compress times (same date) into ranges like '07:00–08:00', merging consecutive hours."""
+    minutes = np.sort(minutes_of_day(hours))
+    if minutes.size == 0:
+        return []
+    # A new range starts wherever the step to the previous time is not exactly one hour
+    breaks = np.flatnonzero(np.diff(minutes) != 60) + 1
+    starts = minutes[np.r_[0, breaks]]
+    ends = minutes[np.r_[breaks - 1, minutes.size - 1]]
+    return [
+        s if s == e else f"{s}–{e}"
+        for s, e in zip(_hhmm(starts), _hhmm(ends))
+    ]
+
+
+def group_arrays(keys: pd.Series, values: pd.Series) -> pd.Series:
+    """
+    Split values into one NumPy array per distinct key (keys ascending, original order
+    kept within each key). Much cheaper than groupby(...).agg(list), which boxes every element.
+    """
+    if keys.empty:
+        return pd.Series([], dtype=object)
+    order = np.argsort(keys.to_numpy(), kind="stable")
+    sorted_keys = keys.to_numpy()[order]
+    sorted_values = values.to_numpy()[order]
+    uniq, starts = np.unique(sorted_keys, return_index=True)
+    return pd.Series(np.split(sorted_values, starts[1:]), index=uniq, dtype=object)
+
+
+def hours_by_intersection(rows: pd.DataFrame, hour_col: str = "hour") -> pd.Series:
+    """
+    Comma-separated unique 'YYYY-MM-DD HH:MM' labels per INTID, sorted chronologically.
+    Labels are built once for all rows rather than per element within each group.
+    """
+    labels = rows[["INTID"]].assign(label=format_hours(rows[hour_col]).to_numpy())
+    labels = labels.drop_duplicates().sort_values(["INTID", "label"])
+    return group_arrays(labels["INTID"], labels["label"]).map(", ".join)
+
+
+def parse_hours_if_complete(hours: pd.Series) -> pd.Series:
+    """
+    Return hours as datetime64 when every value parses, otherwise the original values,
+    so callers parse once up front without losing unparseable labels.
+    """
+    parsed = to_hours(hours)
+    return parsed if parsed.notna().all() else hours
+
+
+def split_date_time(hours: pd.Series):
+    """Vectorized ('YYYY-MM-DD', 'HH:MM') label columns, falling back to slices of the raw text."""
+    parsed = to_hours(hours)
+    dates = _strftime_unique(parsed, "%Y-%m-%d")
+    times = _strftime_unique(parsed, "%H:%M")
+    if parsed.isna().any():
+        raw = hours.astype(str)
+        dates = dates.where(parsed.notna(), raw.str[:10])
+        times = times.where(parsed.notna(), raw.str[-5:])
+    return dates, times
+
+
+def hourly_lines(rows: pd.DataFrame) -> List[str]:
+    """
+    'INTID <id> | <hour> | volume=<sum> | LOS=<letter> | score=<1-6>' for every row.
+    Columns are converted to plain lists once and hours are formatted per distinct value,
+    so this costs one f-string per row instead of an iterrows Series per row.
+    """
+    hours = rows["hour"]
+    if pd.api.types.is_datetime64_any_dtype(hours):
+        hours = _strftime_unique(hours, "%Y-%m-%d %H:%M:%S")
+    columns = (
+        rows["INTID"].astype(str).tolist(),
+        hours.astype(str).tolist(),
+        rows["total_volume"].astype("int64").tolist(),
+        rows["LOS"].tolist(),
+        rows["los_score"].astype("int64").tolist(),
+    )
+    return [
+        f"INTID {intid} | {hour} | volume={volume} | LOS={los} | score={score}"
+        for intid, hour, volume, los, score in zip(*columns)
+    ]
+
+
+def hour_table_lines(overall: pd.DataFrame) -> List[str]:
+    """Aligned INTID/Date/Time/LOS/Score/Volume table used by the worst/best summaries."""
+    header = f"{'INTID':<6} {'Date':<10} {'Time':<5} {'LOS':<3} {'Score':<5} {'Volume':<7}"
+    dates, times = split_date_time(overall["hour"])
+    volumes = overall["total_volume"] if "total_volume" in overall.columns else pd.Series(np.nan, index=overall.index)
+    vol_strs = [f"{int(v):<7}" if pd.notna(v) else f"{'-':<7}" for v in volumes.tolist()]
+    rows = [
+        f"{str(intid):<6} {date_str:<10} {time_str:<5} {los:<3} {int(score):<5} {vol_str}"
+        for intid, date_str, time_str, los, score, vol_str in zip(
+            overall["INTID"].tolist(), dates.tolist(), times.tolist(), overall["LOS"].tolist(), overall["los_score"].tolist(), vol_strs
+        )
+    ]
+    return [header, "-" * len(header)] + rows
+
+
+def write_lines(lines: List[str], limit: Optional[int] = None, stream: Optional[TextIO] = None) -> None:
+    """Write lines to stdout in a single call; with limit, only the first lines plus a count of the rest."""
+    if not lines:
+        return
+    stream = stream or sys.stdout
+    shown = lines if limit is None or limit >= len(lines) else lines[: max(limit, 0)]
+    text = "\n".join(shown)
+    if len(shown) < len(lines):
+        text += ("\n" if shown else "") + f"... {len(lines) - len(shown)} more rows"
+    stream.write(text + "\n")
+
+
+def _needs_quoting(text: str) -> bool:
+    return "," in text or '"' in text or "\n" in text or "\r" in text
+
+
+def _csv_cells(series: pd.Series) -> Optional[List[str]]:
+    """Column as the strings DataFrame.to_csv would write, or None when the fast path cannot match it."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+    if isinstance(series.dtype, pd.api.extensions.ExtensionDtype) and not isinstance(series.dtype, pd.StringDtype):
+        # Nullable Int64/Float64/boolean and other extension columns print NA and numbers their own way
+        return None
+    values = series.to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if series.dt.tz is not None or (series.dropna().dt.microsecond != 0).any() or (series.dropna().dt.nanosecond != 0).any():
+            return None
+        # to_csv drops the time of day when every value is midnight
+        fmt = "%Y-%m-%d" if (series.dropna().dt.normalize() == series.dropna()).all() else "%Y-%m-%d %H:%M:%S"
+        return _strftime_unique(series, fmt).fillna("").tolist()
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        return [str(v) for v in values.tolist()]
+    if series.dtype == np.float64:
+        return [repr(v) if v == v else "" for v in values.tolist()]
+    if series.dtype == object or pd.api.types.is_string_dtype(series):
+        cells = ["" if v is None or v is pd.NA or (isinstance(v, float) and v != v) else str(v) for v in values.tolist()]
+        # Values that need quoting are left to the csv module
+        if any(_needs_quoting(c) for c in set(cells)):
+            return None
+        return cells
+    return None
+
+
+def write_csv(df: pd.DataFrame, path: str) -> None:
+    """
+    df.to_csv(path, index=False), byte for byte, written from preformatted columns in one
+    write. Falls back to to_csv for dtypes or values the fast path does not handle.
+    """
+    if any(_needs_quoting(str(c)) for c in df.columns):
+        df.to_csv(path, index=False)
+        return
+    columns = []
+    for name in df.columns:
+        cells = _csv_cells(df[name])
+        if cells is None:
+            df.to_csv(path, index=False)
+            return
+        columns.append(cells)
+    header = ",".join(str(c) for c in df.columns)
+    rows = [",".join(cells) for cells in zip(*columns)] if columns else []
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(os.linesep.join([header] + rows) + os.linesep)
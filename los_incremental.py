@@ -0,0 +1,154 @@
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from los_calc import (
+    LOS_THRESHOLDS,
+    Thresholds,
+    _combine_partials,
+    _finalize_hourly,
+    _hourly_partials,
+    load_and_prepare,
+)
+
+
+STATE_VERSION = 1
+HOUR_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def default_state_path(results_path: str) -> str:
+    """State file beside the results: los_results.csv -> los_results.state.json."""
+    return os.path.splitext(results_path)[0] + ".state.json"
+
+
+def _thresholds_key(thresholds: Thresholds) -> List[list]:
+    return [[float(t), los] for t, los in thresholds]
+
+
+def load_state(state_path: str, thresholds: Thresholds = LOS_THRESHOLDS) -> Dict[str, dict]:
+    """
+    Per-INTID watermark state: the last processed interval and the partial sums of
+    the hour it falls in (the only hour that later rows can still change).
+    """
+    if not os.path.isfile(state_path):
+        return {}
+    with open(state_path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    if state.get("version") != STATE_VERSION:
+        raise ValueError(f"Unsupported state version in {state_path}: {state.get('version')}")
+    if state.get("thresholds", _thresholds_key(LOS_THRESHOLDS)) != _thresholds_key(thresholds):
+        # Stored score sums were computed with another table and cannot be extended
+        raise ValueError(
+            f"{state_path} was built with thresholds {state.get('thresholds')}; "
+            "rebuild the results without --incremental to change thresholds."
+        )
+    return state.get("intersections", {})
+
+
+def save_state(state_path: str, intersections: Dict[str, dict], thresholds: Thresholds = LOS_THRESHOLDS) -> None:
+    tmp_path = state_path + ".tmp"
+    state = {"version": STATE_VERSION, "thresholds": _thresholds_key(thresholds), "intersections": intersections}
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, state_path)
+
+
+def select_new_intervals(df: pd.DataFrame, intersections: Dict[str, dict]) -> pd.DataFrame:
+    """Keep rows strictly after their INTID's watermark; INTIDs without state are entirely new."""
+    df = df.dropna(subset=["INTID", "datetime"])
+    watermarks = {k: pd.Timestamp(v["watermark"]) for k, v in intersections.items()}
+    wm = pd.to_datetime(df["INTID"].astype(str).map(watermarks))
+    return df[wm.isna() | (df["datetime"] > wm)]
+
+
+def _open_hour_partials(intersections: Dict[str, dict]) -> pd.DataFrame:
+    rows = [
+        {
+            "INTID": k,
+            "hour": pd.Timestamp(v["open_hour"]),
+            "total_volume": float(v["total_volume"]),
+            "score_sum": float(v["score_sum"]),
+            "intervals": int(v["intervals"]),
+        }
+        for k, v in intersections.items()
+    ]
+    return pd.DataFrame(rows, columns=["INTID", "hour", "total_volume", "score_sum", "intervals"])
+
+
+def compute_incremental_hourly(
+    new_df: pd.DataFrame, intersections: Dict[str, dict], thresholds: Thresholds = LOS_THRESHOLDS
+) -> Tuple[pd.DataFrame, Dict[str, dict]]:
+    """
+    Hourly LOS for the hours touched by new_df, folding in the stored partial sums of
+    each INTID's open hour. Returns (affected hourly rows, updated state).
+    """
+    partials = _hourly_partials(new_df, thresholds)
+    if partials.empty:
+        return _finalize_hourly(partials), dict(intersections)
+
+    carried = _open_hour_partials(intersections)
+    if not carried.empty:
+        # State keys are text; match the INTID type of the freshly parsed export
+        carried["INTID"] = carried["INTID"].astype(partials["INTID"].dtype)
+        carried["hour"] = carried["hour"].astype(partials["hour"].dtype)
+        # Only open hours that received new intervals need to be recomputed
+        touched = carried.merge(partials[["INTID", "hour"]], on=["INTID", "hour"])
+        partials = _combine_partials([partials, touched])
+
+    state = dict(intersections)
+    last_seen = new_df.groupby("INTID")["datetime"].max()
+    for intid, watermark in last_seen.items():
+        open_hour = watermark.floor("h")
+        row = partials[(partials["INTID"] == intid) & (partials["hour"] == open_hour)].iloc[0]
+        state[str(intid)] = {
+            "watermark": watermark.isoformat(),
+            "open_hour": open_hour.isoformat(),
+            "total_volume": float(row["total_volume"]),
+            "score_sum": float(row["score_sum"]),
+            "intervals": int(row["intervals"]),
+        }
+
+    return _finalize_hourly(partials), state
+
+
+def merge_results(results_path: str, hourly: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replace/append the affected (INTID, hour) rows in an existing results CSV.
+    Hours are kept as text (ISO order sorts chronologically), so the stored history
+    is never re-parsed.
+    """
+    update = hourly.copy()
+    update["hour"] = update["hour"].dt.strftime(HOUR_FORMAT)
+    if not os.path.isfile(results_path):
+        return update.sort_values(["INTID", "hour"]).reset_index(drop=True)
+
+    existing = pd.read_csv(results_path, dtype={"hour": str})
+    keys = pd.MultiIndex.from_frame(update[["INTID", "hour"]])
+    keep = ~pd.MultiIndex.from_frame(existing[["INTID", "hour"]]).isin(keys)
+    merged = pd.concat([existing[keep], update[existing.columns]], ignore_index=True)
+    return merged.sort_values(["INTID", "hour"]).reset_index(drop=True)
+
+
+def run_incremental(
+    csv_path: str,
+    results_path: str,
+    state_path: Optional[str] = None,
+    thresholds: Thresholds = LOS_THRESHOLDS,
+) -> pd.DataFrame:
+    """
+    Ingest only the intervals of csv_path newer than the recorded watermarks, recompute
+    the affected hours and merge them into results_path. Returns the affected hourly rows.
+    """
+    state_path = state_path or default_state_path(results_path)
+    intersections = load_state(state_path, thresholds)
+
+    new_df = select_new_intervals(load_and_prepare(csv_path), intersections)
+    hourly, state = compute_incremental_hourly(new_df, intersections, thresholds)
+    if hourly.empty:
+        return hourly
+
+    merge_results(results_path, hourly).to_csv(results_path, index=False)
+    save_state(state_path, state, thresholds)
+    return hourly.sort_values(["INTID", "hour"]).reset_index(drop=True)
@@ -0,0 +1,156 @@
+import argparse
+import sys
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from los_calc import (
+    LOS_THRESHOLDS,
+    MOVEMENT_COLUMNS,
+    SCORE_TO_LOS,
+    Thresholds,
+    classify_volumes,
+    load_and_prepare,
+    parse_thresholds,
+)
+from los_format import write_lines
+
+
+INTERVAL = pd.Timedelta(minutes=15)
+WINDOW_INTERVALS = 4  # one hour of 15-minute counts
+
+
+def _interval_volumes(df: pd.DataFrame) -> pd.DataFrame:
+    """One row per (INTID, datetime) with the interval total, sorted for windowing."""
+    df = df.dropna(subset=["INTID", "datetime"])
+    if "total_volume" in df.columns:
+        volume = df["total_volume"]
+    else:
+        volume = df[MOVEMENT_COLUMNS].sum(axis=1)
+    out = pd.DataFrame({"INTID": df["INTID"].to_numpy(), "datetime": df["datetime"].to_numpy(), "volume": volume.to_numpy(dtype="float64")})
+    out = out.drop_duplicates(subset=["INTID", "datetime"], keep="last")
+    return out.sort_values(["INTID", "datetime"], kind="stable").reset_index(drop=True)
+
+
+def _window_sums(values: np.ndarray, window: int) -> np.ndarray:
+    """Sum of every run of `window` consecutive values via one cumulative sum."""
+    csum = np.concatenate([[0], np.cumsum(values)])
+    return csum[window:] - csum[:-window]
+
+
+def rolling_hour_los(
+    df: pd.DataFrame,
+    thresholds: Thresholds = LOS_THRESHOLDS,
+    window: int = WINDOW_INTERVALS,
+) -> pd.DataFrame:
+    """
+    Rolling one-hour LOS for every 15-minute window start, per INTID.
+
+    A window covers `window` consecutive 15-minute intervals of the same INTID with no
+    gaps; windows that would span a missing interval are not reported. For each window:
+    rolling_volume, the highest 15-minute volume inside it, the peak-hour factor
+    (rolling_volume / (window * peak_15min_volume)) and the LOS obtained exactly as
+    compute_hourly_los does for clock hours (mean of the 15-minute scores, rounded).
+    Everything is computed with array arithmetic, O(n) in the number of intervals.
+    """
+    columns = ["INTID", "window_start", "window_end", "rolling_volume", "peak_15min_volume", "phf", "los_score", "LOS"]
+    iv = _interval_volumes(df)
+    n = len(iv)
+    if n < window:
+        return pd.DataFrame(columns=columns)
+
+    volume = iv["volume"].to_numpy()
+    scores = classify_volumes(volume, thresholds).astype("int64")
+    intid_codes = pd.factorize(iv["INTID"])[0]
+    stamps = iv["datetime"].to_numpy(dtype="datetime64[ns]")
+
+    # A step is contiguous when the next row is the same INTID exactly one interval later
+    step_ok = (intid_codes[1:] == intid_codes[:-1]) & (np.diff(stamps) == INTERVAL.to_timedelta64())
+    valid = _window_sums(step_ok.astype("int64"), window - 1) == window - 1 if window > 1 else np.ones(n, bool)
+
+    rolling_volume = _window_sums(volume, window)
+    score_mean = _window_sums(scores, window) / window
+    peak = volume[: n - window + 1].copy()
+    for offset in range(1, window):
+        np.maximum(peak, volume[offset : n - window + 1 + offset], out=peak)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        phf = np.where(peak > 0, rolling_volume / (window * peak), np.nan)
+
+    starts = stamps[: n - window + 1]
+    los_score = np.round(score_mean).astype("int64")
+    out = pd.DataFrame(
+        {
+            "INTID": iv["INTID"].to_numpy()[: n - window + 1],
+            "window_start": starts,
+            "window_end": starts + window * INTERVAL.to_timedelta64(),
+            "rolling_volume": rolling_volume,
+            "peak_15min_volume": peak,
+            "phf": phf,
+            "los_score": los_score,
+        }
+    )[valid]
+    out["LOS"] = out["los_score"].map(SCORE_TO_LOS)
+    return out.reset_index(drop=True)[columns]
+
+
+def peak_hours(windows: pd.DataFrame, per_day: bool = True) -> pd.DataFrame:
+    """The highest-volume rolling hour per INTID (and per calendar day when per_day)."""
+    if windows.empty:
+        return windows
+    keys = [windows["INTID"]]
+    if per_day:
+        keys.append(windows["window_start"].dt.floor("D").rename("day"))
+    # idxmax keeps the earliest window when several tie for the peak
+    idx = windows.groupby(keys, sort=True)["rolling_volume"].idxmax()
+    return windows.loc[idx.to_numpy()].reset_index(drop=True)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Find true rolling peak hours (15-minute steps) and their LOS per intersection.")
+    parser.add_argument("--csv", default="VehicleVolume_1Wal_2Hwy_4Hwy_11162025_11222025.csv", help="Path to input CSV")
+    parser.add_argument("--out", default="peak_hours.csv", help="Path to save the peak hour per INTID and day")
+    parser.add_argument("--windows-out", default="", help="Optional path to save every rolling window")
+    parser.add_argument("--overall", action="store_true", help="Report one peak hour per INTID instead of one per day")
+    parser.add_argument("--thresholds", default="", help="Comma-separated 15-min volume upper bounds for A..E")
+    args = parser.parse_args(argv)
+
+    try:
+        thresholds = parse_thresholds(args.thresholds) if args.thresholds else LOS_THRESHOLDS
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    try:
+        df = load_and_prepare(args.csv, compact=True)
+    except FileNotFoundError as exc:
+        print(exc)
+        return 1
+
+    windows = rolling_hour_los(df, thresholds)
+    peaks = peak_hours(windows, per_day=not args.overall)
+
+    header = f"{'INTID':<6} {'Start':<16} {'End':<5} {'Volume':<7} {'PHF':<5} {'LOS':<3}"
+    lines = ["Peak rolling hour per intersection" + ("" if args.overall else " and day") + ":", header, "-" * len(header)]
+    if not peaks.empty:
+        columns = zip(
+            peaks["INTID"].astype(str).tolist(),
+            peaks["window_start"].dt.strftime("%Y-%m-%d %H:%M").tolist(),
+            peaks["window_end"].dt.strftime("%H:%M").tolist(),
+            peaks["rolling_volume"].astype("int64").tolist(),
+            peaks["phf"].tolist(),
+            peaks["LOS"].tolist(),
+        )
+        lines += [f"{intid:<6} {start} {end} {volume:<7} {phf:<5.2f} {los:<3}" for intid, start, end, volume, phf, los in columns]
+    write_lines(lines)
+
+    peaks.to_csv(args.out, index=False)
+    print(f"\nSaved peak hours to {args.out}")
+    if args.windows_out:
+        windows.to_csv(args.windows_out, index=False)
+        print(f"Saved {len(windows)} rolling windows to {args.windows_out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from los_registry import INTID_NAMES
+from plot_intersection_volumes import draw_hourly_profile, hourly_profile, new_figure
+
+
+CHART_KINDS = ("combined", "timeline", "profile", "heatmap")
+MANIFEST_NAME = ".plot_manifest.json"
+
+# Bump when the drawing code changes so charts with unchanged data are redrawn once
+STYLE_VERSION = 1
+
+LOS_COLORS = ["#1a9850", "#91cf60", "#d9ef8b", "#fee08b", "#fc8d59", "#d73027"]  # A..F
+FIGSIZES = {"combined": (12, 6), "timeline": (11, 5), "profile": (11, 5), "heatmap": (12, 6)}
+
+# One figure per chart kind and worker process, cleared and redrawn for every chart
+_FIGURES: Dict[str, object] = {}
+
+Job = Tuple[str, str, dict]  # (kind, output file name, payload of arrays/labels)
+
+
+def _label(intid) -> str:
+    return INTID_NAMES.get(intid, f"INTID {intid}")
+
+
+def _timeline_payload(sub: pd.DataFrame) -> dict:
+    return {
+        "title": f"Hourly Volume by Time — Intersection {sub['INTID'].iloc[0]}",
+        "hours": sub["hour"].to_numpy(dtype="datetime64[ns]"),
+        "volume": sub["total_volume"].to_numpy(dtype="float64"),
+    }
+
+
+def _profile_payload(sub: pd.DataFrame) -> dict:
+    hour_of_day = sub["hour"].dt.hour.to_numpy()
+    weekend = sub["hour"].dt.dayofweek.to_numpy() >= 5
+    volume = sub["total_volume"].to_numpy(dtype="float64")
+    lines = {}
+    for name, mask in (("All days", np.ones(len(sub), bool)), ("Weekdays", ~weekend), ("Weekend", weekend)):
+        sums = np.bincount(hour_of_day[mask], weights=volume[mask], minlength=24)
+        counts = np.bincount(hour_of_day[mask], minlength=24)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            lines[name] = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+    intid = sub["INTID"].iloc[0]
+    return {"title": f"Average Hourly Volume — {_label(intid)} (INTID {intid})", "lines": lines}
+
+
+def _heatmap_payload(sub: pd.DataFrame) -> dict:
+    days = sub["hour"].dt.floor("D")
+    day_codes, day_values = pd.factorize(days, sort=True)
+    grid = np.full((len(day_values), 24), np.nan)
+    grid[day_codes, sub["hour"].dt.hour.to_numpy()] = pd.to_numeric(sub["los_score"], errors="coerce").to_numpy(dtype="float64")
+    intid = sub["INTID"].iloc[0]
+    return {
+        "title": f"Hourly LOS — {_label(intid)} (INTID {intid})",
+        "days": pd.DatetimeIndex(day_values).strftime("%Y-%m-%d").tolist(),
+        "grid": grid,
+    }
+
+
+def build_jobs(hourly: pd.DataFrame, kinds: Sequence[str] = CHART_KINDS) -> List[Job]:
+    """One chart job per kind and INTID (plus the combined chart), with only the arrays it draws."""
+    hourly = hourly.dropna(subset=["INTID", "hour"]).sort_values(["INTID", "hour"], kind="stable")
+    jobs: List[Job] = []
+    if "combined" in kinds:
+        profile = hourly_profile(hourly[["INTID", "hour", "total_volume"]])
+        jobs.append(("combined", "intersections_hourly_average.png", {"profile": profile}))
+    if "heatmap" in kinds and "los_score" not in hourly.columns:
+        raise ValueError("LOS heatmaps need a los_score column in the hourly results")
+    for intid, sub in hourly.groupby("INTID", sort=True):
+        if "timeline" in kinds:
+            jobs.append(("timeline", f"intersection_{intid}_hourly_volume.png", _timeline_payload(sub)))
+        if "profile" in kinds:
+            jobs.append(("profile", f"intersection_{intid}_profile.png", _profile_payload(sub)))
+        if "heatmap" in kinds:
+            jobs.append(("heatmap", f"intersection_{intid}_los_heatmap.png", _heatmap_payload(sub)))
+    return jobs
+
+
+def _update_digest(digest, value) -> None:
+    if isinstance(value, dict):
+        for key in sorted(value):
+            digest.update(str(key).encode("utf-8"))
+            _update_digest(digest, value[key])
+    elif isinstance(value, pd.DataFrame):
+        digest.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+        digest.update(",".join(map(str, value.columns)).encode("utf-8"))
+    elif isinstance(value, np.ndarray):
+        digest.update(str(value.dtype).encode("utf-8") + str(value.shape).encode("utf-8"))
+        digest.update(np.ascontiguousarray(value).tobytes())
+    else:
+        digest.update(repr(value).encode("utf-8"))
+
+
+def job_hash(job: Job) -> str:
+    """Digest of everything a chart is drawn from: kind, style version and the payload data."""
+    kind, name, payload = job
+    digest = hashlib.sha256(f"{kind}|{name}|{STYLE_VERSION}".encode("utf-8"))
+    _update_digest(digest, payload)
+    return digest.hexdigest()
+
+
+def _figure(kind: str):
+    fig = _FIGURES.get(kind)
+    if fig is None:
+        fig = _FIGURES[kind] = new_figure(figsize=FIGSIZES[kind])
+    fig.clear()
+    return fig
+
+
+def _draw_combined(fig, payload: dict) -> None:
+    draw_hourly_profile(fig, payload["profile"])
+
+
+def _draw_timeline(fig, payload: dict) -> None:
+    ax = fig.subplots()
+    hours, volume = payload["hours"], payload["volume"]
+    # Markers only while they stay readable (about two weeks of hours)
+    ax.plot(hours, volume, marker="o" if len(hours) <= 400 else None, linewidth=1.8)
+    ax.set_title(payload["title"])
+    ax.set_xlabel("Hour")
+    ax.set_ylabel("Total Volume")
+    ax.grid(True, alpha=0.3)
+
+
+def _draw_profile(fig, payload: dict) -> None:
+    ax = fig.subplots()
+    styles = {"All days": dict(color="0.35", linewidth=1.2, linestyle="--"), "Weekdays": dict(linewidth=1.8), "Weekend": dict(linewidth=1.8)}
+    for name, values in payload["lines"].items():
+        if np.isnan(values).all():
+            continue
+        ax.plot(range(24), values, marker="o", label=name, **styles[name])
+    ax.set_title(payload["title"])
+    ax.set_xlabel("Hour of Day")
+    ax.set_ylabel("Average Total Volume")
+    ax.set_xticks(range(0, 24))
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+
+
+def _draw_heatmap(fig, payload: dict) -> None:
+    from matplotlib.colors import ListedColormap
+
+    ax = fig.subplots()
+    grid, days = payload["grid"], payload["days"]
+    image = ax.imshow(grid, aspect="auto", interpolation="nearest", cmap=ListedColormap(LOS_COLORS), vmin=0.5, vmax=6.5)
+    ax.set_title(payload["title"])
+    ax.set_xlabel("Hour of Day")
+    ax.set_xticks(range(0, 24))
+    # Keep at most ~30 date labels however long the period is
+    step = max(1, len(days) // 30 + (len(days) % 30 > 0))
+    ax.set_yticks(range(0, len(days), step))
+    ax.set_yticklabels(days[::step])
+    colorbar = fig.colorbar(image, ax=ax, ticks=range(1, 7))
+    colorbar.ax.set_yticklabels(list("ABCDEF"))
+    colorbar.set_label("LOS")
+
+
+_DRAW = {"combined": _draw_combined, "timeline": _draw_timeline, "profile": _draw_profile, "heatmap": _draw_heatmap}
+
+
+def render_job(job: Job, out_dir: str) -> str:
+    """Worker: draw one chart on this process's reusable figure and save it."""
+    kind, name, payload = job
+    fig = _figure(kind)
+    _DRAW[kind](fig, payload)
+    fig.tight_layout()
+    path = os.path.join(out_dir, name)
+    fig.savefig(path)
+    return path
+
+
+def _render_in_pool(args: Tuple[Job, str]) -> str:
+    return render_job(*args)
+
+
+def _load_manifest(out_dir: str) -> Dict[str, str]:
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_manifest(out_dir: str, manifest: Dict[str, str]) -> None:
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def render_charts(
+    hourly: pd.DataFrame,
+    out_dir: str,
+    kinds: Sequence[str] = CHART_KINDS,
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> Tuple[List[str], List[str]]:
+    """
+    Render the requested chart kinds for every INTID in hourly, in a process pool when
+    workers > 1. A chart whose input hash matches the manifest in out_dir (and whose file
+    still exists) is not redrawn unless force. Returns (rendered paths, skipped paths).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = _load_manifest(out_dir)
+    todo, skipped, hashes = [], [], {}
+    for job in build_jobs(hourly, kinds):
+        name = job[1]
+        hashes[name] = job_hash(job)
+        if not force and manifest.get(name) == hashes[name] and os.path.isfile(os.path.join(out_dir, name)):
+            skipped.append(os.path.join(out_dir, name))
+        else:
+            todo.append(job)
+
+    if workers == 1 or len(todo) <= 1:
+        rendered = [render_job(job, out_dir) for job in todo]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = list(pool.map(_render_in_pool, [(job, out_dir) for job in todo], chunksize=max(1, len(todo) // 32)))
+
+    manifest.update({job[1]: hashes[job[1]] for job in todo})
+    _save_manifest(out_dir, manifest)
+    return rendered, skipped
@@ -0,0 +1,174 @@
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, TextIO
+
+
+class StageTimer:
+    """
+    Collects wall-clock time per named pipeline stage, in the order stages ran.
+
+    Stages may nest; a nested stage is recorded as "outer/inner". Each stage record also
+    keeps how often it ran, the rows it handled (when the caller sets "rows" on the record
+    it yields) and, with memory=True while tracemalloc is tracing, the peak traced memory.
+    """
+
+    def __init__(self, memory: bool = False) -> None:
+        self.timings: Dict[str, float] = {}
+        self.stats: Dict[str, dict] = {}
+        self.memory = memory
+        self._open: List[dict] = []
+
+    def _fold_peak(self) -> None:
+        # Reset the tracemalloc peak at every stage boundary, crediting it to all open stages
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in self._open:
+            frame["peak"] = max(frame["peak"], peak)
+        tracemalloc.reset_peak()
+
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None) -> Iterator[dict]:
+        path = "/".join([f["path"] for f in self._open[-1:]] + [name])
+        stat = self.stats.setdefault(path, {"depth": len(self._open), "calls": 0, "rows": None, "peak_bytes": None})
+        self.timings.setdefault(path, 0.0)
+        track = self.memory and tracemalloc.is_tracing()
+        if track:
+            self._fold_peak()
+        frame = {"path": path, "rows": rows, "peak": 0}
+        self._open.append(frame)
+        start = time.perf_counter()
+        try:
+            yield frame
+        finally:
+            self.timings[path] += time.perf_counter() - start
+            if track:
+                self._fold_peak()
+                stat["peak_bytes"] = max(stat["peak_bytes"] or 0, frame["peak"])
+            self._open.pop()
+            stat["calls"] += 1
+            if frame["rows"] is not None:
+                stat["rows"] = (stat["rows"] or 0) + int(frame["rows"])
+
+    def total(self) -> float:
+        return sum(seconds for path, seconds in self.timings.items() if self.stats[path]["depth"] == 0)
+
+    def print_report(self, stream: TextIO = None, wall: Optional[float] = None) -> None:
+        stream = stream or sys.stdout
+        lines = ["\nStage timings:"]
+        labels = {path: "  " * self.stats[path]["depth"] + path.rsplit("/", 1)[-1] for path in self.timings}
+        width = max((len(label) for label in labels.values()), default=0)
+        for path, seconds in self.timings.items():
+            stat = self.stats[path]
+            line = f"  {labels[path]:<{width}}  {seconds * 1000:9.1f} ms"
+            if stat["rows"] is not None:
+                line += f"  {stat['rows']:>10} rows"
+            if stat["peak_bytes"] is not None:
+                line += f"  peak {stat['peak_bytes'] / 1e6:8.1f} MB"
+            lines.append(line)
+        lines.append(f"  {'total':<{width}}  {self.total() * 1000:9.1f} ms")
+        if wall is not None:
+            lines.append(f"  {'wall':<{width}}  {wall * 1000:9.1f} ms")
+        stream.write("\n".join(lines) + "\n")
+
+    def report(self) -> List[dict]:
+        return [
+            {
+                "stage": path,
+                "depth": self.stats[path]["depth"],
+                "seconds": round(seconds, 6),
+                "calls": self.stats[path]["calls"],
+                "rows": self.stats[path]["rows"],
+                "peak_mb": None if self.stats[path]["peak_bytes"] is None else round(self.stats[path]["peak_bytes"] / 1e6, 3),
+            }
+            for path, seconds in self.timings.items()
+        ]
+
+
+# Timer that library code reports into through stage(); None unless a script runs with --profile
+_ACTIVE: Optional[StageTimer] = None
+
+
+@contextmanager
+def stage(name: str, rows: Optional[int] = None) -> Iterator[dict]:
+    """Time a stage on the active profiler; with profiling off this only yields a throwaway record."""
+    if _ACTIVE is None:
+        yield {"rows": rows}
+        return
+    with _ACTIVE.stage(name, rows) as frame:
+        yield frame
+
+
+def add_profile_arguments(parser) -> None:
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Report wall time, rows and peak traced memory per pipeline stage on stderr (slower while tracing)",
+    )
+    parser.add_argument("--profile-json", default="", help="Also write the stage report as JSON to this path (implies --profile)")
+    parser.add_argument("--profile-cprofile", default="", help="Also run under cProfile and dump its stats to this path (implies --profile)")
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1e6 if sys.platform == "darwin" else 1e3), 1)
+
+
+@contextmanager
+def profiling(args, script: str, timer: Optional[StageTimer] = None) -> Iterator[Optional[StageTimer]]:
+    """
+    Run the body with stage profiling when the script was given --profile, --profile-json
+    or --profile-cprofile, then print the stage table to stderr and write the requested
+    JSON report / cProfile dump. Yields the active timer, or None when profiling is off.
+    """
+    global _ACTIVE
+    if not (args.profile or args.profile_json or args.profile_cprofile):
+        yield None
+        return
+
+    timer = timer or StageTimer()
+    timer.memory = True
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    profiler = None
+    if args.profile_cprofile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+    _ACTIVE = timer
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield timer
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        wall = time.perf_counter() - start
+        _ACTIVE = None
+        if started_tracing:
+            tracemalloc.stop()
+
+        timer.print_report(stream=sys.stderr, wall=wall)
+        if profiler is not None:
+            profiler.dump_stats(args.profile_cprofile)
+            print(f"Saved cProfile stats to {args.profile_cprofile} (inspect with: python -m pstats {args.profile_cprofile})", file=sys.stderr)
+        if args.profile_json:
+            report = {
+                "script": script,
+                "argv": sys.argv[1:],
+                "wall_seconds": round(wall, 6),
+                "stage_seconds": round(timer.total(), 6),
+                "peak_rss_mb": _peak_rss_mb(),
+                "stages": timer.report(),
+            }
+            with open(args.profile_json, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"Saved profile report to {args.profile_json}", file=sys.stderr)
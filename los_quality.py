@@ -0,0 +1,232 @@
+import argparse
+import sys
+from typing import List, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from los_calc import (
+    LOS_THRESHOLDS,
+    MOVEMENT_COLUMNS,
+    compute_hourly_los,
+    load_and_prepare,
+    parse_thresholds,
+)
+from los_format import write_lines
+
+
+INTERVAL = pd.Timedelta(minutes=15)
+SLOTS_PER_HOUR = 4
+SLOTS_PER_DAY = 96
+PROFILE_SLOTS = 7 * SLOTS_PER_DAY  # weekday x time-of-day cells per INTID
+
+
+class IntervalGrid(NamedTuple):
+    """Positions of prepared rows on a complete 15-minute grid shared by every INTID."""
+
+    intids: np.ndarray  # sorted distinct INTIDs (grid rows)
+    start: pd.Timestamp  # midnight of the first day
+    n_slots: int  # 15-minute slots from start to the end of the last day
+    row: np.ndarray  # grid row (INTID code) of every input row
+    slot: np.ndarray  # grid column (15-minute slot) of every input row
+    off_grid: np.ndarray  # rows whose time is not on a :00/:15/:30/:45 boundary
+    counts: np.ndarray  # rows seen per (INTID, slot), shape (len(intids), n_slots)
+
+
+def interval_grid(df: pd.DataFrame) -> IntervalGrid:
+    """
+    Place every prepared row with an INTID and datetime on a complete 15-minute grid.
+    The grid covers whole days from the first to the last date in the data for all
+    INTIDs, so an intersection that stopped reporting shows up as missing intervals.
+    Off-boundary times are counted in the slot they fall in.
+    """
+    data = df.dropna(subset=["INTID", "datetime"])
+    codes, intids = pd.factorize(data["INTID"], sort=True)
+    stamps = data["datetime"]
+    if stamps.empty:
+        start, n_slots = pd.Timestamp(0), 0
+    else:
+        start = stamps.min().floor("D")
+        n_slots = ((stamps.max().floor("D") - start).days + 1) * SLOTS_PER_DAY
+    offset = (stamps - start).to_numpy()
+    slot = (offset // np.timedelta64(15, "m")).astype("int64")
+    off_grid = offset % np.timedelta64(15, "m") != np.timedelta64(0, "ns")
+    counts = np.bincount(codes * n_slots + slot, minlength=len(intids) * n_slots).reshape(len(intids), n_slots)
+    return IntervalGrid(np.asarray(intids), start, n_slots, codes.astype("int64"), slot, off_grid, counts)
+
+
+def hourly_completeness(grid: IntervalGrid) -> pd.DataFrame:
+    """
+    One row per INTID and clock hour of the grid: intervals observed (distinct slots with
+    at least one row, 0-4), missing slots and extra duplicate rows.
+    """
+    per_hour = grid.counts.reshape(len(grid.intids), -1, SLOTS_PER_HOUR)
+    n_hours = per_hour.shape[1]
+    observed = (per_hour > 0).sum(axis=2)
+    duplicates = np.clip(per_hour - 1, 0, None).sum(axis=2)
+    hours = grid.start + pd.to_timedelta(np.arange(n_hours), unit="h")
+    return pd.DataFrame(
+        {
+            "INTID": np.repeat(grid.intids, n_hours),
+            "hour": np.tile(hours.to_numpy(), len(grid.intids)),
+            "observed_intervals": observed.ravel(),
+            "missing_intervals": (SLOTS_PER_HOUR - observed).ravel(),
+            "duplicate_intervals": duplicates.ravel(),
+        }
+    )
+
+
+def _profile_cell(grid: IntervalGrid, row: np.ndarray, slot: np.ndarray) -> np.ndarray:
+    weekday = (grid.start.dayofweek + slot // SLOTS_PER_DAY) % 7
+    return row * PROFILE_SLOTS + weekday * SLOTS_PER_DAY + slot % SLOTS_PER_DAY
+
+
+def fill_missing(df: pd.DataFrame, grid: IntervalGrid = None) -> pd.DataFrame:
+    """
+    Deduplicated copy of the prepared rows with missing grid intervals imputed.
+
+    Duplicate (INTID, datetime) rows keep the last one, as the rolling peak-hour code does.
+    A missing interval gets, per movement, the rounded mean of that INTID's observed counts
+    at the same weekday and time of day, or at the same time of day on any day when that
+    weekday has none (e.g. a single week of data); slots never observed at that time of day
+    stay missing. An `imputed` column marks the added rows.
+    """
+    data = df.dropna(subset=["INTID", "datetime"])
+    grid = grid if grid is not None else interval_grid(df)
+    keep = ~pd.DataFrame({"r": grid.row, "t": data["datetime"].to_numpy()}).duplicated(keep="last").to_numpy()
+    observed = data[keep]
+    row, slot = grid.row[keep], grid.slot[keep]
+
+    missing = np.flatnonzero(grid.counts.ravel() == 0)
+    miss_row, miss_slot = missing // max(grid.n_slots, 1), missing % max(grid.n_slots, 1)
+
+    # Two profiles per INTID: weekday x time of day, and time of day alone as the fallback
+    profiles = []
+    for cells, miss_cells, n_cells in (
+        (_profile_cell(grid, row, slot), _profile_cell(grid, miss_row, miss_slot), len(grid.intids) * PROFILE_SLOTS),
+        (row * SLOTS_PER_DAY + slot % SLOTS_PER_DAY, miss_row * SLOTS_PER_DAY + miss_slot % SLOTS_PER_DAY, len(grid.intids) * SLOTS_PER_DAY),
+    ):
+        seen = np.bincount(cells, minlength=n_cells)
+        profiles.append((cells, miss_cells, n_cells, seen[miss_cells]))
+    use_weekday = profiles[0][3] > 0
+    fillable = use_weekday | (profiles[1][3] > 0)
+
+    filled = {
+        "INTID": grid.intids[miss_row[fillable]],
+        "datetime": (grid.start + pd.to_timedelta(miss_slot[fillable] * 15, unit="m")).to_numpy(),
+    }
+    for col in MOVEMENT_COLUMNS:
+        values = observed[col].to_numpy(dtype="float64")
+        means = []
+        for cells, miss_cells, n_cells, seen in profiles:
+            sums = np.bincount(cells, weights=values, minlength=n_cells)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means.append(sums[miss_cells] / seen)
+        filled[col] = np.round(np.where(use_weekday, means[0], means[1])[fillable])
+
+    out = observed[["INTID", "datetime"] + MOVEMENT_COLUMNS].reset_index(drop=True)
+    imputed = pd.DataFrame(filled)
+    if isinstance(out["INTID"].dtype, pd.CategoricalDtype):
+        imputed["INTID"] = imputed["INTID"].astype(out["INTID"].dtype)
+    for col in MOVEMENT_COLUMNS:
+        imputed[col] = imputed[col].astype(out[col].dtype)
+    out["imputed"] = False
+    imputed["imputed"] = True
+    out = pd.concat([out, imputed], ignore_index=True)
+    out = out.sort_values(["INTID", "datetime"], kind="stable").reset_index(drop=True)
+    out.attrs = dict(df.attrs)
+    return out
+
+
+def quality_summary(grid: IntervalGrid) -> pd.DataFrame:
+    """Per-INTID counts of expected, observed, missing, duplicate and off-grid intervals and of incomplete hours."""
+    n = len(grid.intids)
+    per_hour = (grid.counts > 0).reshape(n, -1, SLOTS_PER_HOUR).sum(axis=2)
+    summary = pd.DataFrame(
+        {
+            "INTID": grid.intids,
+            "expected_intervals": np.full(n, grid.n_slots),
+            "observed_intervals": (grid.counts > 0).sum(axis=1),
+            "missing_intervals": (grid.counts == 0).sum(axis=1),
+            "duplicate_intervals": np.clip(grid.counts - 1, 0, None).sum(axis=1),
+            "off_grid_rows": np.bincount(grid.row[grid.off_grid], minlength=n),
+            "partial_hours": ((per_hour > 0) & (per_hour < SLOTS_PER_HOUR)).sum(axis=1),
+            "empty_hours": (per_hour == 0).sum(axis=1),
+        }
+    )
+    summary["completeness_pct"] = (100.0 * summary["observed_intervals"] / max(grid.n_slots, 1)).round(2)
+    return summary
+
+
+def flag_hourly(hourly: pd.DataFrame, completeness: pd.DataFrame, filled: pd.DataFrame = None) -> pd.DataFrame:
+    """Hourly LOS rows with the number of observed, duplicate and (when filled is given) imputed intervals behind each hour."""
+    flags = completeness[["INTID", "hour", "observed_intervals", "duplicate_intervals"]]
+    out = hourly.merge(flags, on=["INTID", "hour"], how="left")
+    out["imputed_intervals"] = 0
+    if filled is not None:
+        imputed = filled.loc[filled["imputed"], ["INTID", "datetime"]]
+        counts = imputed.groupby(["INTID", imputed["datetime"].dt.floor("h").rename("hour")], observed=True).size().rename("n")
+        out = out.merge(counts.reset_index(), on=["INTID", "hour"], how="left")
+        out["imputed_intervals"] = out.pop("n").fillna(0).astype("int64")
+    for col in ("observed_intervals", "duplicate_intervals"):
+        out[col] = out[col].fillna(0).astype("int64")
+    return out
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check 15-minute exports for missing, duplicate and off-grid intervals and optionally fill gaps.")
+    parser.add_argument("--csv", default="VehicleVolume_1Wal_2Hwy_4Hwy_11162025_11222025.csv", help="Path to input CSV")
+    parser.add_argument("--report", default="data_quality.csv", help="Path to save the incomplete or duplicated hours per INTID")
+    parser.add_argument("--out", default="", help="Optional path to save hourly LOS with observed/duplicate/imputed interval counts")
+    parser.add_argument("--fill", action="store_true", help="Impute missing intervals from the same INTID's weekday/time-of-day profile before scoring --out")
+    parser.add_argument("--thresholds", default="", help="Comma-separated 15-min volume upper bounds for A..E")
+    args = parser.parse_args(argv)
+
+    try:
+        thresholds = parse_thresholds(args.thresholds) if args.thresholds else LOS_THRESHOLDS
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    try:
+        df = load_and_prepare(args.csv, compact=True)
+    except FileNotFoundError as exc:
+        print(exc)
+        return 1
+
+    grid = interval_grid(df)
+    completeness = hourly_completeness(grid)
+    summary = quality_summary(grid)
+
+    header = f"{'INTID':<6} {'Expected':>8} {'Observed':>8} {'Missing':>7} {'Dupes':>5} {'OffGrid':>7} {'Partial h':>9} {'Empty h':>7} {'Complete':>8}"
+    lines = [
+        f"Data quality for {args.csv} ({grid.start:%Y-%m-%d} + {grid.n_slots // SLOTS_PER_DAY} days of 15-minute intervals):",
+        header,
+        "-" * len(header),
+    ]
+    lines += [
+        f"{str(r.INTID):<6} {r.expected_intervals:>8} {r.observed_intervals:>8} {r.missing_intervals:>7} {r.duplicate_intervals:>5} "
+        f"{r.off_grid_rows:>7} {r.partial_hours:>9} {r.empty_hours:>7} {r.completeness_pct:>7.2f}%"
+        for r in summary.itertuples(index=False)
+    ]
+    lines.append(
+        f"Skipped rows: {df.attrs.get('bad_lines', 0)} malformed CSV lines, "
+        f"{len(df.attrs.get('unparsed_rows', []))} with unparseable DATE/TIME"
+    )
+    write_lines(lines)
+
+    problems = completeness[(completeness["missing_intervals"] > 0) | (completeness["duplicate_intervals"] > 0)]
+    problems.to_csv(args.report, index=False)
+    print(f"\nSaved {len(problems)} incomplete or duplicated hours to {args.report}")
+
+    if args.out:
+        filled = fill_missing(df, grid) if args.fill else None
+        hourly = compute_hourly_los(filled if filled is not None else df, thresholds)
+        flagged = flag_hourly(hourly, completeness, filled).sort_values(["INTID", "hour"])
+        flagged.to_csv(args.out, index=False)
+        note = f", {int(filled['imputed'].sum())} intervals imputed" if filled is not None else ""
+        print(f"Saved {len(flagged)} flagged hourly rows to {args.out}{note}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+import json
+import os
+from typing import Dict, List, NamedTuple, Tuple
+
+
+class Intersection(NamedTuple):
+    name: str
+    corridors: Tuple[str, ...]  # every corridor the intersection lies on (usually both crossing roads)
+    zone: str
+
+
+# Human-friendly intersection names keyed by INTID
+INTID_NAMES: Dict[int, str] = {
+    1: "SW Regional Airport Blvd & SW I ST",
+    2: "Greenhouse & E Centerton Blvd",
+    3: "N Walton & Tiger Blvd",
+    4: "SW 14th ST & SW I ST",
+    5: "SW Regional Airport Blvd & SE Walton Blvd",
+}
+
+# Names only: corridor and zone memberships come from load_registry(<json>), see registry_example.json
+DEFAULT_REGISTRY: Dict[int, Intersection] = {intid: Intersection(name, (), "") for intid, name in INTID_NAMES.items()}
+
+LEVELS = ("corridor", "zone", "network")
+NETWORK = "Network"
+
+
+def intid_key(value):
+    """Registry key for an INTID: an int when the value is integral, the stripped string otherwise."""
+    text = str(value).strip()
+    try:
+        number = float(text)
+    except ValueError:
+        return text
+    return int(number) if number.is_integer() else text
+
+
+def load_registry(path: str) -> Dict[object, Intersection]:
+    """
+    Read an intersection registry from JSON:
+    {"intersections": {"<INTID>": {"name": ..., "corridors": [...], "zone": ...}, ...}}.
+    "corridor" may be given instead of "corridors" for a single corridor.
+    """
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Registry not found: {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    entries = data.get("intersections") if isinstance(data, dict) else None
+    if not isinstance(entries, dict):
+        raise ValueError(f"{path} must hold an object with an 'intersections' mapping of INTID to details")
+    registry = {}
+    for key, entry in entries.items():
+        corridors = entry.get("corridors", [entry["corridor"]] if entry.get("corridor") else [])
+        if isinstance(corridors, str):
+            corridors = [corridors]
+        registry[intid_key(key)] = Intersection(
+            str(entry.get("name") or f"INTID {key}"),
+            tuple(str(c) for c in corridors),
+            str(entry.get("zone") or ""),
+        )
+    return registry
+
+
+def memberships(registry: Dict[object, Intersection], level: str) -> List[Tuple[object, str]]:
+    """(INTID, group) pairs for one aggregation level; an INTID may belong to several corridors."""
+    if level == "corridor":
+        return [(intid, corridor) for intid, entry in registry.items() for corridor in entry.corridors]
+    if level == "zone":
+        return [(intid, entry.zone) for intid, entry in registry.items() if entry.zone]
+    if level == "network":
+        return [(intid, NETWORK) for intid in registry]
+    raise ValueError(f"level must be one of {LEVELS}, got: {level!r}")
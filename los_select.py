@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List, Optional, Sequence, Union
+
+# NumPy and pandas are imported where they are used, so scripts can build their
+# argument parsers from PER_CHOICES without loading them.
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+
+# Volumes are packed below the score in one float64 key: score * 2**40 + volume.
+# Integer volumes with |volume| < 2**39 keep the key exact and the score blocks disjoint.
+_VOLUME_SPAN = float(2 ** 39)
+_SCORE_STRIDE = float(2 ** 40)
+
+PER_CHOICES = ("none", "intid", "day")
+
+
+def _packed_key(df: pd.DataFrame, worst: bool) -> Optional[np.ndarray]:
+    """
+    Single sortable key equivalent to ordering by (los_score, total_volume), or None when
+    the volumes cannot be packed exactly (fractional or out of range).
+    Missing volumes sort after every real volume of the same score, as sort_values does.
+    """
+    import numpy as np
+    import pandas as pd
+
+    score = pd.to_numeric(df["los_score"], errors="coerce").to_numpy(dtype="float64")
+    volume = pd.to_numeric(df["total_volume"], errors="coerce").to_numpy(dtype="float64")
+    finite = volume[~np.isnan(volume)]
+    if finite.size and (np.any(finite != np.floor(finite)) or np.abs(finite).max() >= _VOLUME_SPAN):
+        return None
+    # Largest key first for worst, smallest first for best; NaN goes to the far end either way
+    fill = -_VOLUME_SPAN if worst else _VOLUME_SPAN
+    return score * _SCORE_STRIDE + np.where(np.isnan(volume), fill, volume)
+
+
+def _sorted_rank(df: pd.DataFrame, worst: bool) -> np.ndarray:
+    """Position of every row in a stable full sort; smaller is better."""
+    import numpy as np
+
+    ordered = df[["los_score", "total_volume"]].reset_index(drop=True).sort_values(
+        ["los_score", "total_volume"], ascending=[not worst, not worst], kind="stable"
+    )
+    rank = np.empty(len(df), dtype="float64")
+    rank[ordered.index.to_numpy()] = np.arange(len(df))
+    return rank
+
+
+def _group_keys(df: pd.DataFrame, per: Union[str, Sequence[str], None]) -> Optional[List[np.ndarray]]:
+    import pandas as pd
+
+    from los_format import to_hours
+
+    if per is None or per == "none":
+        return None
+    if per == "intid":
+        columns = [df["INTID"]]
+    elif per == "day":
+        columns = [to_hours(df["hour"]).dt.floor("D")]
+    elif isinstance(per, str):
+        columns = [df[per]]
+    else:
+        columns = [df[c] for c in per]
+    # Integer codes that order like the sorted distinct values
+    return [pd.factorize(c, sort=True)[0] for c in columns]
+
+
+def top_hours(
+    df: pd.DataFrame,
+    n: int = 10,
+    worst: bool = True,
+    per: Union[str, Sequence[str], None] = None,
+) -> pd.DataFrame:
+    """
+    Top-n hours by (los_score, total_volume), descending for worst and ascending for best,
+    without sorting the whole table. Ties keep their original row order, so the result
+    matches sort_values(...).head(n).
+
+    per selects independent top-n lists: None/"none" (overall), "intid", "day" (calendar
+    day of 'hour'), or any column name(s). Grouped results are ordered by group, then rank.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if n <= 0 or df.empty:
+        return df.iloc[0:0]
+
+    key = _packed_key(df, worst)
+    largest = worst
+    if key is None:
+        key, largest = _sorted_rank(df, worst), False
+    key = pd.Series(key)
+    groups = _group_keys(df, per)
+
+    if groups is None:
+        if n >= len(key):
+            # nlargest/nsmallest fall back to an unstable full sort here, which reorders ties
+            picked = key.sort_values(ascending=not largest, kind="stable")
+        else:
+            # nlargest/nsmallest use partial selection; keep="first" breaks ties by position
+            picked = key.nlargest(n, keep="first") if largest else key.nsmallest(n, keep="first")
+        return df.iloc[picked.index.to_numpy()]
+
+    rank = key.groupby(groups, sort=False).rank(method="first", ascending=not largest).to_numpy()
+    positions = np.flatnonzero(rank <= n)
+    order = np.lexsort([rank[positions]] + [g[positions] for g in reversed(groups)])
+    return df.iloc[positions[order]]
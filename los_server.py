@@ -0,0 +1,254 @@
+import argparse
+import json
+import sys
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+import average_los_by_intersection
+import best_los_summary
+import worst_los_summary
+from los_calc import (
+    LOS_THRESHOLDS,
+    MOVEMENT_COLUMNS,
+    SCORE_TO_LOS,
+    Thresholds,
+    classify_volumes,
+    compute_hourly_los,
+    load_and_prepare,
+    parse_thresholds,
+)
+
+
+RESOLUTIONS = ("hour", "15min")
+REPORTS = ("worst", "best", "average")
+
+
+class _Series:
+    """Rows of one INTID at one resolution, sorted by time, as plain NumPy columns."""
+
+    def __init__(self, stamps: np.ndarray, columns: Dict[str, np.ndarray]) -> None:
+        self.stamps = stamps
+        # Labels are formatted once here so lookups only slice
+        self.columns = {"time": pd.DatetimeIndex(stamps).strftime("%Y-%m-%d %H:%M").to_numpy(), **columns}
+
+    def between(self, start: np.datetime64, end: np.datetime64) -> List[dict]:
+        lo = np.searchsorted(self.stamps, start, side="left")
+        hi = np.searchsorted(self.stamps, end, side="left")
+        names = list(self.columns)
+        values = [self.columns[n][lo:hi].tolist() for n in names]
+        return [dict(zip(names, row)) for row in zip(*values)]
+
+
+def _index_by_intid(df: pd.DataFrame, time_col: str, columns: List[str]) -> Dict[str, _Series]:
+    df = df.sort_values(["INTID", time_col], kind="stable")
+    stamps = df[time_col].to_numpy(dtype="datetime64[ns]")
+    data = {c: df[c].to_numpy() for c in columns}
+    index = {}
+    for intid, rows in df.groupby("INTID", sort=True, observed=True).indices.items():
+        # groupby.indices are positions into the sorted frame, so each group is one contiguous run
+        sl = slice(rows[0], rows[-1] + 1)
+        index[str(intid)] = _Series(stamps[sl], {c: v[sl] for c, v in data.items()})
+    return index
+
+
+class LOSIndex:
+    """
+    Hourly and 15-minute LOS loaded once and indexed by (INTID, time).
+
+    Range lookups binary-search the per-INTID time arrays; the worst/best/average reports
+    reuse the summary builders on the full hourly table and are memoised in an LRU cache.
+    """
+
+    def __init__(self, intervals: pd.DataFrame, hourly: pd.DataFrame, thresholds: Thresholds = LOS_THRESHOLDS, cache_size: int = 128) -> None:
+        intervals = intervals.dropna(subset=["INTID", "datetime"])
+        volume = intervals[MOVEMENT_COLUMNS].to_numpy(dtype="float64").sum(axis=1)
+        scores = classify_volumes(volume, thresholds)
+        quarter = pd.DataFrame(
+            {
+                "INTID": intervals["INTID"].to_numpy(),
+                "datetime": intervals["datetime"].to_numpy(),
+                "total_volume": volume,
+                "los_score": scores.astype("int64"),
+                "LOS": pd.Series(scores).map(SCORE_TO_LOS).to_numpy(),
+            }
+        )
+        self.hourly = hourly.sort_values(["INTID", "hour"]).reset_index(drop=True)
+        value_cols = ["total_volume", "los_score", "LOS"]
+        self._series = {
+            "hour": _index_by_intid(self.hourly, "hour", value_cols),
+            "15min": _index_by_intid(quarter, "datetime", value_cols),
+        }
+        self.report = lru_cache(maxsize=cache_size)(self._report)
+
+    def intersections(self) -> List[dict]:
+        out = []
+        for intid, series in self._series["hour"].items():
+            stamps = pd.DatetimeIndex(series.stamps[[0, -1]])
+            out.append(
+                {
+                    "INTID": intid,
+                    "hours": len(series.stamps),
+                    "intervals": len(self._series["15min"][intid].stamps) if intid in self._series["15min"] else 0,
+                    "first_hour": f"{stamps[0]:%Y-%m-%d %H:%M}",
+                    "last_hour": f"{stamps[1]:%Y-%m-%d %H:%M}",
+                }
+            )
+        return out
+
+    def range(self, intid: str, start: pd.Timestamp, end: pd.Timestamp, resolution: str = "hour") -> List[dict]:
+        """Rows for one INTID with start <= time < end at the given resolution (naive local times)."""
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"resolution must be one of {RESOLUTIONS}, got: {resolution!r}")
+        for name, value in (("start", start), ("end", end)):
+            # Export times carry no zone; converting an offset would silently shift the range
+            if pd.Timestamp(value).tzinfo is not None:
+                raise ValueError(f"{name} must not include a time zone offset: {value}")
+        series = self._series[resolution].get(str(intid))
+        if series is None:
+            raise KeyError(f"Unknown INTID: {intid}")
+        return series.between(np.datetime64(start, "ns"), np.datetime64(end, "ns"))
+
+    def _report(self, kind: str, intid: Optional[str] = None, top: int = 10) -> str:
+        if kind not in REPORTS:
+            raise ValueError(f"report must be one of {REPORTS}, got: {kind!r}")
+        hourly = self.hourly
+        if intid is not None:
+            intid = str(intid)
+            if intid not in self._series["hour"]:
+                raise KeyError(f"Unknown INTID: {intid}")
+            # Filter before ranking so the top-N is taken within the requested INTID
+            hourly = hourly[hourly["INTID"].astype(str) == intid]
+
+        if kind == "worst":
+            per_int = worst_los_summary.build_per_intersection_summary(hourly).drop(columns=["worst_hours_list"])
+            overall = worst_los_summary.build_overall_worst(hourly, top=top)
+        elif kind == "best":
+            per_int = best_los_summary.build_per_intersection_best(hourly).drop(columns=["best_hours_list"])
+            overall = best_los_summary.build_overall_best(hourly, top=top)
+        else:
+            per_int = average_los_by_intersection.compute_intersection_averages(hourly)
+            overall = None
+        body = {"per_intersection": json.loads(per_int.to_json(orient="records"))}
+        if overall is not None:
+            body["overall"] = json.loads(overall.to_json(orient="records"))
+        # Cache the encoded body so repeated requests skip both the builders and serialisation
+        return json.dumps(body)
+
+
+def load_index(csv_path: str, thresholds: Thresholds = LOS_THRESHOLDS, cache_dir: str = "", cache_size: int = 128) -> LOSIndex:
+    if cache_dir:
+        from los_cache import cached_hourly_los, cached_prepare
+
+        intervals = cached_prepare(csv_path, cache_dir)
+        hourly = cached_hourly_los(csv_path, cache_dir=cache_dir, thresholds=thresholds)
+    else:
+        intervals = load_and_prepare(csv_path, compact=True)
+        hourly = compute_hourly_los(intervals, thresholds)
+    return LOSIndex(intervals, hourly, thresholds, cache_size)
+
+
+def _param(query: Dict[str, List[str]], name: str, default: Optional[str] = None) -> Optional[str]:
+    values = query.get(name)
+    return values[-1] if values else default
+
+
+def _parse_time(text: Optional[str], name: str) -> pd.Timestamp:
+    if not text:
+        raise ValueError(f"Missing required parameter: {name}")
+    try:
+        return pd.Timestamp(text)
+    except ValueError:
+        raise ValueError(f"Could not parse {name}: {text!r}")
+
+
+def handle_request(index: LOSIndex, path: str) -> Tuple[int, str]:
+    """Route one GET request to the index; returns (HTTP status, JSON body)."""
+    url = urlparse(path)
+    query = parse_qs(url.query)
+    route = url.path.rstrip("/") or "/"
+    try:
+        if route == "/intersections":
+            return 200, json.dumps(index.intersections())
+        if route == "/los":
+            intid = _param(query, "intid")
+            if not intid:
+                raise ValueError("Missing required parameter: intid")
+            rows = index.range(
+                intid,
+                _parse_time(_param(query, "start"), "start"),
+                _parse_time(_param(query, "end"), "end"),
+                _param(query, "resolution", "hour"),
+            )
+            return 200, json.dumps({"INTID": intid, "rows": rows})
+        if route.lstrip("/") in REPORTS:
+            top = int(_param(query, "top", "10"))
+            return 200, index.report(route.lstrip("/"), _param(query, "intid"), top)
+    except KeyError as exc:
+        return 404, json.dumps({"error": exc.args[0]})
+    except ValueError as exc:
+        return 400, json.dumps({"error": str(exc)})
+    return 404, json.dumps({"error": f"Unknown path: {url.path}"})
+
+
+def make_handler(index: LOSIndex, verbose: bool = False) -> type:
+    class LOSRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            status, body = handle_request(index, self.path)
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args) -> None:
+            if verbose:
+                super().log_message(format, *args)
+
+    return LOSRequestHandler
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve hourly and 15-minute LOS queries over HTTP from an in-memory index.")
+    parser.add_argument("--csv", default="VehicleVolume_1Wal_2Hwy_4Hwy_11162025_11222025.csv", help="Path to input CSV")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    parser.add_argument("--cache-dir", default="", help="Reuse typed binary caches of the parsed export")
+    parser.add_argument("--report-cache", type=int, default=128, help="Number of worst/best/average responses kept in the LRU cache")
+    parser.add_argument("--thresholds", default="", help="Comma-separated 15-min volume upper bounds for A..E")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args(argv)
+
+    try:
+        thresholds = parse_thresholds(args.thresholds) if args.thresholds else LOS_THRESHOLDS
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    start = time.perf_counter()
+    try:
+        index = load_index(args.csv, thresholds, args.cache_dir, args.report_cache)
+    except FileNotFoundError as exc:
+        print(exc)
+        return 1
+    print(f"Indexed {len(index.hourly)} hourly rows in {time.perf_counter() - start:.2f}s")
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(index, args.verbose))
+    print(f"Serving LOS queries on http://{args.host}:{server.server_address[1]}/ (Ctrl+C to stop)")
+    print("  /intersections  /los?intid=&start=&end=[&resolution=hour|15min]  /worst  /best  /average [?intid=&top=]")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+import argparse
+import json
+import os
+import struct
+import sys
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from los_calc import (
+    LOS_THRESHOLDS,
+    MOVEMENT_COLUMNS,
+    Thresholds,
+    compute_hourly_los,
+    load_and_prepare,
+    parse_thresholds,
+)
+
+
+# File layout: MAGIC, little-endian uint32 header length, JSON header, zero padding up to
+# data_offset, then a C-ordered uint16 array of shape (INTIDs, intervals, movements).
+MAGIC = b"LOSCOUNT"
+STORE_VERSION = 1
+DEFAULT_STORE = "los_counts.bin"
+COUNT_DTYPE = "<u2"
+MISSING = np.iinfo(COUNT_DTYPE).max  # every movement of an interval with no row
+ALIGNMENT = 4096
+INTERVAL = pd.Timedelta(minutes=15)
+SLOTS_PER_DAY = 96
+
+
+def _json_intid(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def write_store(df: pd.DataFrame, path: str) -> Tuple[int, int]:
+    """
+    Write prepared 15-minute rows (load_and_prepare output, compact or not) to a count store.
+    The time axis covers whole days from the first to the last date for every INTID; intervals
+    without a row are stored as MISSING and times between quarter hours fall in the interval
+    they start in. Returns (INTIDs, intervals).
+    """
+    data = df.dropna(subset=["INTID", "datetime"])
+    values = data[MOVEMENT_COLUMNS].to_numpy(dtype="float64")
+    if values.size and (values.min() < 0 or values.max() >= MISSING or not np.array_equal(values, np.floor(values))):
+        raise ValueError(f"Movement counts must be whole numbers from 0 to {MISSING - 1} to fit the count store")
+    intids, rows = np.unique(data["INTID"].to_numpy(), return_inverse=True)
+    if data.empty:
+        start, n_intervals = pd.Timestamp("1970-01-01"), 0
+    else:
+        start = data["datetime"].min().floor("D")
+        n_intervals = ((data["datetime"].max().floor("D") - start).days + 1) * SLOTS_PER_DAY
+    slots = ((data["datetime"] - start) // INTERVAL).to_numpy()
+
+    header = {
+        "version": STORE_VERSION,
+        "intids": [_json_intid(i) for i in intids],
+        "start": start.isoformat(),
+        "interval_minutes": 15,
+        "n_intervals": int(n_intervals),
+        "movements": MOVEMENT_COLUMNS,
+        "dtype": COUNT_DTYPE,
+        "missing": int(MISSING),
+    }
+    encoded = json.dumps(header).encode("utf-8")
+    data_offset = -(-(len(MAGIC) + 4 + len(encoded)) // ALIGNMENT) * ALIGNMENT
+    shape = (len(intids), n_intervals, len(MOVEMENT_COLUMNS))
+
+    # Write to a temp file first so a crashed conversion never leaves a truncated store
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(encoded)) + encoded)
+        f.truncate(data_offset + int(np.prod(shape)) * np.dtype(COUNT_DTYPE).itemsize)
+    if np.prod(shape):
+        counts = np.memmap(tmp_path, dtype=COUNT_DTYPE, mode="r+", offset=data_offset, shape=shape)
+        counts[:] = MISSING
+        # Later rows win for duplicate (INTID, interval) keys
+        counts[rows, slots] = values.astype(COUNT_DTYPE)
+        counts.flush()
+        del counts
+    os.replace(tmp_path, path)
+    return shape[0], shape[1]
+
+
+def _read_header(path: str) -> Tuple[dict, int]:
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Count store not found: {path}")
+    with open(path, "rb") as f:
+        prefix = f.read(len(MAGIC) + 4)
+        if len(prefix) < len(MAGIC) + 4 or prefix[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a count store (bad magic)")
+        (length,) = struct.unpack("<I", prefix[len(MAGIC):])
+        header = json.loads(f.read(length).decode("utf-8"))
+    if header.get("version") != STORE_VERSION:
+        raise ValueError(f"Unsupported count store version in {path}: {header.get('version')}")
+    data_offset = -(-(len(MAGIC) + 4 + length) // ALIGNMENT) * ALIGNMENT
+    return header, data_offset
+
+
+def _bound(value, name: str) -> pd.Timestamp:
+    """A range bound as a naive Timestamp; ValueError names the bound when it cannot be used."""
+    try:
+        ts = pd.Timestamp(value)
+    except ValueError:
+        raise ValueError(f"Could not parse {name}: {value!r}") from None
+    if pd.isna(ts) or ts.tzinfo is not None:
+        raise ValueError(f"Could not parse {name}: {value!r} (expected a local time such as 2025-11-18)")
+    return ts
+
+
+class CountStore:
+    """
+    Read-only, memory-mapped view of a count store.
+
+    Opening reads only the header, whatever the size of the history; slice() returns a
+    zero-copy (intervals x movements) view for one INTID, and frame() materialises just the
+    requested INTIDs and dates as a prepared frame that compute_hourly_los accepts.
+    """
+
+    def __init__(self, path: str) -> None:
+        header, data_offset = _read_header(path)
+        self.path = path
+        self.intids = np.asarray(header["intids"])
+        self.start = pd.Timestamp(header["start"])
+        self.n_intervals = int(header["n_intervals"])
+        self.movements = list(header["movements"])
+        self._rows = {str(intid): i for i, intid in enumerate(header["intids"])}
+        shape = (len(self.intids), self.n_intervals, len(self.movements))
+        if np.prod(shape):
+            self.counts = np.memmap(path, dtype=header["dtype"], mode="r", offset=data_offset, shape=shape)
+        else:
+            self.counts = np.empty(shape, dtype=header["dtype"])
+
+    @property
+    def end(self) -> pd.Timestamp:
+        """Start of the first interval after the stored history."""
+        return self.start + self.n_intervals * INTERVAL
+
+    def row(self, intid) -> int:
+        try:
+            return self._rows[str(intid)]
+        except KeyError:
+            raise KeyError(f"Unknown INTID: {intid}") from None
+
+    def slots(self, start=None, end=None) -> slice:
+        """Interval positions with start <= interval start < end, clipped to the stored history."""
+        lo = 0 if start is None else -((self.start - _bound(start, "start")) // INTERVAL)
+        hi = self.n_intervals if end is None else -((self.start - _bound(end, "end")) // INTERVAL)
+        lo, hi = (min(max(v, 0), self.n_intervals) for v in (lo, hi))
+        return slice(lo, max(lo, hi))
+
+    def times(self, slots: slice) -> pd.DatetimeIndex:
+        return pd.date_range(self.start + slots.start * INTERVAL, periods=slots.stop - slots.start, freq=INTERVAL)
+
+    def slice(self, intid, start=None, end=None) -> np.ndarray:
+        """Zero-copy (intervals x movements) uint16 view; MISSING marks intervals without a row."""
+        return self.counts[self.row(intid), self.slots(start, end)]
+
+    def frame(self, intids: Optional[Sequence] = None, start=None, end=None) -> pd.DataFrame:
+        """Prepared rows (INTID, datetime, movements) for the given INTIDs and date range, missing intervals dropped."""
+        rows = np.arange(len(self.intids)) if intids is None else np.array([self.row(i) for i in intids], dtype="int64")
+        slots = self.slots(start, end)
+        block = np.asarray(self.counts[rows, slots])
+        present = (block != MISSING).any(axis=2)
+        which_row, which_slot = np.nonzero(present)
+        values = block[which_row, which_slot]
+        out = pd.DataFrame(
+            {
+                "INTID": self.intids[rows][which_row],
+                "datetime": self.times(slots).to_numpy()[which_slot] if len(which_slot) else np.array([], dtype="datetime64[ns]"),
+            }
+        )
+        for j, col in enumerate(self.movements):
+            out[col] = values[:, j]
+        return out
+
+
+def hourly_from_store(
+    path: str,
+    intids: Optional[Sequence] = None,
+    start=None,
+    end=None,
+    thresholds: Thresholds = LOS_THRESHOLDS,
+) -> pd.DataFrame:
+    """compute_hourly_los over one INTID/date range of a count store, without reading the rest."""
+    return compute_hourly_los(CountStore(path).frame(intids, start, end), thresholds)
+
+
+def parse_intids(text: str) -> Optional[List[str]]:
+    """Comma-separated INTIDs from the command line, or None for all."""
+    values = [v.strip() for v in text.split(",") if v.strip()] if text else []
+    return values or None
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert exports into a memory-mapped 15-minute count store, or query a range of it.")
+    parser.add_argument("--csv", action="append", default=[], help="Export CSV to convert (repeat for several files); omit to query --store")
+    parser.add_argument("--store", default=DEFAULT_STORE, help=f"Count store file to write or read (default: {DEFAULT_STORE})")
+    parser.add_argument("--intid", default="", help="Comma-separated INTIDs to query (default: all)")
+    parser.add_argument("--start", default=None, help="Query intervals at or after this time (e.g. 2025-11-18)")
+    parser.add_argument("--end", default=None, help="Query intervals before this time")
+    parser.add_argument("--out", default="", help="Optional path to save the queried hourly LOS")
+    parser.add_argument("--thresholds", default="", help="Comma-separated 15-min volume upper bounds for A..E")
+    args = parser.parse_args(argv)
+
+    try:
+        thresholds = parse_thresholds(args.thresholds) if args.thresholds else LOS_THRESHOLDS
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    if args.csv:
+        try:
+            frames = [load_and_prepare(path, compact=True) for path in args.csv]
+        except FileNotFoundError as exc:
+            print(exc)
+            return 1
+        df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+        try:
+            n_intids, n_intervals = write_store(df, args.store)
+        except ValueError as exc:
+            print(exc)
+            return 1
+        print(f"Stored {n_intids} INTIDs x {n_intervals} intervals in {args.store}")
+        return 0
+
+    from los_format import hourly_lines, write_lines
+
+    try:
+        hourly = hourly_from_store(args.store, parse_intids(args.intid), args.start, args.end, thresholds)
+    except FileNotFoundError as exc:
+        print(f"{exc}. Convert exports first with 'python los_store.py --csv <export.csv>'.")
+        return 1
+    except (KeyError, ValueError) as exc:
+        print(exc.args[0] if isinstance(exc, KeyError) else exc)
+        return 1
+    write_lines(hourly_lines(hourly.sort_values(["INTID", "hour"])))
+    if args.out:
+        hourly.to_csv(args.out, index=False)
+        print(f"Saved {len(hourly)} hourly rows to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
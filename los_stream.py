@@ -0,0 +1,283 @@
+import argparse
+import csv
+import os
+import sys
+import time
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+import pandas as pd
+
+from los_calc import (
+    LOS_THRESHOLDS,
+    LOS_TO_SCORE,
+    MOVEMENT_COLUMNS,
+    SCORE_TO_LOS,
+    Thresholds,
+    _time_of_day_minutes,
+    parse_thresholds,
+)
+
+
+INTERVAL = timedelta(minutes=15)
+INTERVALS_PER_HOUR = 4  # 15-minute counts that complete a clock hour
+WINDOW_INTERVALS = INTERVALS_PER_HOUR  # default rolling window: one hour
+
+
+class _IntersectionState:
+    """Open clock hour and the last (up to) one hour of contiguous intervals for one INTID."""
+
+    __slots__ = ("last", "hour", "hour_volume", "hour_score_sum", "hour_intervals", "window", "window_volume", "window_score_sum", "alerting")
+
+    def __init__(self, window: int) -> None:
+        self.last: Optional[datetime] = None
+        self.hour: Optional[datetime] = None
+        self.hour_volume = 0.0
+        self.hour_score_sum = 0
+        self.hour_intervals = 0
+        self.window: deque = deque(maxlen=window)
+        self.window_volume = 0.0
+        self.window_score_sum = 0
+        self.alerting = False
+
+
+class StreamingLOS:
+    """
+    Constant-time-per-row hourly and rolling-hour LOS for a live 15-minute feed.
+
+    Each INTID keeps the partial sums of its open clock hour (the same volume / score
+    sum / interval count that compute_hourly_los aggregates) and a fixed-size window of
+    the most recent contiguous intervals. push() returns the event lines produced by one
+    row: a finished hour when its fourth interval (or a later hour) arrives, and an alert
+    when the rolling one-hour LOS enters or leaves the alert band (E/F by default).
+    Rows at or before an INTID's last interval are ignored, so overlapping reads are safe.
+    """
+
+    def __init__(self, thresholds: Thresholds = LOS_THRESHOLDS, alert_los: str = "E", window: int = WINDOW_INTERVALS) -> None:
+        self.bounds = [float(t) for t, _ in thresholds]
+        self.band_scores = [LOS_TO_SCORE[los] for _, los in thresholds] + [LOS_TO_SCORE["F"]]
+        self.alert_score = LOS_TO_SCORE[alert_los]
+        self.window = window
+        self.states: Dict[str, _IntersectionState] = {}
+        self.rows = 0
+        self.skipped = 0
+
+    def classify(self, volume: float) -> int:
+        # bisect_left matches classify_volumes' searchsorted(side="left")
+        return self.band_scores[bisect_left(self.bounds, volume)]
+
+    def push(self, intid: str, stamp: datetime, volume: float) -> List[str]:
+        state = self.states.get(intid)
+        if state is None:
+            state = self.states[intid] = _IntersectionState(self.window)
+        if state.last is not None and stamp <= state.last:
+            self.skipped += 1
+            return []
+        self.rows += 1
+        events = []
+        score = self.classify(volume)
+
+        hour = stamp.replace(minute=0, second=0, microsecond=0)
+        if state.hour is not None and hour != state.hour:
+            events.append(self._close_hour(intid, state))
+        state.hour = hour
+        state.hour_volume += volume
+        state.hour_score_sum += score
+        state.hour_intervals += 1
+
+        # Rolling window over contiguous intervals; a gap starts a new window
+        if state.last is not None and stamp - state.last != INTERVAL:
+            state.window.clear()
+            state.window_volume = 0.0
+            state.window_score_sum = 0
+        if len(state.window) == self.window:
+            old_volume, old_score = state.window[0]
+            state.window_volume -= old_volume
+            state.window_score_sum -= old_score
+        state.window.append((volume, score))
+        state.window_volume += volume
+        state.window_score_sum += score
+        state.last = stamp
+
+        rolling_score = round(state.window_score_sum / len(state.window))
+        if (rolling_score >= self.alert_score) != state.alerting:
+            state.alerting = not state.alerting
+            kind = "ALERT" if state.alerting else "CLEAR"
+            start = stamp - (len(state.window) - 1) * INTERVAL
+            events.append(
+                f"{kind} INTID {intid} | {start:%Y-%m-%d %H:%M}-{stamp + INTERVAL:%H:%M} | "
+                f"rolling volume={int(state.window_volume)} | LOS={SCORE_TO_LOS[rolling_score]} | score={rolling_score}"
+            )
+
+        # The clock hour closes on its fourth interval whatever the rolling window size
+        if state.hour_intervals == INTERVALS_PER_HOUR:
+            events.append(self._close_hour(intid, state))
+        return events
+
+    def _close_hour(self, intid: str, state: _IntersectionState) -> str:
+        score = round(state.hour_score_sum / state.hour_intervals)
+        line = (
+            f"HOUR INTID {intid} | {state.hour:%Y-%m-%d %H:%M:%S} | volume={int(state.hour_volume)} | "
+            f"LOS={SCORE_TO_LOS[score]} | score={score}"
+        )
+        state.hour = None
+        state.hour_volume = 0.0
+        state.hour_score_sum = 0
+        state.hour_intervals = 0
+        return line
+
+    def flush(self) -> List[str]:
+        """Close every hour that is still open (end of input)."""
+        return [self._close_hour(intid, state) for intid, state in self.states.items() if state.hour is not None]
+
+
+class RowDecoder:
+    """Turns export lines into (INTID, timestamp, total volume); DATE and TIME strings are decoded once each."""
+
+    def __init__(self) -> None:
+        self.columns: Optional[Dict[str, int]] = None
+        self._dates: Dict[str, Optional[datetime]] = {}
+        self._times: Dict[str, float] = {}
+        self.bad_rows = 0
+
+    def _date(self, text: str) -> Optional[datetime]:
+        day = self._dates.get(text, False)
+        if day is False:
+            try:
+                day = datetime.strptime(text.strip(), "%m/%d/%Y")
+            except ValueError:
+                parsed = pd.to_datetime(text.strip(), errors="coerce", format="mixed")
+                day = None if pd.isna(parsed) else parsed.to_pydatetime().replace(hour=0, minute=0, second=0, microsecond=0)
+            self._dates[text] = day
+        return day
+
+    def _minutes(self, text: str) -> float:
+        minutes = self._times.get(text)
+        if minutes is None:
+            minutes = self._times[text] = _time_of_day_minutes(text)
+        return minutes
+
+    def decode(self, line: str):
+        """Return (intid, stamp, volume) for a data row, None for header, note and unparseable lines."""
+        try:
+            fields = next(csv.reader([line]), [])
+        except csv.Error:
+            fields = [""]
+        if self.columns is None:
+            # Note lines above the header are skipped, as in load_and_prepare
+            if "DATE" in fields and "TIME" in fields and "INTID" in fields:
+                self.columns = {name.strip(): i for i, name in enumerate(fields)}
+            return None
+        if not fields or "DATE" in fields:
+            return None
+        cols = self.columns
+        try:
+            intid = fields[cols["INTID"]].strip()
+            day = self._date(fields[cols["DATE"]])
+            minutes = self._minutes(fields[cols["TIME"]])
+        except IndexError:
+            day, minutes, intid = None, float("nan"), ""
+        if day is None or minutes != minutes or not intid:
+            self.bad_rows += 1
+            return None
+        volume = 0.0
+        for name in MOVEMENT_COLUMNS:
+            idx = cols.get(name)
+            if idx is None or idx >= len(fields):
+                continue
+            try:
+                volume += float(fields[idx])
+            except ValueError:
+                # '*' (movement absent) and blanks count as 0, like pd.to_numeric(...).fillna(0)
+                pass
+        return intid, day + timedelta(minutes=minutes), volume
+
+
+def follow_lines(path: str, poll: float = 1.0, follow: bool = True) -> Iterator[str]:
+    """
+    Yield complete lines of a growing file, reading each byte once. A line is only
+    yielded once its newline has been written; if the file shrinks (rotated or
+    truncated) reading restarts from the top of the new file.
+    """
+    with open(path, "r", encoding="utf-8", errors="ignore", newline="") as f:
+        pending = ""
+        while True:
+            chunk = f.readline()
+            if chunk:
+                pending += chunk
+                if pending.endswith("\n"):
+                    yield pending.rstrip("\r\n")
+                    pending = ""
+                continue
+            if not follow:
+                break
+            try:
+                if os.path.getsize(path) < f.tell():
+                    f.seek(0)
+                    pending = ""
+                    continue
+            except OSError:
+                pass
+            time.sleep(poll)
+        if pending:
+            yield pending.rstrip("\r\n")
+
+
+def run_stream(lines: Iterable[str], engine: StreamingLOS, out: TextIO = sys.stdout, alerts_only: bool = False) -> RowDecoder:
+    decoder = RowDecoder()
+    for line in lines:
+        row = decoder.decode(line)
+        if row is None:
+            continue
+        for event in engine.push(*row):
+            if not alerts_only or not event.startswith("HOUR"):
+                print(event, file=out, flush=True)
+    for event in engine.flush():
+        if not alerts_only:
+            print(event, file=out, flush=True)
+    return decoder
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Real-time hourly and rolling-hour LOS from a live 15-minute count feed.")
+    parser.add_argument("--csv", default="-", help="Export CSV to tail, or '-' to read rows from stdin (default: -)")
+    parser.add_argument("--follow", action="store_true", help="Keep waiting for rows appended to --csv (like tail -f)")
+    parser.add_argument("--poll", type=float, default=1.0, help="Seconds between checks for new rows with --follow (default: 1.0)")
+    parser.add_argument("--alert-los", default="E", choices=list("BCDEF"), help="Alert when the rolling-hour LOS reaches this letter (default: E)")
+    parser.add_argument("--alerts-only", action="store_true", help="Print only ALERT/CLEAR lines, not finished hours")
+    parser.add_argument("--thresholds", default="", help="Comma-separated 15-min volume upper bounds for A..E")
+    args = parser.parse_args(argv)
+
+    try:
+        thresholds = parse_thresholds(args.thresholds) if args.thresholds else LOS_THRESHOLDS
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    engine = StreamingLOS(thresholds, alert_los=args.alert_los)
+    if args.csv == "-":
+        lines = (line.rstrip("\r\n") for line in sys.stdin)
+    else:
+        try:
+            open(args.csv, "rb").close()
+        except FileNotFoundError:
+            print(f"CSV not found: {args.csv}")
+            return 1
+        lines = follow_lines(args.csv, poll=args.poll, follow=args.follow)
+
+    try:
+        decoder = run_stream(lines, engine, alerts_only=args.alerts_only)
+    except KeyboardInterrupt:
+        return 0
+    if decoder.bad_rows or engine.skipped:
+        print(
+            f"Warning: skipped {decoder.bad_rows} rows with unparseable DATE/TIME/INTID and "
+            f"{engine.skipped} rows not newer than their INTID's last interval",
+            file=sys.stderr,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
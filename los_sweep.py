@@ -0,0 +1,195 @@
+import argparse
+import sys
+from typing import List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from average_los_by_intersection import AVERAGE_BANDS, parse_bands, score_to_letter
+from los_calc import LOS_THRESHOLDS, MOVEMENT_COLUMNS, SCORE_TO_LOS, Thresholds, classify_volumes, load_and_prepare, parse_thresholds
+from los_format import write_lines
+from los_profile import add_profile_arguments, profiling, stage
+
+
+class Scenario(NamedTuple):
+    name: str
+    thresholds: Thresholds  # 15-minute volume bands, as in LOS_THRESHOLDS
+    bands: Sequence[Tuple[float, str]]  # average-score bands, as in AVERAGE_BANDS
+
+
+BASE_SCENARIO = Scenario("base", LOS_THRESHOLDS, AVERAGE_BANDS)
+
+
+def parse_scenario(text: str) -> Scenario:
+    """
+    NAME=THRESHOLDS[/BANDS], e.g. "strict=80,160,300,450,600/1.1,1.9,2.7,3.5,4.3";
+    BANDS defaults to the average-score bands of average_los_by_intersection.py.
+    """
+    name, sep, spec = text.partition("=")
+    if not sep or not name.strip():
+        raise ValueError(f"Scenario must look like NAME=THRESHOLDS[/BANDS], got: {text!r}")
+    thresholds, _, bands = spec.partition("/")
+    return Scenario(name.strip(), parse_thresholds(thresholds), parse_bands(bands) if bands.strip() else AVERAGE_BANDS)
+
+
+class VolumeIndex(NamedTuple):
+    """Everything about the interval data that no scenario changes, computed once."""
+
+    intids: np.ndarray  # INTID of each hourly cell
+    hours: np.ndarray  # clock hour of each hourly cell
+    hour_volume: np.ndarray  # total volume of each hourly cell
+    intervals: np.ndarray  # 15-minute rows in each hourly cell
+    cell: np.ndarray  # hourly cell of every 15-minute row
+    volumes: np.ndarray  # distinct 15-minute volumes, sorted
+    volume_code: np.ndarray  # position of every row's volume in `volumes`
+    intid_of_cell: np.ndarray  # INTID code of each hourly cell
+    intid_values: np.ndarray  # distinct INTIDs, sorted
+
+
+def index_volumes(df: pd.DataFrame) -> VolumeIndex:
+    """
+    One pass over prepared 15-minute rows: interval totals, their (INTID, hour) cell and
+    the distinct volumes. Counts repeat heavily, so scenarios classify the distinct
+    volumes only and gather the scores back per row.
+    """
+    with stage("index volumes", rows=len(df)):
+        return _index_volumes(df)
+
+
+def _index_volumes(df: pd.DataFrame) -> VolumeIndex:
+    data = df.dropna(subset=["INTID", "datetime"])
+    # Same NaN-skipping row sum as _hourly_partials
+    volume = data[MOVEMENT_COLUMNS].sum(axis=1).to_numpy(dtype="float64")
+    intid_codes, intid_values = pd.factorize(data["INTID"], sort=True)
+    hours = data["datetime"].dt.floor("h").to_numpy()
+    hour_codes, hour_values = pd.factorize(hours, sort=True)
+    cells, cell = np.unique(intid_codes.astype("int64") * len(hour_values) + hour_codes, return_inverse=True)
+    volumes, volume_code = np.unique(volume, return_inverse=True)
+    intid_of_cell = cells // len(hour_values)
+    return VolumeIndex(
+        intids=np.asarray(intid_values)[intid_of_cell],
+        hours=np.asarray(hour_values)[cells % len(hour_values)],
+        hour_volume=np.bincount(cell, weights=volume, minlength=len(cells)),
+        intervals=np.bincount(cell, minlength=len(cells)),
+        cell=cell,
+        volumes=volumes,
+        volume_code=volume_code,
+        intid_of_cell=intid_of_cell,
+        intid_values=np.asarray(intid_values),
+    )
+
+
+def scenario_hourly(index: VolumeIndex, thresholds: Thresholds) -> np.ndarray:
+    """Hourly LOS scores for one threshold table, equal to compute_hourly_los' los_score for the same rows."""
+    scores = classify_volumes(index.volumes, thresholds)[index.volume_code]
+    score_sum = np.bincount(index.cell, weights=scores, minlength=len(index.intervals))
+    return np.round(score_sum / index.intervals).astype("int64")
+
+
+def run_sweep(index: VolumeIndex, scenarios: Sequence[Scenario]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    (hourly, averages) for every scenario: hourly LOS per (scenario, INTID, hour) and the
+    unrounded average hourly score per (scenario, INTID) with its letter from the scenario's bands.
+    """
+    hourly_parts, average_parts = [], []
+    n_intids = len(index.intid_values)
+    hours_per_intid = np.bincount(index.intid_of_cell, minlength=n_intids)
+    for scenario in scenarios:
+        with stage("classify scenario", rows=len(index.cell)):
+            scores = scenario_hourly(index, scenario.thresholds)
+        hourly_parts.append(
+            pd.DataFrame(
+                {
+                    "scenario": scenario.name,
+                    "INTID": index.intids,
+                    "hour": index.hours,
+                    "total_volume": index.hour_volume,
+                    "los_score": scores,
+                    "LOS": pd.Series(scores).map(SCORE_TO_LOS).to_numpy(),
+                }
+            )
+        )
+        averages = np.bincount(index.intid_of_cell, weights=scores, minlength=n_intids) / hours_per_intid
+        average_parts.append(
+            pd.DataFrame(
+                {
+                    "scenario": scenario.name,
+                    "INTID": index.intid_values,
+                    "avg_hourly_score": averages,
+                    "avg_LOS": [score_to_letter(a, scenario.bands) for a in averages.tolist()],
+                    "hours_E_or_worse": np.bincount(index.intid_of_cell, weights=scores >= 5, minlength=n_intids).astype("int64"),
+                }
+            )
+        )
+    return pd.concat(hourly_parts, ignore_index=True), pd.concat(average_parts, ignore_index=True)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare LOS threshold / averaging-band scenarios from one pass over the export.")
+    parser.add_argument("--csv", default="VehicleVolume_1Wal_2Hwy_4Hwy_11162025_11222025.csv", help="Path to input CSV")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        default=[],
+        help="NAME=THRESHOLDS[/BANDS], repeatable, e.g. strict=80,160,300,450,600/1.1,1.9,2.7,3.5,4.3 (the built-in tables run as 'base')",
+    )
+    parser.add_argument("--no-base", action="store_true", help="Do not add the built-in thresholds and bands as scenario 'base'")
+    parser.add_argument("--cache-dir", default="", help="Reuse typed binary caches of the parsed export")
+    parser.add_argument("--out", default="scenario_averages.csv", help="Path to save per-scenario, per-INTID averages")
+    parser.add_argument("--hourly-out", default="", help="Optional path to save hourly LOS for every scenario")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    try:
+        scenarios = [parse_scenario(text) for text in args.scenario]
+    except ValueError as exc:
+        parser.error(str(exc))
+    if not args.no_base:
+        scenarios.insert(0, BASE_SCENARIO)
+    if not scenarios:
+        parser.error("No scenarios to run: pass --scenario or drop --no-base")
+    names = [s.name for s in scenarios]
+    if len(set(names)) != len(names):
+        parser.error(f"Scenario names must be unique, got: {', '.join(names)}")
+    with profiling(args, "los_sweep"):
+        return run(args, scenarios)
+
+
+def run(args: argparse.Namespace, scenarios: List[Scenario]) -> int:
+    names = [s.name for s in scenarios]
+    try:
+        if args.cache_dir:
+            from los_cache import cached_prepare
+
+            df = cached_prepare(args.csv, cache_dir=args.cache_dir)
+        else:
+            df = load_and_prepare(args.csv, compact=True)
+    except FileNotFoundError as exc:
+        print(exc)
+        return 1
+
+    index = index_volumes(df)
+    hourly, averages = run_sweep(index, scenarios)
+
+    # One column per scenario: "<average> <letter>" for each INTID
+    width = max(12, max(len(n) for n in names))
+    header = f"{'INTID':<6} " + " ".join(f"{n:>{width}}" for n in names)
+    lines = ["Average hourly LOS per intersection and scenario:", header, "-" * len(header)]
+    table = averages.set_index(["INTID", "scenario"])
+    for intid in index.intid_values.tolist():
+        cells = [f"{table.at[(intid, n), 'avg_hourly_score']:.2f} {table.at[(intid, n), 'avg_LOS']}" for n in names]
+        lines.append(f"{str(intid):<6} " + " ".join(f"{c:>{width}}" for c in cells))
+    shares = hourly.groupby("scenario", sort=False)["los_score"].agg(lambda s: (s >= 5).mean() * 100)
+    lines.append(f"{'E/F %':<6} " + " ".join(f"{shares[n]:>{width - 1}.1f}%" for n in names))
+    write_lines(lines)
+
+    averages.to_csv(args.out, index=False)
+    print(f"\nSaved {len(scenarios)} scenarios x {len(index.intid_values)} intersections to {args.out}")
+    if args.hourly_out:
+        hourly.to_csv(args.hourly_out, index=False)
+        print(f"Saved {len(hourly)} scenario-hours to {args.hourly_out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,34 @@
+from __future__ import annotations
+
 import argparse
 import os
-import pandas as pd
-import matplotlib.pyplot as plt
+from typing import TYPE_CHECKING
 
+from los_profile import add_profile_arguments, profiling, stage
+from los_registry import INTID_NAMES
 
-REQUIRED_COLUMNS = {"INTID", "hour", "total_volume"}
+# pandas is imported inside the functions that use it, so --help and argument errors
+# answer without loading it.
+if TYPE_CHECKING:
+    import pandas as pd
 
-# Human-friendly intersection names keyed by INTID
-INTID_NAMES = {
-    1: "SW Regional Airport Blvd & SW I ST",
-    2: "Greenhouse & E Centerton Blvd",
-    3: "N Walton & Tiger Blvd",
-    4: "SW 14th ST & SW I ST",
-    5: "SW Regional Airport Blvd & SE Walton Blvd",
-}
+
+REQUIRED_COLUMNS = {"INTID", "hour", "total_volume"}
 
 
-def load_hourly_results(csv_path: str) -> pd.DataFrame:
+def load_hourly_results(csv_path: str, cache_dir: str = "") -> pd.DataFrame:
     """Load hourly results (from los_calc) and ensure types are correct."""
+    import pandas as pd
+
     if not os.path.isfile(csv_path):
         raise FileNotFoundError(f"CSV not found: {csv_path}")
 
-    df = pd.read_csv(csv_path)
+    if cache_dir:
+        from los_cache import cached_results
+
+        df = cached_results(csv_path, cache_dir=cache_dir)
+    else:
+        df = pd.read_csv(csv_path)
     missing = REQUIRED_COLUMNS - set(df.columns)
     if missing:
         raise ValueError(
@@ -29,37 +36,53 @@ def load_hourly_results(csv_path: str) -> pd.DataFrame:
             "Run los_calc.py first to generate los_results.csv."
         )
 
-    df = df[list(REQUIRED_COLUMNS)]
-    df["hour"] = pd.to_datetime(df["hour"], errors="coerce")
+    # los_score is kept when present for the LOS heatmaps
+    df = df[[c for c in ("INTID", "hour", "total_volume", "los_score") if c in df.columns]].copy()
+    if not pd.api.types.is_datetime64_any_dtype(df["hour"]):
+        df["hour"] = pd.to_datetime(df["hour"], errors="coerce")
     df = df.dropna(subset=["hour"])
     df["INTID"] = pd.to_numeric(df["INTID"], errors="coerce").astype(int)
     df["total_volume"] = pd.to_numeric(df["total_volume"], errors="coerce").fillna(0)
     return df.sort_values(["INTID", "hour"])
 
 
-def plot_all_intersections_one_chart(df: pd.DataFrame, out_dir: str) -> None:
-    """Single chart: average total volume by hour-of-day, one line per INTID."""
-    os.makedirs(out_dir, exist_ok=True)
+def new_figure(**kwargs):
+    """
+    A matplotlib Figure attached to the Agg canvas. pyplot (and with it GUI backend
+    discovery) is never imported, and matplotlib itself is only loaded when drawing.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(**kwargs)
+    FigureCanvasAgg(fig)
+    return fig
 
+
+def hourly_profile(df: pd.DataFrame) -> pd.DataFrame:
+    """Average total volume for each INTID at each hour-of-day across all days."""
     df = df.copy()
     df["hour_of_day"] = df["hour"].dt.hour
-
-    # Average total volume for each INTID at each hour-of-day across all days
-    hourly_avg = (
+    return (
         df.groupby(["INTID", "hour_of_day"], as_index=False)["total_volume"]
         .mean()
         .sort_values(["INTID", "hour_of_day"])
     )
 
-    plt.figure(figsize=(12, 6))
-    intids = [1, 2, 3, 4, 5]
+
+def plot_all_intersections_one_chart(df: pd.DataFrame, out_dir: str) -> None:
+    """Single chart: average total volume by hour-of-day, one line per INTID."""
+    plot_hourly_profile(hourly_profile(df), out_dir)
+
+
+def draw_hourly_profile(fig, hourly_avg: pd.DataFrame) -> None:
+    """Draw one line per INTID present in the (INTID, hour_of_day, total_volume) averages."""
+    ax = fig.subplots()
+    intids = sorted(hourly_avg["INTID"].unique().tolist())
     for intid in intids:
         sub = hourly_avg[hourly_avg["INTID"] == intid]
-        if sub.empty:
-            print(f"No data for INTID {intid}; skipping line plot.")
-            continue
         label = INTID_NAMES.get(intid, f"INTID {intid}")
-        plt.plot(
+        ax.plot(
             sub["hour_of_day"],
             sub["total_volume"],
             marker="o",
@@ -67,23 +90,32 @@ def plot_all_intersections_one_chart(df: pd.DataFrame, out_dir: str) -> None:
             label=label
         )
 
-    plt.title("Average Hourly Volume by Intersection (One Day Profile)")
-    plt.xlabel("Hour of Day")
-    plt.ylabel("Average Total Volume")
-    plt.xticks(range(0, 24))
-    plt.grid(True, alpha=0.3)
-    plt.legend(title="Intersection")
-    plt.tight_layout()
+    ax.set_title("Average Hourly Volume by Intersection (One Day Profile)")
+    ax.set_xlabel("Hour of Day")
+    ax.set_ylabel("Average Total Volume")
+    ax.set_xticks(range(0, 24))
+    ax.grid(True, alpha=0.3)
+    ax.legend(title="Intersection")
+
+
+def plot_hourly_profile(hourly_avg: pd.DataFrame, out_dir: str) -> None:
+    """Draw the chart from precomputed (INTID, hour_of_day, total_volume) averages."""
+    os.makedirs(out_dir, exist_ok=True)
+
+    with stage("draw"):
+        fig = new_figure(figsize=(12, 6))
+        draw_hourly_profile(fig, hourly_avg)
+        fig.tight_layout()
 
     out_path = os.path.join(out_dir, "intersections_hourly_average.png")
-    plt.savefig(out_path)
-    plt.close()
+    with stage("savefig"):
+        fig.savefig(out_path)
     print(f"Saved {out_path}")
 
 
 def main():
     parser = argparse.ArgumentParser(
-        description="Plot average hourly volumes across days on one chart (INTIDs 1-5)."
+        description="Plot average hourly volumes across days on one chart, plus optional per-intersection charts."
     )
     parser.add_argument(
         "--csv",
@@ -95,10 +127,84 @@ def main():
         default="plots",
         help="Directory to write the per-intersection plots",
     )
+    parser.add_argument(
+        "--charts",
+        default="combined",
+        help="Comma-separated chart kinds: combined, timeline, profile, heatmap, or 'all' (default: combined)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for rendering (default: CPU count; 1 renders in this process)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Redraw charts even when their input data has not changed",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default="",
+        help="Load the CSV through a typed binary cache kept in this directory",
+    )
+    parser.add_argument(
+        "--db",
+        default="",
+        help="Read the hour-of-day averages from this SQLite store (los_calc.py --db) instead of --csv",
+    )
+    add_profile_arguments(parser)
     args = parser.parse_args()
 
-    df = load_hourly_results(args.csv)
-    plot_all_intersections_one_chart(df, args.outdir)
+    from los_plots import CHART_KINDS
+
+    kinds = list(CHART_KINDS) if args.charts == "all" else [k.strip() for k in args.charts.split(",") if k.strip()]
+    unknown = sorted(set(kinds) - set(CHART_KINDS))
+    if unknown or not kinds:
+        parser.error(f"--charts must name some of {', '.join(CHART_KINDS)} or 'all', got: {args.charts!r}")
+
+    with profiling(args, "plot_intersection_volumes"):
+        run(args, kinds)
+
+
+def run(args: argparse.Namespace, kinds) -> None:
+    if args.db:
+        from contextlib import closing
+
+        from los_db import connect, hourly_volume_profile, read_hourly
+
+        with closing(connect(args.db)) as conn:
+            if kinds == ["combined"]:
+                # The combined chart only needs the hour-of-day averages, computed in SQL
+                with stage("load hour-of-day averages"):
+                    hourly_avg = hourly_volume_profile(conn)
+                with stage("plot"):
+                    plot_hourly_profile(hourly_avg, args.outdir)
+                return
+            import pandas as pd
+
+            with stage("load hourly results") as st:
+                df = read_hourly(conn)
+                df["hour"] = pd.to_datetime(df["hour"])
+                st["rows"] = len(df)
+    else:
+        with stage("load hourly results") as st:
+            df = load_hourly_results(args.csv, cache_dir=args.cache_dir)
+            st["rows"] = len(df)
+        if kinds == ["combined"]:
+            with stage("plot", rows=len(df)):
+                plot_all_intersections_one_chart(df, args.outdir)
+            return
+
+    from los_plots import render_charts
+
+    # Charts drawn in worker processes are timed as a whole here
+    with stage("render charts", rows=len(df)):
+        rendered, skipped = render_charts(df, args.outdir, kinds, workers=args.workers, force=args.force)
+    for path in rendered:
+        print(f"Saved {path}")
+    if skipped:
+        print(f"Skipped {len(skipped)} unchanged charts in {args.outdir} (use --force to redraw)")
 
 
 if __name__ == "__main__":
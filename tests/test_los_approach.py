@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from los_approach import APPROACHES, compute_hourly_breakdown
+from los_calc import MOVEMENT_COLUMNS, compute_hourly_los
+
+
+def _prepared() -> pd.DataFrame:
+    rng = np.random.default_rng(2)
+    times = pd.date_range("2025-11-16 06:00", periods=16, freq="15min")
+    df = pd.DataFrame({"INTID": np.repeat([1, 2], len(times)), "datetime": np.tile(times, 2)})
+    for col in MOVEMENT_COLUMNS:
+        # Fractional counts (e.g. imputed gaps) and a few missing values
+        df[col] = rng.uniform(0, 40, len(df)).round(2)
+    df.loc[[3, 17], ["NBL", "EBT"]] = np.nan
+    return df
+
+
+def test_intersection_columns_match_compute_hourly_los():
+    df = _prepared()
+    breakdown = compute_hourly_breakdown(df)
+    expected = compute_hourly_los(df).sort_values(["INTID", "hour"]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(breakdown[expected.columns], expected, check_dtype=False)
+
+
+def test_approach_volumes_add_up_to_the_movements():
+    breakdown = compute_hourly_breakdown(_prepared())
+    for a in APPROACHES:
+        legs = breakdown[[f"{a}L", f"{a}T", f"{a}R"]].sum(axis=1)
+        np.testing.assert_allclose(breakdown[f"{a}_volume"], legs)
+    assert breakdown[MOVEMENT_COLUMNS].dtypes.eq("float64").all()
+
+
+def test_integer_counts_use_an_integer_matrix():
+    df = _prepared()
+    df[MOVEMENT_COLUMNS] = df[MOVEMENT_COLUMNS].fillna(0).round().astype("uint16")
+    breakdown = compute_hourly_breakdown(df)
+    assert breakdown[MOVEMENT_COLUMNS + ["total_volume"]].dtypes.eq("int64").all()
+    expected = compute_hourly_los(df).sort_values(["INTID", "hour"]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(breakdown[expected.columns], expected, check_dtype=False)
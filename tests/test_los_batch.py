@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+from generate_volume_data import generate_counts, write_export
+from los_batch import compute_batch_hourly_los, load_exports
+from los_calc import compute_hourly_los, load_and_prepare
+
+
+def _counts(start: str, seed: int) -> pd.DataFrame:
+    return generate_counts(intids=2, days=1, start=start, seed=seed)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_batch_matches_the_concatenated_export(tmp_path, workers):
+    first, second = _counts("2025-11-16", 1), _counts("2025-11-17", 2)
+    # A repeated interval inside one file counts twice, as it does when the file is processed alone
+    first = pd.concat([first, first.iloc[[10]].assign(NBT="999")], ignore_index=True)
+    write_export(first, str(tmp_path / "exports" / "VehicleVolume_a.csv"))
+    write_export(second, str(tmp_path / "exports" / "VehicleVolume_b.csv"))
+    write_export(pd.concat([first, second], ignore_index=True), str(tmp_path / "combined.csv"))
+
+    got = compute_batch_hourly_los(str(tmp_path / "exports"), workers=workers)
+    expected = compute_hourly_los(load_and_prepare(str(tmp_path / "combined.csv"), compact=True))
+    pd.testing.assert_frame_equal(got, expected.sort_values(["INTID", "hour"]).reset_index(drop=True))
+
+
+def test_overlapping_intervals_come_from_the_last_file(tmp_path):
+    old = _counts("2025-11-16", 1)
+    new = old.assign(NBT="7", INTID=old["INTID"].astype(str))
+    paths = [str(tmp_path / "a.csv"), str(tmp_path / "b.csv")]
+    write_export(old, paths[0])
+    write_export(new.iloc[:50], paths[1])
+    df = load_exports(paths, workers=1)
+    assert len(df) == len(old)
+    assert df["INTID"].dtype == "int8"
+    assert (df.loc[:49, "NBT"] == 7).all()
+
+
+def test_attrs_collect_every_files_warnings(tmp_path):
+    counts = _counts("2025-11-16", 3)
+    counts.loc[5, "TIME"] = '="2575"'
+    paths = [str(tmp_path / "a.csv"), str(tmp_path / "b.csv")]
+    write_export(counts, paths[0])
+    write_export(counts.assign(DATE="11/18/2025"), paths[1])
+    df = load_exports(paths, workers=1)
+    assert df.attrs["unparsed_rows"] == ["a.csv:5", "b.csv:5"]
+    assert df.attrs["bad_lines"] == 0
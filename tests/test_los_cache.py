@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+
+import los_cache
+from generate_volume_data import generate_counts, write_export
+from los_cache import cached_hourly_los, cached_prepare, cached_results
+from los_calc import compute_hourly_los, load_and_prepare
+
+
+def _export(path: str, intids=None) -> str:
+    counts = generate_counts(intids=2, days=1, seed=12)
+    if intids is not None:
+        counts["INTID"] = counts["INTID"].map(intids)
+    write_export(counts, path)
+    return path
+
+
+def _assert_same(got: pd.DataFrame, expected: pd.DataFrame) -> None:
+    pd.testing.assert_frame_equal(got.reset_index(drop=True), expected.reset_index(drop=True))
+
+
+@pytest.mark.parametrize("intids", [None, {1: "1A", 2: "22"}], ids=["integer", "text"])
+def test_prepare_hit_and_miss_match_load_and_prepare(tmp_path, intids):
+    csv_path = _export(str(tmp_path / "export.csv"), intids)
+    expected = load_and_prepare(csv_path, compact=True)
+    cache_dir = str(tmp_path / "cache")
+    miss = cached_prepare(csv_path, cache_dir)
+    hit = cached_prepare(csv_path, cache_dir)
+    _assert_same(miss, expected)
+    _assert_same(hit, expected)
+
+
+def test_hourly_hit_matches_compute_hourly_los(tmp_path):
+    csv_path = _export(str(tmp_path / "export.csv"))
+    expected = compute_hourly_los(load_and_prepare(csv_path, compact=True))
+    cache_dir = str(tmp_path / "cache")
+    for _ in range(2):
+        _assert_same(cached_hourly_los(csv_path, cache_dir), expected)
+
+
+def test_results_keep_missing_values_and_text_intids(tmp_path):
+    results = tmp_path / "los_results.csv"
+    results.write_text(
+        "INTID,hour,total_volume,los_score,LOS\n"
+        "1A,2025-11-16 00:00:00,125.0,1,A\n"
+        ",2025-11-16 01:00:00,,2,\n"
+        "7,2025-11-16 02:00:00,69.5,1,A\n"
+    )
+    expected = los_cache._results_frame(str(results))
+    cache_dir = str(tmp_path / "cache")
+    for _ in range(2):
+        got = cached_results(str(results), cache_dir)
+        _assert_same(got, expected)
+    assert got["INTID"].isna().tolist() == [False, True, False]
+
+
+def test_changed_source_is_rebuilt(tmp_path):
+    csv_path = _export(str(tmp_path / "export.csv"))
+    cache_dir = str(tmp_path / "cache")
+    cached_prepare(csv_path, cache_dir)
+    counts = generate_counts(intids=3, days=1, seed=1)
+    write_export(counts, csv_path)
+    assert cached_prepare(csv_path, cache_dir)["INTID"].nunique() == 3
+
+
+def test_source_changing_during_build_returns_the_built_frame(tmp_path, monkeypatch):
+    csv_path = _export(str(tmp_path / "export.csv"))
+    built = load_and_prepare(csv_path, compact=True)
+
+    def build_and_touch():
+        with open(csv_path, "a", encoding="utf-8") as f:
+            f.write("\r\n")
+        return built
+
+    monkeypatch.setattr(los_cache, "_prepared_frame", lambda path: build_and_touch())
+    got = cached_prepare(csv_path, str(tmp_path / "cache"))
+    assert got is built
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from average_los_by_intersection import parse_bands
+from generate_volume_data import generate_counts, write_export
+from los_calc import (
+    LOS_THRESHOLDS,
+    MOVEMENT_COLUMNS,
+    SCORE_TO_LOS,
+    classify_volumes,
+    compact_intervals,
+    compute_hourly_los,
+    compute_hourly_los_streaming,
+    decode_timestamps,
+    load_and_prepare,
+    parse_thresholds,
+)
+
+
+@pytest.fixture(scope="module")
+def export(tmp_path_factory) -> str:
+    path = str(tmp_path_factory.mktemp("export") / "export.csv")
+    write_export(generate_counts(intids=3, days=2, seed=4), path)
+    return path
+
+
+@pytest.mark.parametrize("chunksize", [7, 96, 100_000])
+def test_streaming_matches_whole_file(export, chunksize):
+    expected = compute_hourly_los(load_and_prepare(export)).sort_values(["INTID", "hour"]).reset_index(drop=True)
+    got = compute_hourly_los_streaming(export, chunksize=chunksize).sort_values(["INTID", "hour"]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+
+
+def _baseline_timestamps(date: pd.Series, time: pd.Series) -> pd.Series:
+    # The regex chain load_and_prepare used before decode_timestamps
+    t = time.astype(str).str.strip().str.replace(r"[^0-9]", "", regex=True).str.zfill(4)
+    t = t.str.replace(r"^(\d{2})(\d{2})$", r"\1:\2", regex=True)
+    return pd.to_datetime(date.astype(str).str.strip() + " " + t, format="%m/%d/%Y %H:%M", errors="coerce")
+
+
+def test_decode_timestamps_matches_the_regex_chain_on_valid_values():
+    date = pd.Series(["11/16/2025", "11/16/2025 ", "11/17/2025", "11/17/2025", "11/18/2025"])
+    time = pd.Series(['="0000"', '="0715"', "715", "23:45", 1330])
+    stamps, labels, bad = decode_timestamps(date, time)
+    assert stamps.tolist() == _baseline_timestamps(date, time).tolist()
+    assert labels.tolist() == ["00:00", "07:15", "07:15", "23:45", "13:30"]
+    assert not bad.any()
+
+
+def test_decode_timestamps_flags_unparseable_rows_instead_of_using_midnight():
+    date = pd.Series(["11/16/2025", "not a date", "11/16/2025", np.nan])
+    time = pd.Series(['="2460"', '="0800"', '="0815"', '="0830"'])
+    stamps, _, bad = decode_timestamps(date, time)
+    assert bad.tolist() == [True, True, False, True]
+    assert stamps.isna().tolist() == [True, True, False, True]
+    assert stamps[2] == pd.Timestamp("2025-11-16 08:15")
+
+
+def _baseline_los(total_vol: float, thresholds=LOS_THRESHOLDS) -> str:
+    # compute_los_from_volume's per-row loop before classify_volumes
+    for threshold, los in thresholds:
+        if total_vol <= threshold:
+            return los
+    return "F"
+
+
+@pytest.mark.parametrize("thresholds", [LOS_THRESHOLDS, parse_thresholds("50.5,120"), parse_thresholds("10,20,30,40,50")])
+def test_classify_volumes_matches_the_per_row_loop(thresholds):
+    bounds = [t for t, _ in thresholds]
+    volumes = np.array(bounds + [b + 1e-9 for b in bounds] + [b - 1 for b in bounds] + [-1.0, 0.0, 1e9, np.nan])
+    got = [SCORE_TO_LOS[int(s)] for s in classify_volumes(volumes, thresholds)]
+    assert got == [_baseline_los(v, thresholds) for v in volumes.tolist()]
+
+
+
+@pytest.mark.parametrize(
+    "scale, fractional",
+    [(40, False), (60_000, False), (40, True), (16_777_520 / 12, True)],
+    ids=["uint16", "uint32", "fractional", "large-fractional"],
+)
+def test_compacted_frame_gives_the_same_hourly_los(scale, fractional):
+    rng = np.random.default_rng(6)
+    times = pd.date_range("2025-11-16", periods=8, freq="15min")
+    df = pd.DataFrame({"INTID": np.repeat([1, 2], len(times)), "datetime": np.tile(times, 2)})
+    for col in MOVEMENT_COLUMNS:
+        values = rng.uniform(0, 2 * scale, len(df))
+        df[col] = values + 0.37 if fractional else values.round()
+    total = df[MOVEMENT_COLUMNS].sum(axis=1).to_numpy()
+    # Bounds exactly at and just below the first interval's total flip its band on any rounding
+    for table in (LOS_THRESHOLDS, [(total[0], "A")], [(np.nextafter(total[0], 0), "A")]):
+        expected = compute_hourly_los(df, table)
+        got = compute_hourly_los(compact_intervals(df), table)
+        pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize(
+    "parse, text, message",
+    [
+        (parse_thresholds, "100,abc", "Thresholds must be comma-separated numbers"),
+        (parse_thresholds, "1,2,3,4,5,6", "Expected 1-5 thresholds"),
+        (parse_bands, "2.0,1.2", "Band bounds must be strictly increasing"),
+        (parse_bands, "", "Expected 1-5 band bounds"),
+    ],
+)
+def test_threshold_and_band_parsers_share_validation(parse, text, message):
+    with pytest.raises(ValueError, match=message):
+        parse(text)
+    assert parse("1.2, 2.0,") == [(1.2, "A"), (2.0, "B")]
@@ -0,0 +1,96 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from generate_volume_data import generate_counts, write_export
+from los_calc import SCORE_TO_LOS, compute_hourly_los, load_and_prepare
+from los_corridor import LOS_LETTERS, aggregate_groups, summarize_groups
+from los_registry import DEFAULT_REGISTRY, INTID_NAMES, intid_key, load_registry, memberships
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def hourly(tmp_path_factory) -> pd.DataFrame:
+    path = str(tmp_path_factory.mktemp("corridor") / "export.csv")
+    write_export(generate_counts(intids=5, days=2, seed=12), path)
+    return compute_hourly_los(load_and_prepare(path))
+
+
+@pytest.fixture(scope="module")
+def registry():
+    return load_registry(os.path.join(ROOT, "registry_example.json"))
+
+
+def _pandas_groups(hourly: pd.DataFrame, pairs) -> pd.DataFrame:
+    # The merge + groupby aggregation aggregate_groups replaces
+    members = pd.DataFrame(pairs, columns=["INTID", "corridor"])
+    rows = hourly.merge(members, on="INTID")
+    grouped = rows.groupby(["corridor", "hour"], sort=True)
+    out = grouped.agg(
+        intersections=("INTID", "size"),
+        total_volume=("total_volume", "sum"),
+        mean_score=("los_score", "mean"),
+        worst=("los_score", "max"),
+    )
+    out["LOS"] = np.round(out["mean_score"]).astype("int64").map(SCORE_TO_LOS)
+    out["worst_LOS"] = out.pop("worst").map(SCORE_TO_LOS)
+    counts = grouped["LOS"].value_counts().unstack(fill_value=0).reindex(columns=LOS_LETTERS, fill_value=0)
+    for los in LOS_LETTERS:
+        out[f"n_{los}"] = counts[los]
+    return out.reset_index()
+
+
+def test_corridor_table_matches_pandas_groupby(hourly, registry):
+    pairs = memberships(registry, "corridor")
+    got = aggregate_groups(hourly, pairs)
+    expected = _pandas_groups(hourly, pairs)
+    # INTIDs on two corridors count towards both
+    assert got["intersections"].max() == 2
+    pd.testing.assert_frame_equal(got, expected[got.columns], check_dtype=False)
+
+
+def test_corridor_summary_matches_pandas_groupby(hourly, registry):
+    group_hourly = aggregate_groups(hourly, memberships(registry, "corridor"))
+    summary = summarize_groups(group_hourly).set_index("corridor")
+    members = hourly.merge(pd.DataFrame(memberships(registry, "corridor"), columns=["INTID", "corridor"]), on="INTID")
+    per_group = members.groupby("corridor")
+    np.testing.assert_allclose(summary["mean_score"], per_group["los_score"].mean())
+    shares = per_group["LOS"].value_counts(normalize=True).unstack(fill_value=0.0).reindex(columns=LOS_LETTERS, fill_value=0.0)
+    for los in LOS_LETTERS:
+        np.testing.assert_allclose(summary[f"share_{los}"], shares[los])
+    volume = members.groupby(["corridor", "hour"])["total_volume"].sum()
+    assert summary["peak_volume"].tolist() == volume.groupby(level="corridor").max().tolist()
+    assert summary["hours"].tolist() == volume.groupby(level="corridor").size().tolist()
+
+
+def test_example_registry_covers_the_sample_intersections(registry):
+    assert {intid: entry.name for intid, entry in registry.items()} == INTID_NAMES
+    # Every road named in an intersection is one of its corridors
+    corridors = {}
+    for intid, corridor in memberships(registry, "corridor"):
+        corridors.setdefault(corridor, set()).add(intid)
+    assert corridors["I ST"] == {1, 4} and corridors["Walton Blvd"] == {3, 5}
+    assert all(len(entry.corridors) == 2 for entry in registry.values())
+
+
+def test_default_registry_carries_names_only():
+    assert set(DEFAULT_REGISTRY) == set(INTID_NAMES)
+    assert memberships(DEFAULT_REGISTRY, "corridor") == [] and memberships(DEFAULT_REGISTRY, "zone") == []
+    assert [group for _, group in memberships(DEFAULT_REGISTRY, "network")] == ["Network"] * len(INTID_NAMES)
+
+
+def test_load_registry_accepts_a_single_corridor_and_string_intids(tmp_path):
+    path = tmp_path / "registry.json"
+    path.write_text(json.dumps({"intersections": {"7": {"corridor": "Main St", "zone": "North"}, "A1": {"name": "Depot"}}}))
+    registry = load_registry(str(path))
+    assert registry[7].corridors == ("Main St",) and registry[7].zone == "North" and registry[7].name == "INTID 7"
+    assert registry["A1"].corridors == ()
+    assert intid_key("7.0") == 7 and intid_key(" A1 ") == "A1"
+
+
+def test_unmapped_registry_yields_an_empty_table(hourly):
+    assert aggregate_groups(hourly, []).empty
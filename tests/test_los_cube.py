@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from generate_volume_data import generate_counts, write_export
+from los_calc import SCORE_TO_LOS, compute_hourly_los, load_and_prepare
+from los_cube import LOS_LETTERS, PERCENTILES, build_cube, cube_grid, load_cube, parse_weekday, save_cube
+
+
+@pytest.fixture(scope="module")
+def hourly(tmp_path_factory) -> pd.DataFrame:
+    path = str(tmp_path_factory.mktemp("cube") / "export.csv")
+    # Three weeks so most weekday x hour cells hold several hours
+    write_export(generate_counts(intids=2, days=21, seed=9), path)
+    return compute_hourly_los(load_and_prepare(path))
+
+
+def _pandas_cube(hourly: pd.DataFrame) -> pd.DataFrame:
+    # The groupby/quantile/value_counts chain build_cube replaces
+    keyed = hourly.assign(weekday=hourly["hour"].dt.dayofweek, hour_of_day=hourly["hour"].dt.hour)
+    groups = keyed.groupby(["INTID", "weekday", "hour_of_day"], sort=True)
+    out = groups.agg(count=("total_volume", "size"), mean_volume=("total_volume", "mean"), mean_score=("los_score", "mean"))
+    for q in PERCENTILES:
+        out[f"p{q}_volume"] = groups["total_volume"].quantile(q / 100)
+    shares = groups["LOS"].value_counts(normalize=True).unstack(fill_value=0.0).reindex(columns=LOS_LETTERS, fill_value=0.0)
+    for los in LOS_LETTERS:
+        out[f"share_{los}"] = shares[los]
+    out["typical_LOS"] = np.round(out["mean_score"]).astype("int64").map(SCORE_TO_LOS)
+    return out.reset_index()
+
+
+def test_cube_matches_pandas_groupby(hourly):
+    cube = build_cube(hourly)
+    expected = _pandas_cube(hourly)
+    assert cube["count"].max() > 1
+    pd.testing.assert_frame_equal(cube, expected[cube.columns], check_dtype=False)
+
+
+def test_cube_round_trips_through_csv(hourly, tmp_path):
+    cube = build_cube(hourly)
+    path = str(tmp_path / "cube.csv")
+    save_cube(cube, path)
+    pd.testing.assert_frame_equal(load_cube(path), cube, check_dtype=False)
+
+
+def test_cube_grid_places_cells_by_weekday_and_hour(hourly):
+    cube = build_cube(hourly)
+    intid = cube["INTID"].iloc[0]
+    grid = cube_grid(cube, intid, "count")
+    cells = cube[cube["INTID"] == intid]
+    assert np.nansum(grid) == cells["count"].sum()
+    row = cells.iloc[-1]
+    assert grid[row["weekday"], row["hour_of_day"]] == row["count"]
+
+
+@pytest.mark.parametrize("text, expected", [("Mon", 0), ("sunday", 6), ("3", 3)])
+def test_parse_weekday(text, expected):
+    assert parse_weekday(text) == expected
+
+
+def test_parse_weekday_rejects_unknown_days():
+    with pytest.raises(ValueError):
+        parse_weekday("7")
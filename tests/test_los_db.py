@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import average_los_by_intersection
+import best_los_summary
+import worst_los_summary
+from los_db import write_results
+
+
+def _hourly(days: int = 3, intids=(1, 2, 3), seed: int = 11) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    hours = pd.date_range("2025-11-16", periods=24 * days, freq="h")
+    df = pd.DataFrame(
+        {
+            "INTID": np.repeat(intids, len(hours)),
+            "hour": np.tile(hours, len(intids)),
+            # Coarse volumes so many hours tie on (los_score, total_volume)
+            "total_volume": rng.choice([29.0, 150.0, 400.0, 2900.0], len(hours) * len(intids)),
+        }
+    )
+    df["los_score"] = np.select([df["total_volume"] < 100, df["total_volume"] < 300, df["total_volume"] < 1000], [1, 2, 4], 6)
+    df["LOS"] = df["los_score"].map({1: "A", 2: "B", 4: "D", 6: "F"})
+    return df
+
+
+@pytest.fixture(scope="module")
+def sources(tmp_path_factory):
+    root = tmp_path_factory.mktemp("results")
+    hourly = _hourly()
+    csv_path, db_path = root / "los_results.csv", root / "los_results.db"
+    hourly.to_csv(csv_path, index=False)
+    write_results(str(db_path), hourly)
+    return str(csv_path), str(db_path)
+
+
+def _run(module, args, tmp_path, name, capsys):
+    out = tmp_path / f"{name}.csv"
+    assert module.main(args + ["--out", str(out)]) == 0
+    # The last line names the output file
+    printed = capsys.readouterr().out.rstrip("\n").splitlines()[:-1]
+    return printed, out.read_text()
+
+
+@pytest.mark.parametrize("module", [worst_los_summary, best_los_summary])
+@pytest.mark.parametrize("per", ["none", "intid", "day"])
+@pytest.mark.parametrize("top", [1, 5, 20, 500])
+def test_db_summary_matches_csv_summary(sources, module, per, top, tmp_path, capsys):
+    csv_path, db_path = sources
+    common = ["--per", per, "--top", str(top)]
+    from_csv = _run(module, ["--source", csv_path] + common, tmp_path, "csv", capsys)
+    from_db = _run(module, ["--db", db_path] + common, tmp_path, "db", capsys)
+    assert from_db == from_csv
+
+
+def test_db_average_matches_csv_average(sources, tmp_path, capsys):
+    csv_path, db_path = sources
+    from_csv = _run(average_los_by_intersection, ["--source", csv_path], tmp_path, "csv", capsys)
+    from_db = _run(average_los_by_intersection, ["--db", db_path], tmp_path, "db", capsys)
+    assert from_db == from_csv
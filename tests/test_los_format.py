@@ -0,0 +1,111 @@
+import pandas as pd
+import pytest
+
+import best_los_summary
+import worst_los_summary
+from los_format import format_hours, group_arrays, hourly_lines, hours_by_intersection, write_csv
+
+
+def _baseline_format_hour(value) -> str:
+    # format_hour as it was before the vectorized formatting
+    try:
+        ts = pd.to_datetime(value, errors="coerce")
+        if pd.isna(ts):
+            return str(value)
+        return ts.strftime("%Y-%m-%d %H:%M")
+    except Exception:
+        return str(value)
+
+
+def _hourly() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "INTID": [2, 1, 1, 2, 1, 2],
+            "hour": [
+                "2025-11-16 08:00:00",
+                "2025-11-17 07:00:00",
+                "2025-11-16 07:00:00",
+                "2025-11-16 17:00:00",
+                "2025-11-16 08:00:00",
+                "2025-11-16 09:00:00",
+            ],
+            "total_volume": [900.0, 400.0, 400.0, 700.0, 120.0, 60.0],
+            "los_score": [5, 3, 3, 5, 1, 1],
+            "LOS": ["E", "C", "C", "E", "A", "A"],
+        }
+    )
+
+
+def test_format_hours_matches_per_value_formatting():
+    values = ["2025-11-16 07:00:00", pd.Timestamp("2025-11-17 23:45"), "not a time", "2025-11-16 07:00:00"]
+    assert format_hours(values).tolist() == [_baseline_format_hour(v) for v in values]
+
+
+def test_hours_by_intersection_matches_sorted_unique_labels():
+    df = _hourly()
+    expected = df.groupby("INTID")["hour"].agg(lambda s: ", ".join(sorted({_baseline_format_hour(x) for x in s})))
+    pd.testing.assert_series_equal(hours_by_intersection(df), expected, check_names=False, check_index_type=False)
+
+
+def test_group_arrays_keeps_row_order_within_each_key():
+    grouped = group_arrays(pd.Series([2, 1, 2, 1]), pd.Series(["a", "b", "c", "d"]))
+    assert grouped.index.tolist() == [1, 2]
+    assert [list(v) for v in grouped] == [["b", "d"], ["a", "c"]]
+
+
+def test_group_arrays_empty_input():
+    grouped = group_arrays(pd.Series([], dtype="int64"), pd.Series([], dtype=object))
+    assert grouped.empty
+    assert grouped.dtype == object
+
+
+@pytest.mark.parametrize(
+    "build, score_col",
+    [
+        (worst_los_summary.build_per_intersection_summary, "worst_score"),
+        (best_los_summary.build_per_intersection_best, "best_score"),
+    ],
+)
+def test_per_intersection_summaries_on_empty_results(build, score_col):
+    summary = build(_hourly().iloc[0:0])
+    assert summary.empty
+    assert score_col in summary.columns
+
+
+@pytest.mark.parametrize("module", [worst_los_summary, best_los_summary])
+def test_summary_scripts_accept_header_only_results(tmp_path, module, capsys):
+    source = tmp_path / "los_results.csv"
+    source.write_text("INTID,hour,total_volume,los_score,LOS\n")
+    out = tmp_path / "summary.csv"
+    assert module.main(["--source", str(source), "--out", str(out)]) == 0
+    assert len(out.read_text().splitlines()) == 1
+
+
+def test_write_csv_matches_to_csv_byte_for_byte(tmp_path):
+    df = _hourly().assign(
+        hour=lambda d: pd.to_datetime(d["hour"]),
+        INTID=lambda d: d["INTID"].astype("category"),
+        total_volume=lambda d: d["total_volume"].where(d["los_score"] != 1) / 3,
+    )
+    variants = (
+        df,
+        df.assign(hour=df["hour"].dt.normalize()),
+        df.assign(LOS=["a,b", "C", "C", "E", "A", "A"]),
+        df.assign(los_score=pd.array([1, None, 3, 5, 1, None], dtype="Int64")),
+        df.assign(LOS=pd.array(["A", None, "C", "E", "A", "A"], dtype="string")),
+        df.rename(columns={"LOS": "LOS, letter", "hour": 'hour "start"'}),
+    )
+    for frame in variants:
+        fast, slow = tmp_path / "fast.csv", tmp_path / "slow.csv"
+        write_csv(frame, str(fast))
+        frame.to_csv(slow, index=False)
+        assert fast.read_bytes() == slow.read_bytes()
+
+
+def test_hourly_lines_match_iterrows_output():
+    df = _hourly().assign(hour=lambda d: pd.to_datetime(d["hour"]))
+    expected = [
+        f"INTID {row['INTID']} | {row['hour']} | volume={int(row['total_volume'])} | LOS={row['LOS']} | score={int(row['los_score'])}"
+        for _, row in df.iterrows()
+    ]
+    assert hourly_lines(df) == expected
@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+from generate_volume_data import generate_counts, write_export
+from los_calc import compute_hourly_los, load_and_prepare
+from los_incremental import default_state_path, run_incremental
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_default_state_path_replaces_the_extension():
+    assert default_state_path("out/los_results.csv") == "out/los_results.state.json"
+
+
+def test_incremental_updates_match_a_full_recompute(tmp_path):
+    counts = generate_counts(intids=2, days=2, seed=5)
+    stamps = pd.to_datetime(counts["DATE"] + " " + counts["TIME"].str.strip('="'), format="%m/%d/%Y %H%M")
+    results = str(tmp_path / "los_results.csv")
+    # Cut mid-hour so the open hour's partial sums have to carry over
+    for cut in (pd.Timestamp("2025-11-16 13:30"), None):
+        export = str(tmp_path / "export.csv")
+        write_export(counts if cut is None else counts[stamps < cut], export)
+        run_incremental(export, results)
+
+    expected = compute_hourly_los(load_and_prepare(export)).sort_values(["INTID", "hour"]).reset_index(drop=True)
+    got = pd.read_csv(results, parse_dates=["hour"])
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+
+
+def test_cli_reports_a_merge_only_when_rows_were_merged(tmp_path):
+    export = str(tmp_path / "export.csv")
+    write_export(generate_counts(intids=1, days=1, seed=2), export)
+    command = [sys.executable, os.path.join(ROOT, "los_calc.py"), "--incremental", "--quiet", "--csv", export, "--out", "r.csv"]
+    outputs = [subprocess.run(command, cwd=tmp_path, capture_output=True, text=True, check=True).stdout for _ in range(2)]
+    assert "Merged results into r.csv" in outputs[0]
+    assert "Merged results" not in outputs[1]
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from generate_volume_data import generate_counts, write_export
+from los_calc import MOVEMENT_COLUMNS, SCORE_TO_LOS, classify_volumes, load_and_prepare
+from los_peak import peak_hours, rolling_hour_los
+
+
+@pytest.fixture(scope="module")
+def intervals(tmp_path_factory) -> pd.DataFrame:
+    path = str(tmp_path_factory.mktemp("peak") / "export.csv")
+    write_export(generate_counts(intids=3, days=2, seed=6), path)
+    return load_and_prepare(path)
+
+
+def _pandas_windows(df: pd.DataFrame, window: int) -> pd.DataFrame:
+    # The per-INTID rolling().sum() the array version replaces, keeping gap-free windows only
+    df = df.dropna(subset=["INTID", "datetime"]).assign(volume=df[MOVEMENT_COLUMNS].sum(axis=1).astype("float64"))
+    df = df.drop_duplicates(subset=["INTID", "datetime"], keep="last").sort_values(["INTID", "datetime"])
+    df["score"] = classify_volumes(df["volume"].to_numpy())
+    frames = []
+    for intid, g in df.groupby("INTID", sort=True):
+        start = g["datetime"].shift(window - 1)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "INTID": intid,
+                    "window_start": start,
+                    "rolling_volume": g["volume"].rolling(window).sum(),
+                    "peak_15min_volume": g["volume"].rolling(window).max(),
+                    "los_score": np.round(g["score"].rolling(window).mean()),
+                }
+            )[g["datetime"] - start == pd.Timedelta(minutes=15 * (window - 1))]
+        )
+    out = pd.concat(frames, ignore_index=True)
+    out["los_score"] = out["los_score"].astype("int64")
+    out["LOS"] = out["los_score"].map(SCORE_TO_LOS)
+    return out
+
+
+@pytest.mark.parametrize("window", [2, 4])
+def test_rolling_windows_match_pandas_rolling(intervals, window):
+    got = rolling_hour_los(intervals, window=window)
+    expected = _pandas_windows(intervals, window)
+    assert len(got) > 0
+    columns = ["INTID", "window_start", "rolling_volume", "peak_15min_volume", "los_score", "LOS"]
+    pd.testing.assert_frame_equal(got[columns], expected[columns], check_dtype=False)
+    assert (got["window_end"] - got["window_start"] == pd.Timedelta(minutes=15 * window)).all()
+    np.testing.assert_allclose(got["phf"], got["rolling_volume"] / (window * got["peak_15min_volume"]))
+
+
+def test_windows_skip_missing_intervals():
+    stamps = pd.to_datetime(["2025-11-16 07:00", "2025-11-16 07:15", "2025-11-16 07:30", "2025-11-16 08:00", "2025-11-16 08:15"])
+    df = pd.DataFrame({"INTID": 1, "datetime": stamps, "total_volume": [10.0, 20.0, 30.0, 40.0, 50.0]})
+    assert rolling_hour_los(df, window=4).empty
+    assert rolling_hour_los(df, window=2)["rolling_volume"].tolist() == [30.0, 50.0, 90.0]
+
+
+@pytest.mark.parametrize("per_day", [True, False])
+def test_peak_hours_match_groupby_max(intervals, per_day):
+    windows = rolling_hour_los(intervals)
+    keys = ["INTID", windows["window_start"].dt.floor("D")] if per_day else ["INTID"]
+    expected = windows.groupby(keys)["rolling_volume"].max()
+    got = peak_hours(windows, per_day=per_day)
+    assert got["rolling_volume"].tolist() == expected.tolist()
+
+
+def test_peak_hours_keep_the_earliest_of_tied_windows():
+    df = pd.DataFrame(
+        {
+            "INTID": 1,
+            "datetime": pd.date_range("2025-11-16 07:00", periods=6, freq="15min"),
+            "total_volume": [10.0, 50.0, 10.0, 50.0, 10.0, 50.0],
+        }
+    )
+    peaks = peak_hours(rolling_hour_los(df, window=2))
+    assert peaks["window_start"].tolist() == [pd.Timestamp("2025-11-16 07:00")]
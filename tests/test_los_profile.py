@@ -0,0 +1,73 @@
+import argparse
+import io
+import json
+
+import pandas as pd
+import pytest
+
+import los_profile
+from generate_volume_data import generate_counts, write_export
+from los_calc import compute_hourly_los, load_and_prepare
+from los_profile import StageTimer, add_profile_arguments, profiling, stage
+
+
+@pytest.fixture(scope="module")
+def export(tmp_path_factory) -> str:
+    path = str(tmp_path_factory.mktemp("profile") / "export.csv")
+    write_export(generate_counts(intids=2, days=1, seed=13), path)
+    return path
+
+
+def _args(*argv):
+    parser = argparse.ArgumentParser()
+    add_profile_arguments(parser)
+    return parser.parse_args(list(argv))
+
+
+def test_stage_timer_nests_and_counts_calls_and_rows():
+    timer = StageTimer()
+    for rows in (10, 5):
+        with timer.stage("load", rows=rows):
+            with timer.stage("parse") as frame:
+                frame["rows"] = 3
+    assert list(timer.timings) == ["load", "load/parse"]
+    report = {entry["stage"]: entry for entry in timer.report()}
+    assert report["load"]["calls"] == 2 and report["load"]["rows"] == 15 and report["load"]["depth"] == 0
+    assert report["load/parse"]["calls"] == 2 and report["load/parse"]["rows"] == 6 and report["load/parse"]["depth"] == 1
+    assert report["load"]["peak_mb"] is None
+    # Nested stages are inside their parent, so only top-level stages count towards the total
+    assert timer.total() == timer.timings["load"] >= timer.timings["load/parse"]
+    out = io.StringIO()
+    timer.print_report(stream=out)
+    assert "\n    parse " in out.getvalue()
+
+
+def test_module_stage_is_a_no_op_without_profiling():
+    assert los_profile._ACTIVE is None
+    with stage("anything", rows=4) as frame:
+        assert frame == {"rows": 4}
+
+
+def test_profiling_off_yields_none(export):
+    with profiling(_args(), "test") as timer:
+        assert timer is None
+
+
+def test_profiled_pipeline_matches_and_records_library_stages(export, tmp_path, capsys):
+    expected = compute_hourly_los(load_and_prepare(export))
+    path = str(tmp_path / "profile.json")
+    with profiling(_args("--profile-json", path), "test") as timer:
+        with stage("pipeline"):
+            got = compute_hourly_los(load_and_prepare(export))
+    assert los_profile._ACTIVE is None
+    pd.testing.assert_frame_equal(got, expected)
+    assert "Stage timings:" in capsys.readouterr().err
+
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    stages = {entry["stage"]: entry for entry in report["stages"]}
+    assert report["script"] == "test" and report["stage_seconds"] == pytest.approx(timer.total(), abs=1e-6)
+    for name in ("read_csv", "decode timestamps", "score intervals", "groupby"):
+        assert any(path.endswith("/" + name) for path in stages), name
+    assert stages["pipeline"]["peak_mb"] > 0
+    assert stages["pipeline/score intervals"]["rows"] == len(load_and_prepare(export))
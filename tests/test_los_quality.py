@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from generate_volume_data import generate_counts, write_export
+from los_calc import MOVEMENT_COLUMNS, load_and_prepare
+from los_quality import fill_missing, hourly_completeness, interval_grid, quality_summary
+
+
+@pytest.fixture(scope="module")
+def intervals(tmp_path_factory) -> pd.DataFrame:
+    path = str(tmp_path_factory.mktemp("quality") / "export.csv")
+    # Eight days: Monday appears twice, every other weekday once
+    write_export(generate_counts(intids=2, days=8, start="2025-11-17", seed=11), path)
+    df = load_and_prepare(path)
+    rng = np.random.default_rng(11)
+    df = df[rng.random(len(df)) > 0.2]
+    # A duplicated interval and an off-boundary reading
+    extra = df.iloc[[5, 5, 40]].copy()
+    extra.iloc[2, extra.columns.get_loc("datetime")] += pd.Timedelta(minutes=7)
+    return pd.concat([df, extra], ignore_index=True)
+
+
+def test_quality_summary_matches_pandas_counts(intervals):
+    summary = quality_summary(interval_grid(intervals)).set_index("INTID")
+    slot = intervals["datetime"].dt.floor("15min")
+    per_int = intervals.assign(slot=slot).groupby("INTID")
+    observed = per_int["slot"].nunique()
+    hours = intervals.assign(slot=slot, hour=slot.dt.floor("h")).groupby(["INTID", "hour"])["slot"].nunique()
+    expected_slots = 8 * 96
+    assert (summary["expected_intervals"] == expected_slots).all()
+    pd.testing.assert_series_equal(summary["observed_intervals"], observed, check_names=False, check_dtype=False)
+    pd.testing.assert_series_equal(summary["missing_intervals"], expected_slots - observed, check_names=False, check_dtype=False)
+    pd.testing.assert_series_equal(summary["duplicate_intervals"], per_int.size() - observed, check_names=False, check_dtype=False)
+    off_grid = (intervals["datetime"] != slot).groupby(intervals["INTID"]).sum()
+    pd.testing.assert_series_equal(summary["off_grid_rows"], off_grid, check_names=False, check_dtype=False)
+    partial = (hours < 4).groupby(level="INTID").sum()
+    pd.testing.assert_series_equal(summary["partial_hours"], partial, check_names=False, check_dtype=False)
+    empty = 8 * 24 - hours.groupby(level="INTID").size()
+    pd.testing.assert_series_equal(summary["empty_hours"], empty, check_names=False, check_dtype=False)
+    # The off-boundary reading falls in an observed slot, so it is also a duplicate there
+    assert summary["duplicate_intervals"].sum() == 3 and summary["off_grid_rows"].sum() == 1
+
+
+def test_hourly_completeness_matches_pandas_counts(intervals):
+    completeness = hourly_completeness(interval_grid(intervals)).set_index(["INTID", "hour"])
+    slot = intervals["datetime"].dt.floor("15min")
+    groups = intervals.assign(slot=slot).groupby(["INTID", slot.dt.floor("h").rename("hour")])["slot"]
+    seen = completeness[completeness["observed_intervals"] > 0]
+    pd.testing.assert_series_equal(seen["observed_intervals"], groups.nunique(), check_names=False, check_dtype=False)
+    pd.testing.assert_series_equal(seen["duplicate_intervals"], groups.size() - groups.nunique(), check_names=False, check_dtype=False)
+
+
+def test_fill_missing_uses_the_weekday_profile_then_time_of_day(intervals):
+    on_grid = intervals[intervals["datetime"] == intervals["datetime"].dt.floor("15min")]
+    filled = fill_missing(on_grid)
+    imputed = filled[filled["imputed"]]
+    observed = on_grid.drop_duplicates(subset=["INTID", "datetime"], keep="last")
+    assert len(filled) - len(imputed) == len(observed)
+
+    # Expected fills from groupby means over the deduplicated observations
+    def keys(df):
+        return df.assign(weekday=df["datetime"].dt.dayofweek, tod=df["datetime"].dt.strftime("%H:%M"))
+
+    observed, imputed = keys(observed), keys(imputed)
+    by_weekday = observed.groupby(["INTID", "weekday", "tod"])[MOVEMENT_COLUMNS].mean()
+    by_tod = observed.groupby(["INTID", "tod"])[MOVEMENT_COLUMNS].mean()
+    weekday_means = by_weekday.reindex(pd.MultiIndex.from_frame(imputed[["INTID", "weekday", "tod"]]))
+    tod_means = by_tod.reindex(pd.MultiIndex.from_frame(imputed[["INTID", "tod"]]))
+    use_weekday = weekday_means[MOVEMENT_COLUMNS[0]].notna().to_numpy()
+    expected = np.round(np.where(use_weekday[:, None], weekday_means.to_numpy(), tod_means.to_numpy()))
+    np.testing.assert_array_equal(imputed[MOVEMENT_COLUMNS].to_numpy(dtype="float64"), expected)
+    # Both the weekday profile and the time-of-day fallback were exercised
+    assert use_weekday.any() and not use_weekday.all()
+
+    # Every slot with the time of day seen for that INTID is filled
+    grid = interval_grid(filled)
+    assert (grid.counts == 1).all()
+
+
+def test_fill_missing_leaves_times_never_observed():
+    df = pd.DataFrame({"INTID": 1, "datetime": pd.to_datetime(["2025-11-17 07:00", "2025-11-18 07:15"])})
+    for col in MOVEMENT_COLUMNS:
+        df[col] = 8
+    filled = fill_missing(df)
+    imputed = filled[filled["imputed"]]
+    assert imputed["datetime"].tolist() == pd.to_datetime(["2025-11-17 07:15", "2025-11-18 07:00"]).tolist()
+    assert (imputed[MOVEMENT_COLUMNS] == 8).all().all()
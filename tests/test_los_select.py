@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from los_select import top_hours
+
+
+def _reference(df: pd.DataFrame, n: int, worst: bool) -> pd.DataFrame:
+    # The full-sort selection top_hours replaces
+    return df.sort_values(["los_score", "total_volume"], ascending=[not worst, not worst], kind="stable").head(n)
+
+
+def _tied_hours(rows: int = 400, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "INTID": rng.integers(1, 4, rows),
+            "hour": pd.date_range("2025-11-16", periods=rows, freq="h"),
+            # Few distinct scores and volumes so most rows tie with another
+            "los_score": rng.integers(1, 3, rows),
+            "total_volume": rng.choice([29.0, 30.0, np.nan], rows),
+        }
+    )
+
+
+@pytest.mark.parametrize("worst", [True, False])
+@pytest.mark.parametrize("extra", [-300, -1, 0, 5])
+def test_ties_keep_row_order(worst, extra):
+    df = _tied_hours()
+    n = len(df) + extra
+    pd.testing.assert_frame_equal(top_hours(df, n, worst=worst), _reference(df, n, worst))
+
+
+@pytest.mark.parametrize("worst", [True, False])
+def test_fractional_volumes_use_the_rank_fallback(worst):
+    df = _tied_hours().assign(total_volume=lambda d: d["total_volume"] + 0.5)
+    for n in (3, len(df), len(df) + 1):
+        pd.testing.assert_frame_equal(top_hours(df, n, worst=worst), _reference(df, n, worst))
+
+
+def test_per_intid_matches_grouped_head():
+    df = _tied_hours()
+    expected = pd.concat(
+        _reference(group, 4, True) for _, group in df.groupby("INTID", sort=True)
+    )
+    pd.testing.assert_frame_equal(top_hours(df, 4, worst=True, per="intid"), expected)
+
+
+def test_non_positive_n_or_empty_input():
+    df = _tied_hours()
+    assert top_hours(df, 0).empty
+    assert top_hours(df.iloc[0:0], 5).empty
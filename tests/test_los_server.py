@@ -0,0 +1,72 @@
+import json
+
+import pandas as pd
+import pytest
+
+from los_calc import MOVEMENT_COLUMNS
+from los_server import LOSIndex, handle_request
+
+
+@pytest.fixture(scope="module")
+def index() -> LOSIndex:
+    hourly = pd.DataFrame(
+        {
+            "INTID": [1, 1, 1, 3, 3, 3],
+            "hour": pd.to_datetime(
+                [
+                    "2025-11-18 07:00",
+                    "2025-11-18 08:00",
+                    "2025-11-18 17:00",
+                    "2025-11-18 07:00",
+                    "2025-11-18 16:00",
+                    "2025-11-18 17:00",
+                ]
+            ),
+            "total_volume": [300.0, 150.0, 2900.0, 100.0, 1500.0, 1900.0],
+            "los_score": [1, 1, 6, 1, 4, 5],
+            "LOS": ["A", "A", "F", "A", "D", "E"],
+        }
+    )
+    intervals = pd.DataFrame({"INTID": [1, 3], "datetime": pd.to_datetime(["2025-11-18 07:00", "2025-11-18 16:15"])})
+    for col in MOVEMENT_COLUMNS:
+        intervals[col] = 10
+    return LOSIndex(intervals, hourly)
+
+
+def _get(index: LOSIndex, path: str):
+    status, body = handle_request(index, path)
+    return status, json.loads(body)
+
+
+@pytest.mark.parametrize("kind, expected", [("worst", ["2025-11-18 17:00", "2025-11-18 16:00"]), ("best", ["2025-11-18 07:00", "2025-11-18 16:00"])])
+def test_report_top_n_is_taken_within_the_requested_intid(index, kind, expected):
+    status, body = _get(index, f"/{kind}?intid=3&top=2")
+    assert status == 200
+    assert [row["INTID"] for row in body["overall"]] == [3, 3]
+    assert [row["hour"] for row in body["overall"]] == expected
+    assert [row["INTID"] for row in body["per_intersection"]] == [3]
+
+
+def test_report_without_intid_ranks_every_intersection(index):
+    status, body = _get(index, "/worst?top=2")
+    assert status == 200
+    assert [(row["INTID"], row["LOS"]) for row in body["overall"]] == [(1, "F"), (3, "E")]
+
+
+def test_range_rows(index):
+    status, body = _get(index, "/los?intid=3&start=2025-11-18T16:00&end=2025-11-18T18:00")
+    assert status == 200
+    assert [row["time"] for row in body["rows"]] == ["2025-11-18 16:00", "2025-11-18 17:00"]
+
+
+def test_range_rejects_time_zone_offsets(index):
+    status, body = _get(index, "/los?intid=3&start=2025-11-18T16:00%2B02:00&end=2025-11-18T18:00")
+    assert status == 400
+    assert "start" in body["error"]
+
+
+@pytest.mark.parametrize("path", ["/worst?intid=99", "/best?intid=99", "/average?intid=99", "/los?intid=99&start=2025-11-18&end=2025-11-19"])
+def test_unknown_intid_is_not_found(index, path):
+    status, body = _get(index, path)
+    assert status == 404
+    assert body["error"] == "Unknown INTID: 99"
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import average_los_by_intersection
+import best_los_summary
+import worst_los_summary
+from los_calc import MOVEMENT_COLUMNS, compute_hourly_los
+from los_store import hourly_from_store, write_store
+
+
+@pytest.fixture(scope="module")
+def prepared() -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    times = pd.date_range("2025-11-16", periods=4 * 24 * 2, freq="15min")
+    df = pd.DataFrame({"INTID": np.repeat([1, 2], len(times)), "datetime": np.tile(times, 2)})
+    for col in MOVEMENT_COLUMNS:
+        df[col] = rng.integers(0, 60, len(df))
+    return df
+
+
+@pytest.fixture(scope="module")
+def store(prepared, tmp_path_factory) -> str:
+    path = str(tmp_path_factory.mktemp("store") / "los_counts.bin")
+    write_store(prepared, path)
+    return path
+
+
+def test_range_matches_hourly_los_on_the_same_rows(prepared, store):
+    picked = prepared[(prepared["INTID"] == 2) & (prepared["datetime"] >= "2025-11-16 06:00") & (prepared["datetime"] < "2025-11-17")]
+    got = hourly_from_store(store, ["2"], "2025-11-16 06:00", "2025-11-17")
+    expected = compute_hourly_los(picked.reset_index(drop=True))
+    pd.testing.assert_frame_equal(
+        got.reset_index(drop=True), expected.reset_index(drop=True), check_dtype=False, check_categorical=False
+    )
+
+
+@pytest.mark.parametrize("bound", ["--start", "--end"])
+@pytest.mark.parametrize("module", [worst_los_summary, best_los_summary, average_los_by_intersection])
+def test_unparseable_range_is_a_usage_error(store, module, bound, tmp_path, capsys):
+    assert module.main(["--store", store, bound, "garbage", "--out", str(tmp_path / "out.csv")]) == 1
+    assert f"Could not parse {bound[2:]}: 'garbage'" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("module", [worst_los_summary, best_los_summary, average_los_by_intersection])
+def test_empty_range(store, module, tmp_path):
+    assert module.main(["--store", store, "--start", "2030-01-01", "--out", str(tmp_path / "out.csv")]) == 0
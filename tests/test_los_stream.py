@@ -0,0 +1,36 @@
+import io
+
+import pandas as pd
+import pytest
+
+from generate_volume_data import generate_counts, write_export
+from los_calc import compute_hourly_los, load_and_prepare
+from los_format import hourly_lines
+from los_stream import StreamingLOS, run_stream
+
+
+@pytest.fixture(scope="module")
+def export(tmp_path_factory) -> str:
+    path = str(tmp_path_factory.mktemp("stream") / "export.csv")
+    write_export(generate_counts(intids=2, days=1, seed=8), path)
+    return path
+
+
+@pytest.mark.parametrize("window", [2, 4, 6])
+def test_hour_lines_match_compute_hourly_los_for_any_window(export, window):
+    out = io.StringIO()
+    with open(export, encoding="utf-8") as f:
+        run_stream(f, StreamingLOS(window=window), out=out)
+    hours = [line[len("HOUR "):] for line in out.getvalue().splitlines() if line.startswith("HOUR ")]
+    expected = compute_hourly_los(load_and_prepare(export)).sort_values(["INTID", "hour"])
+    assert sorted(hours) == sorted(hourly_lines(expected))
+
+
+def test_rolling_alert_uses_the_window_size():
+    engine = StreamingLOS(window=2)
+    start = pd.Timestamp("2025-11-16 07:00").to_pydatetime()
+    volumes = [50, 900, 900, 50, 50]
+    events = [engine.push("1", start + pd.Timedelta(minutes=15 * i), v) for i, v in enumerate(volumes)]
+    # Two F intervals make a two-interval window F; one more A interval brings it back to D
+    assert [e.split(" |")[0] for e in events[2]] == ["ALERT INTID 1"]
+    assert [e.split(" |")[0] for e in events[3]] == ["CLEAR INTID 1", "HOUR INTID 1"]
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from average_los_by_intersection import compute_intersection_averages, score_to_letter
+from generate_volume_data import generate_counts, write_export
+from los_calc import compute_hourly_los, load_and_prepare
+from los_sweep import BASE_SCENARIO, index_volumes, parse_scenario, run_sweep
+
+SCENARIOS = [
+    BASE_SCENARIO,
+    parse_scenario("strict=80,160,300,450,600/1.1,1.9,2.7,3.5,4.3"),
+    parse_scenario("loose=150,300,500"),
+]
+
+
+@pytest.fixture(scope="module")
+def prepared(tmp_path_factory) -> pd.DataFrame:
+    path = str(tmp_path_factory.mktemp("sweep") / "export.csv")
+    write_export(generate_counts(intids=3, days=2, seed=9), path)
+    return load_and_prepare(path, compact=True)
+
+
+@pytest.fixture(scope="module")
+def sweep(prepared):
+    return run_sweep(index_volumes(prepared), SCENARIOS)
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS, ids=lambda s: s.name)
+def test_hourly_matches_compute_hourly_los(prepared, sweep, scenario):
+    hourly = sweep[0]
+    got = hourly[hourly["scenario"] == scenario.name].drop(columns="scenario").reset_index(drop=True)
+    expected = compute_hourly_los(prepared, scenario.thresholds).sort_values(["INTID", "hour"]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS, ids=lambda s: s.name)
+def test_averages_match_the_average_script(prepared, sweep, scenario):
+    averages = sweep[1]
+    got = averages[averages["scenario"] == scenario.name].reset_index(drop=True)
+    expected = compute_intersection_averages(compute_hourly_los(prepared, scenario.thresholds))
+    pd.testing.assert_series_equal(got["INTID"], expected["INTID"], check_dtype=False)
+    assert got["avg_hourly_score"].tolist() == pytest.approx(expected["avg_hourly_score"].tolist(), rel=1e-12)
+    assert got["avg_LOS"].tolist() == [score_to_letter(a, scenario.bands) for a in expected["avg_hourly_score"]]
+    if scenario is BASE_SCENARIO:
+        assert got["avg_LOS"].tolist() == expected["avg_LOS"].tolist()
+
+
+def test_parse_scenario_rejects_missing_name():
+    with pytest.raises(ValueError):
+        parse_scenario("80,160,300")
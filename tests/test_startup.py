@@ -0,0 +1,13 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("module", ["worst_los_summary", "best_los_summary", "average_los_by_intersection", "plot_intersection_volumes"])
+def test_summary_scripts_import_without_pandas(module):
+    code = f"import sys, {module}; sys.exit(1 if {{'numpy', 'pandas'}} & set(sys.modules) else 0)"
+    assert subprocess.run([sys.executable, "-c", code], cwd=ROOT).returncode == 0
@@ -1,8 +1,16 @@
+from __future__ import annotations
+
 import argparse
 import sys
-from typing import List
+from typing import TYPE_CHECKING, List, Optional
+
+from los_profile import add_profile_arguments, profiling, stage
+from los_select import PER_CHOICES
 
-import pandas as pd
+# pandas and the NumPy-based helpers are imported inside the functions that use them,
+# so --help and argument errors answer without loading them.
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 SCORE_TO_LOS = {1: "A", 2: "B", 3: "C", 4: "D", 5: "E", 6: "F"}
@@ -14,20 +22,21 @@ def format_hour(value) -> str:
     Accepts pandas Timestamp, datetime, or string.
     Returns a string in 'YYYY-MM-DD HH:MM' format when possible.
     """
-    try:
-        ts = pd.to_datetime(value, errors="coerce")
-        if pd.isna(ts):
-            return str(value)
-        return ts.strftime("%Y-%m-%d %H:%M")
-    except Exception:
-        return str(value)
+    from los_format import format_hours
 
+    return format_hours([value]).iloc[0]
 
-def build_per_intersection_summary(df: pd.DataFrame) -> pd.DataFrame:
+
+def build_per_intersection_summary(df: pd.DataFrame, worst_scores: Optional[pd.DataFrame] = None) -> pd.DataFrame:
     """
     For each INTID, find the maximum los_score and list all hours with that worst score.
     Returns a DataFrame with: INTID, worst_score, worst_LOS, worst_hours (comma-separated).
+    worst_scores (INTID, worst_score) may be passed in when already computed by the caller.
     """
+    import pandas as pd
+
+    from los_format import group_arrays, hours_by_intersection, parse_hours_if_complete
+
     # Ensure expected columns exist
     required = {"INTID", "hour", "los_score"}
     missing = required - set(df.columns)
@@ -38,9 +47,11 @@ def build_per_intersection_summary(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
     df["los_score"] = pd.to_numeric(df["los_score"], errors="coerce")
     df = df.dropna(subset=["INTID", "hour", "los_score"])  # drop rows without essentials
+    df["hour"] = parse_hours_if_complete(df["hour"])
 
     # Compute worst score per intersection
-    worst_scores = df.groupby("INTID", as_index=False)["los_score"].max().rename(columns={"los_score": "worst_score"})
+    if worst_scores is None:
+        worst_scores = df.groupby("INTID", as_index=False)["los_score"].max().rename(columns={"los_score": "worst_score"})
 
     # Join back to get all rows where intersection hits its worst score
     merged = df.merge(worst_scores, on="INTID")
@@ -48,19 +59,11 @@ def build_per_intersection_summary(df: pd.DataFrame) -> pd.DataFrame:
 
     # Aggregate hours per intersection
     # Build both a list (for compact display) and a flat string (for CSV)
-    summary = (
-        worst_rows
-        .groupby(["INTID", "worst_score"], as_index=False)
-        .agg({
-            "hour": list,
-        })
-        .rename(columns={"hour": "worst_hours_list"})
-    )
+    summary = worst_rows[["INTID", "worst_score"]].drop_duplicates().sort_values(["INTID"]).reset_index(drop=True)
+    summary["worst_hours_list"] = summary["INTID"].map(group_arrays(worst_rows["INTID"], worst_rows["hour"]))
 
-    # Add prettified string for CSV
-    summary["worst_hours"] = summary["worst_hours_list"].apply(
-        lambda lst: ", ".join(sorted({format_hour(x) for x in lst}))
-    )
+    # Add prettified string for CSV (labels are formatted once for all rows)
+    summary["worst_hours"] = summary["INTID"].map(hours_by_intersection(worst_rows))
 
     # Add worst LOS letter (prefer from SCORE_TO_LOS mapping)
     summary["worst_LOS"] = summary["worst_score"].map(SCORE_TO_LOS).fillna("")
@@ -70,11 +73,17 @@ def build_per_intersection_summary(df: pd.DataFrame) -> pd.DataFrame:
     return summary[["INTID", "worst_score", "worst_LOS", "worst_hours", "worst_hours_list"]]
 
 
-def build_overall_worst(df: pd.DataFrame, top: int = 10) -> pd.DataFrame:
+def build_overall_worst(df: pd.DataFrame, top: int = 10, per: Optional[str] = None) -> pd.DataFrame:
     """
     Return top-N worst hours across all intersections, sorted by los_score desc then total_volume desc.
+    per="intid" or per="day" returns a top-N list for each INTID or calendar day instead.
     Includes columns: INTID, hour, los_score, LOS, total_volume.
     """
+    import pandas as pd
+
+    from los_format import format_hours
+    from los_select import top_hours
+
     cols_needed = ["INTID", "hour", "los_score"]
     for c in cols_needed:
         if c not in df.columns:
@@ -92,75 +101,44 @@ def build_overall_worst(df: pd.DataFrame, top: int = 10) -> pd.DataFrame:
 
     out = out.dropna(subset=["INTID", "hour", "los_score"])  # essential rows only
 
-    # Sort by score desc then volume desc, pick top N
-    out_sorted = out.sort_values(["los_score", "total_volume"], ascending=[False, False])
-    result = out_sorted.head(top).copy()
-    result["hour"] = result["hour"].map(format_hour)
+    # Select by score desc then volume desc without sorting the whole table
+    result = top_hours(out, top, worst=True, per=per).copy()
+    result["hour"] = format_hours(result["hour"])
     return result[["INTID", "hour", "los_score", "LOS", "total_volume"]]
 
 
 def _compress_times(times: List[pd.Timestamp]) -> List[str]:
     """Compress a list of times (same date) into ranges like '07:00–08:00; 15:00–17:00'."""
-    # Normalize to Timestamp and sort
-    ts_list = [pd.to_datetime(t, errors="coerce") for t in times]
-    ts_list = [t for t in ts_list if pd.notna(t)]
-    ts_list.sort()
-    # Extract just time components in minutes from midnight
-    minutes = [t.hour * 60 + t.minute for t in ts_list]
-    if not minutes:
-        return []
-    # Detect consecutive hours (60 min steps)
-    ranges = []
-    start = minutes[0]
-    prev = minutes[0]
-    for m in minutes[1:]:
-        if m == prev + 60:
-            prev = m
-            continue
-        else:
-            # close previous range
-            start_str = f"{start//60:02d}:{start%60:02d}"
-            end_str = f"{prev//60:02d}:{prev%60:02d}"
-            ranges.append(start_str if start == prev else f"{start_str}–{end_str}")
-            start = prev = m
-    # close final range
-    start_str = f"{start//60:02d}:{start%60:02d}"
-    end_str = f"{prev//60:02d}:{prev%60:02d}"
-    ranges.append(start_str if start == prev else f"{start_str}–{end_str}")
-    return ranges
+    from los_format import compress_time_ranges
+
+    return compress_time_ranges(times)
 
 
 def _format_worst_hours_compact(hour_list: List) -> List[str]:
     """Extract unique times (HH:MM) without dates, sorted and deduplicated."""
-    ts_list = [pd.to_datetime(h, errors="coerce") for h in hour_list]
-    ts_list = [t for t in ts_list if pd.notna(t)]
-    if not ts_list:
-        return []
-    # Extract unique time-of-day strings
-    time_strs = sorted({f"{t.hour:02d}:{t.minute:02d}" for t in ts_list})
+    from los_format import unique_times_of_day
+
+    time_strs = unique_times_of_day(hour_list)
     # Return as comma-separated string wrapped in a list
-    return [', '.join(time_strs)]
+    return [', '.join(time_strs)] if time_strs else []
 
 
 def print_summary(per_int: pd.DataFrame, overall: pd.DataFrame) -> None:
-    print("Worst LOS per intersection:")
-    for _, row in per_int.iterrows():
-        lines = _format_worst_hours_compact(row.get("worst_hours_list", []))
-        times_str = lines[0] if lines else "No data"
-        print(f"INTID {row['INTID']} | Worst LOS {row['worst_LOS']} (score {int(row['worst_score'])}) | Times: {times_str}")
-
-    print("\nOverall worst hours across intersections:")
-    # Aligned table header
-    header = f"{'INTID':<6} {'Date':<10} {'Time':<5} {'LOS':<3} {'Score':<5} {'Volume':<7}"
-    print(header)
-    print("-" * len(header))
-    for _, row in overall.iterrows():
-        ts = pd.to_datetime(row["hour"], errors="coerce")
-        date_str = ts.strftime("%Y-%m-%d") if pd.notna(ts) else str(row["hour"])[:10]
-        time_str = ts.strftime("%H:%M") if pd.notna(ts) else str(row["hour"])[-5:]
-        vol = row.get("total_volume")
-        vol_str = f"{int(vol):<7}" if pd.notna(vol) else f"{'-':<7}"
-        print(f"{str(row['INTID']):<6} {date_str:<10} {time_str:<5} {row['LOS']:<3} {int(row['los_score']):<5} {vol_str}")
+    import pandas as pd
+
+    from los_format import hour_table_lines, write_lines
+
+    lines = ["Worst LOS per intersection:"]
+    hour_lists = per_int["worst_hours_list"] if "worst_hours_list" in per_int.columns else pd.Series([[]] * len(per_int))
+    for intid, los, score, hours in zip(per_int["INTID"], per_int["worst_LOS"], per_int["worst_score"], hour_lists):
+        compact = _format_worst_hours_compact(hours)
+        times_str = compact[0] if compact else "No data"
+        lines.append(f"INTID {intid} | Worst LOS {los} (score {int(score)}) | Times: {times_str}")
+
+    lines += ["", "Overall worst hours across intersections:"]
+    lines += hour_table_lines(overall)
+    # One write for the whole report instead of a print per row
+    write_lines(lines)
 
 
 def main(argv: List[str] = None) -> int:
@@ -168,24 +146,80 @@ def main(argv: List[str] = None) -> int:
     parser.add_argument("--source", default="los_results.csv", help="Path to hourly LOS results CSV (default: los_results.csv)")
     parser.add_argument("--out", default="worst_los_summary.csv", help="Path to save per-intersection worst summary CSV")
     parser.add_argument("--top", type=int, default=10, help="Top-N overall worst entries to display (default: 10)")
+    parser.add_argument(
+        "--per",
+        choices=PER_CHOICES,
+        default="none",
+        help="List the top-N worst hours overall (none), per INTID (intid) or per calendar day (day)",
+    )
+    parser.add_argument("--cache-dir", default="", help="Load the source through a typed binary cache kept in this directory")
+    parser.add_argument("--db", default="", help="Read hourly LOS from this SQLite store (los_calc.py --db) instead of --source")
+    parser.add_argument("--store", default="", help="Compute hourly LOS from this count store (los_store.py) instead of --source")
+    parser.add_argument("--intid", default="", help="With --store: comma-separated INTIDs to include (default: all)")
+    parser.add_argument("--start", default=None, help="With --store: include hours from this time (e.g. 2025-11-18)")
+    parser.add_argument("--end", default=None, help="With --store: include hours before this time")
+    add_profile_arguments(parser)
     args = parser.parse_args(argv)
+    with profiling(args, "worst_los_summary"):
+        return run(args)
+
 
+def run(args: argparse.Namespace) -> int:
     try:
-        df = pd.read_csv(args.source)
+        with stage("load hourly LOS"):
+            if args.db:
+                from contextlib import closing
+
+                from los_db import connect, extreme_hours, top_candidates
+
+                # Only the rows at each INTID's worst score and the top-N candidates are read
+                with closing(connect(args.db)) as conn:
+                    rows, scores = extreme_hours(conn, worst=True)
+                    per_int = build_per_intersection_summary(rows, worst_scores=scores)
+                    overall = build_overall_worst(top_candidates(conn, args.top, worst=True, per=args.per), top=args.top, per=args.per)
+            elif args.store:
+                from los_store import hourly_from_store, parse_intids
+
+                # Only the requested INTIDs and dates are read from the memory-mapped counts
+                df = hourly_from_store(args.store, parse_intids(args.intid), args.start, args.end)
+            elif args.cache_dir:
+                from los_cache import cached_results
+
+                df = cached_results(args.source, cache_dir=args.cache_dir)
+            else:
+                import pandas as pd
+
+                df = pd.read_csv(args.source)
     except FileNotFoundError:
-        print(f"Source file not found: {args.source}. Run 'python los_calc.py' first to generate hourly LOS.")
+        if args.store:
+            print(f"Count store not found: {args.store}. Convert exports first with 'python los_store.py --csv <export.csv>'.")
+        else:
+            print(f"Source file not found: {args.db or args.source}. Run 'python los_calc.py' first to generate hourly LOS.")
+        return 1
+    except KeyError as exc:
+        print(exc.args[0])
+        return 1
+    except ValueError as exc:
+        if not args.store:
+            raise
+        # Unparseable --start/--end or a file that is not a count store
+        print(exc)
         return 1
 
     # Build summaries
-    per_int = build_per_intersection_summary(df)
-    overall = build_overall_worst(df, top=args.top)
+    if not args.db:
+        with stage("build summaries", rows=len(df)):
+            per_int = build_per_intersection_summary(df)
+            overall = build_overall_worst(df, top=args.top, per=args.per)
 
     # Save per-intersection summary (drop the list column for CSV)
-    save_df = per_int.drop(columns=["worst_hours_list"], errors="ignore")
-    save_df.to_csv(args.out, index=False)
+    with stage("write csv", rows=len(per_int)):
+        save_df = per_int.drop(columns=["worst_hours_list"], errors="ignore")
+        save_df.to_csv(args.out, index=False)
 
     # Print to terminal
-    print_summary(per_int, overall)
+    with stage("print"):
+        print_summary(per_int, overall)
     print(f"\nSaved per-intersection worst summary to {args.out}")
     return 0
 